@@ -1,23 +1,55 @@
-#routes.py file that contains the route handlers for the Litestar UI server. The file defines two route handlers: one for the home page and one for generating an artifact. The home route handler returns a welcome message, while the generate_artifact route handler generates a CodeSandbox URL based on the provided prompt. The generate_artifact route handler calls the generate_code function from the code_generator module to generate the code files and create the CodeSandbox URL. The route handlers are registered with the Litestar app in the main.py file.
+#routes.py file that contains the route handlers for the Litestar UI server. The file defines route handlers for the home page, for generating artifacts, for background generation jobs, for planning and overviews, and for service stats, usage and metrics. The generate_artifact route handler awaits the agenerate_code coroutine from the code_generator module to generate the code files and create the CodeSandbox URL. The route handlers are registered with the Litestar app defined at the bottom of this file, which main.py serves.
+import json
+import asyncio
 import logging
-from typing import Dict, Any
-from litestar import Litestar, get, Request
-from litestar.response import Template
+from typing import AsyncGenerator, Dict, Any
+from litestar import Litestar, get, post, delete, Request, Response
+from litestar.response import ServerSentEvent, ServerSentEventMessage, Stream, Template
 from litestar.contrib.jinja import JinjaTemplateEngine
 from litestar.static_files import StaticFilesConfig
 from litestar.template import TemplateConfig
-from agentic_artifacts.services.code_generator import generate_code
+from agentic_artifacts.services import batch, cassette, events, jobs, usage, llm_client, model_router, prompts, result_cache, sandbox_client, sandbox_index, semantic_cache, singleflight
+from agentic_artifacts.services.llm_scheduler import scheduler
+from agentic_artifacts.services.code_generator import agenerate_artifact, agenerate_code, artifact_cache_key
+from agentic_artifacts.utils import config, deadline, metrics, tracing
+from agentic_artifacts.utils.log import configure_logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 @get("/", template_name="index.html")
 async def home(request: Request) -> Template:
     return Template(template_name="index.html", context={"message": "Welcome to Agentic Artifacts"})
 
+class ClientDisconnected(Exception):
+    pass
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def _unless_disconnected(request: Request, work, endpoint: str):
+    """Await work, cancelling it and raising ClientDisconnected if the client goes away first."""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        deadline.ABANDONED.inc(endpoint=endpoint, reason="disconnect")
+        raise ClientDisconnected()
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
 @get("/generate")
 async def generate_artifact(request: Request) -> Dict[str, Any]:
+    """Generate an artifact for the prompt query parameter and return its sandbox URL as JSON."""
     try:
         prompt = request.query_params.get("prompt")
         logger.info(f"Received prompt: {prompt}")
@@ -25,17 +57,127 @@ async def generate_artifact(request: Request) -> Dict[str, Any]:
             logger.error("No prompt provided")
             return {"error": "No prompt provided"}
 
-        sandbox_url = generate_code(prompt)
+        with usage.track() as request_usage, deadline.within(config.REQUEST_DEADLINE, endpoint="generate"):
+            sandbox_url = await _unless_disconnected(request, agenerate_code(prompt), "generate")
         if not sandbox_url:
             logger.error(f"Failed to generate code for prompt: {prompt}")
-            return {"error": "Failed to generate code"}
+            return {"error": "Failed to generate code", "usage": request_usage.summary()}
 
         logger.info(f"Generated sandbox URL: {sandbox_url}")
-        return {"preview_url": sandbox_url}
+        return {"preview_url": sandbox_url, "usage": request_usage.summary()}
+    except ClientDisconnected:
+        logger.info(f"Client disconnected; abandoned generation for prompt: {prompt}")
+        return {"error": "Client disconnected"}
+    except deadline.DeadlineExceeded as e:
+        logger.error(f"Deadline of {config.REQUEST_DEADLINE:.0f}s exceeded for prompt: {prompt}")
+        return {"error": str(e), "usage": request_usage.summary()}
     except Exception as e:
         logger.exception("An error occurred during artifact generation")
         return {"error": str(e)}
 
+async def _stream_pipeline_events(prompt: str) -> AsyncGenerator[ServerSentEventMessage, None]:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def sink(event: str, data: Dict[str, Any]) -> None:
+        queue.put_nowait((event, data))
+
+    async def run() -> None:
+        with events.subscribe(sink), usage.track() as request_usage:
+            try:
+                with deadline.within(config.REQUEST_DEADLINE, endpoint="generate_stream"):
+                    artifact = await agenerate_artifact(prompt)
+                if artifact:
+                    sink("done", {"preview_url": artifact["sandbox"]["final_url"], **artifact["sandbox"],
+                                  "usage": request_usage.summary()})
+                else:
+                    sink("error", {"error": "Failed to generate code", "usage": request_usage.summary()})
+            except deadline.DeadlineExceeded as e:
+                logger.error(f"Deadline of {config.REQUEST_DEADLINE:.0f}s exceeded for streamed prompt: {prompt}")
+                sink("error", {"error": str(e), "usage": request_usage.summary()})
+            except Exception as e:
+                logger.exception("An error occurred during streamed artifact generation")
+                sink("error", {"error": str(e)})
+
+    task = asyncio.create_task(run())
+    try:
+        yield ServerSentEventMessage(event="start", data=json.dumps({"prompt": prompt}))
+        while True:
+            event, data = await queue.get()
+            yield ServerSentEventMessage(event=event, data=json.dumps(data))
+            if event in ("done", "error"):
+                break
+    finally:
+        # Runs when the client disconnects too: stop the pipeline instead of finishing it for nobody
+        if not task.done():
+            deadline.ABANDONED.inc(endpoint="generate_stream", reason="disconnect")
+            task.cancel()
+
+@get("/generate/stream")
+async def generate_artifact_stream(request: Request) -> ServerSentEvent:
+    """Generate an artifact, streaming pipeline progress, files and the result as server-sent events."""
+    prompt = request.query_params.get("prompt")
+    logger.info(f"Received prompt for streaming: {prompt}")
+    if not prompt:
+        logger.error("No prompt provided")
+        return ServerSentEvent([ServerSentEventMessage(event="error", data=json.dumps({"error": "No prompt provided"}))])
+    return ServerSentEvent(_stream_pipeline_events(prompt))
+
+def _batch_options(data: Any):
+    """Validate a batch request body. Returns (prompts, concurrency, include_files, error)."""
+    if not isinstance(data, dict):
+        return None, None, False, "Expected a JSON object with a 'prompts' array"
+    prompts_ = data.get("prompts")
+    if not isinstance(prompts_, list) or not prompts_:
+        return None, None, False, "No prompts provided"
+    if len(prompts_) > config.BATCH_MAX_PROMPTS:
+        return None, None, False, f"Too many prompts ({len(prompts_)}); the limit is {config.BATCH_MAX_PROMPTS}"
+    if not all(isinstance(prompt, str) and prompt.strip() for prompt in prompts_):
+        return None, None, False, "Every prompt must be a non-empty string"
+    concurrency = data.get("concurrency")
+    if concurrency is not None and (isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1):
+        return None, None, False, "'concurrency' must be a positive integer"
+    include_files = data.get("include_files", False)
+    if not isinstance(include_files, bool):
+        return None, None, False, "'include_files' must be a boolean"
+    return prompts_, concurrency, include_files, None
+
+async def _ndjson_lines(results) -> AsyncGenerator[bytes, None]:
+    async for result in results:
+        yield (json.dumps(result) + "\n").encode("utf-8")
+
+@post("/generate/batch", status_code=200)
+async def generate_batch(data: Any) -> Response:
+    """Generate artifacts for a list of prompts, streaming one NDJSON result per prompt as each finishes."""
+    prompts_, concurrency, include_files, error = _batch_options(data)
+    if error:
+        logger.error(f"Rejected batch request: {error}")
+        return Response({"error": error}, status_code=400)
+    logger.info(f"Received batch of {len(prompts_)} prompts")
+    return Stream(_ndjson_lines(batch.run(prompts_, concurrency=concurrency, include_files=include_files)),
+                  media_type="application/x-ndjson")
+
+@post("/jobs", status_code=202)
+async def create_job(data: Dict[str, Any]) -> Response[Dict[str, Any]]:
+    """Queue a background generation job; its status and result are polled at GET /jobs/{job_id}."""
+    prompt = data.get("prompt")
+    logger.info(f"Received prompt for job: {prompt}")
+    if not prompt:
+        logger.error("No prompt provided")
+        return Response({"error": "No prompt provided"}, status_code=400)
+    try:
+        job_id = await jobs.queue.submit(prompt)
+    except jobs.QueueFullError as e:
+        logger.error(str(e))
+        return Response({"error": str(e)}, status_code=503)
+    return Response({"job_id": job_id, "status": jobs.QUEUED}, status_code=202)
+
+@get("/jobs/{job_id:str}")
+async def get_job(job_id: str) -> Response[Dict[str, Any]]:
+    job = await jobs.queue.get(job_id)
+    if job is None:
+        return Response({"error": "Job not found"}, status_code=404)
+    return Response(job)
+
 @get("/plan")
 async def plan_artifact(request: Request) -> Dict[str, Any]:
     try:
@@ -45,13 +187,7 @@ async def plan_artifact(request: Request) -> Dict[str, Any]:
             logger.error("No prompt provided")
             return {"error": "No prompt provided"}
 
-        plan_response = completion(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert in software planning."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        plan_response = await llm_client.acomplete("plan", messages=prompts.PLAN.messages(prompt))
         plan_content = plan_response['choices'][0]['message']['content'].strip()
         return {"plan": plan_content}
     except Exception as e:
@@ -67,33 +203,103 @@ async def overview_artifact(request: Request) -> Dict[str, Any]:
             logger.error("No prompt provided")
             return {"error": "No prompt provided"}
 
-        overview_response = completion(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert in software implementation."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        overview_response = await llm_client.acomplete("overview", messages=prompts.OVERVIEW.messages(prompt))
         overview_content = overview_response['choices'][0]['message']['content'].strip()
         return {"overview": overview_content}
     except Exception as e:
         logger.exception("An error occurred during overview generation")
         return {"error": str(e)}
 
-app = Litestar(
-    route_handlers=[home, plan_artifact, overview_artifact, generate_artifact],
-    template_config=TemplateConfig(
-        directory="agentic_artifacts/ui/templates",
-        engine=JinjaTemplateEngine
-    ),
-    static_files_config=[
-        StaticFilesConfig(directories=["agentic_artifacts/ui/static"], path="/static")
-    ],
-)
+@get("/llm/scheduler")
+async def llm_scheduler_stats() -> Dict[str, Any]:
+    return scheduler.snapshot()
+
+@get("/llm/models")
+async def llm_model_stats() -> Dict[str, Any]:
+    return model_router.router.snapshot()
+
+@get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    stats = result_cache.cache.stats()
+    stats["sandbox_index"] = sandbox_index.index.stats()
+    stats["semantic"] = semantic_cache.index.stats()
+    stats["singleflight"] = singleflight.group.stats()
+    return stats
+
+@delete("/cache", status_code=200)
+async def invalidate_cache(request: Request) -> Dict[str, Any]:
+    prompt = request.query_params.get("prompt")
+    if prompt:
+        key = artifact_cache_key(prompt)
+        removed = result_cache.cache.invalidate(key)
+        semantic_cache.index.discard(key)
+        logger.info(f"Invalidated result cache for prompt: {prompt}")
+        return {"invalidated": 1 if removed else 0}
+    removed = result_cache.cache.clear()
+    semantic_cache.index.clear()
+    logger.info("Cleared result cache")
+    return {"invalidated": removed}
+
+@get("/usage")
+async def usage_report(request: Request) -> Dict[str, Any]:
+    """Report token and cost usage from the ledger, for one request_id or summed over the last days."""
+    request_id = request.query_params.get("request_id")
+    if request_id:
+        return {"request_id": request_id, "calls": await asyncio.to_thread(usage.ledger.for_request, request_id)}
+    try:
+        days = int(request.query_params.get("days", 30))
+    except ValueError:
+        return {"error": "days must be an integer"}
+    rows = await asyncio.to_thread(usage.ledger.daily, days, stage=request.query_params.get("stage"),
+                                   model=request.query_params.get("model"))
+    totals: Dict[str, Any] = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0}
+    for row in rows:
+        for name in totals:
+            totals[name] += row[name]
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    totals["cached_ratio"] = usage.cached_ratio(totals["prompt_tokens"], totals["cached_tokens"])
+    return {"days": days, "totals": totals, "daily": rows}
+
+def _service_metrics():
+    """Report live scheduler, cache and queue state as metric families at scrape time."""
+    snapshot = scheduler.snapshot()
+    yield ("agentic_llm_concurrency_limit", "gauge", "Current adaptive LLM concurrency limit",
+           [({}, snapshot["concurrency_limit"])])
+    yield ("agentic_llm_in_flight", "gauge", "LLM calls holding a scheduler slot", [({}, snapshot["in_flight"])])
+    yield ("agentic_llm_waiting", "gauge", "LLM calls waiting for a scheduler slot",
+           [({"lane": lane}, count) for lane, count in snapshot["waiting"].items()])
+    yield ("agentic_llm_calls_total", "counter", "Finished LLM calls by outcome",
+           [({"outcome": outcome}, snapshot[outcome]) for outcome in ("completed", "failed", "rate_limited")])
+
+    cache = result_cache.cache.stats()
+    yield ("agentic_result_cache_lookups_total", "counter", "Result cache lookups by outcome",
+           [({"outcome": "memory_hit"}, cache["memory_hits"]), ({"outcome": "disk_hit"}, cache["disk_hits"]),
+            ({"outcome": "miss"}, cache["misses"])])
+    yield ("agentic_result_cache_entries", "gauge", "Result cache entries held in memory", [({}, cache["memory_entries"])])
+
+    index = sandbox_index.index.stats()
+    yield ("agentic_sandbox_index_lookups_total", "counter", "Sandbox index lookups by outcome",
+           [({"outcome": "hit"}, index["hits"]), ({"outcome": "miss"}, index["misses"])])
+
+    flights = singleflight.group.stats()
+    yield ("agentic_singleflight_in_flight", "gauge", "Distinct prompts being generated", [({}, flights["in_flight"])])
+    yield ("agentic_singleflight_followers_total", "counter", "Requests coalesced into an in-flight run",
+           [({}, flights["followers"])])
+
+    queue = jobs.queue.stats()
+    yield ("agentic_jobs_queued", "gauge", "Background jobs waiting for a worker", [({}, queue["queued"])])
+    yield ("agentic_jobs_running", "gauge", "Background jobs being run", [({}, queue["running"])])
+
+metrics.registry.add_collector(_service_metrics)
 
+@get("/metrics")
+async def prometheus_metrics() -> Response[str]:
+    """Expose the metrics registry in the Prometheus text format."""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
+# The lifecycle hooks open the shared sandbox HTTP client and the caches, and flush and close them on shutdown
 app = Litestar(
-    route_handlers=[home, generate_artifact],
+    route_handlers=[home, plan_artifact, overview_artifact, generate_artifact, generate_artifact_stream, generate_batch, create_job, get_job, llm_scheduler_stats, llm_model_stats, cache_stats, invalidate_cache, usage_report, prometheus_metrics],
     template_config=TemplateConfig(
         directory="agentic_artifacts/ui/templates",
         engine=JinjaTemplateEngine
@@ -101,4 +307,8 @@ app = Litestar(
     static_files_config=[
         StaticFilesConfig(directories=["agentic_artifacts/ui/static"], path="/static")
     ],
+    on_startup=[sandbox_client.startup, result_cache.startup, semantic_cache.startup, jobs.startup],
+    on_shutdown=[jobs.shutdown, sandbox_client.shutdown, cassette.shutdown, tracing.shutdown, usage.shutdown, semantic_cache.shutdown, sandbox_index.shutdown],
+    # Logging is set up by configure_logging() above; Litestar's default config would replace its handlers
+    logging_config=None,
 )
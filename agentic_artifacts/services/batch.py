@@ -0,0 +1,126 @@
+# batch.py file that runs batches of prompts through the generation pipeline for POST /generate/batch. Every prompt in a batch becomes its own task with its own usage tracker and deadline, so one prompt failing or timing out does not affect the others. All batches share one pool of AGENTIC_BATCH_CONCURRENCY pipeline slots, and a batch may ask for fewer. run() yields each prompt's result as soon as it finishes, in completion order, and then a summary of the batch: item counts, cache hits, latencies and token use. The route streams these as NDJSON lines. If the client goes away, the generator is closed and the unfinished prompts are cancelled.
+import asyncio
+import logging
+import math
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
+
+from agentic_artifacts.services import events, usage
+from agentic_artifacts.services.code_generator import agenerate_artifact
+from agentic_artifacts.utils import config, deadline
+from agentic_artifacts.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ITEMS = registry.counter("agentic_batch_items_total", "Batch prompts by outcome", ["outcome"])
+
+_USAGE_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd")
+
+_slots: Optional[asyncio.Semaphore] = None
+
+def _shared_slots() -> asyncio.Semaphore:
+    """Pipeline slots shared by every batch in the process."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+    return _slots
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))]
+
+def _cache_outcome(seen) -> Optional[str]:
+    if "coalesced" in seen:
+        return "coalesced"
+    cache = seen.get("cache")
+    if cache and cache.get("hit"):
+        return "similar" if cache.get("similar") else "exact"
+    return None
+
+async def _run_item(index, prompt, batch_slots, include_files) -> Dict[str, Any]:
+    seen: Dict[str, Dict[str, Any]] = {}
+
+    def sink(event, data):
+        if event in ("cache", "coalesced"):
+            seen[event] = data
+
+    submitted = time.monotonic()
+    async with batch_slots, _shared_slots():
+        started = time.monotonic()
+        item: Dict[str, Any] = {"type": "result", "index": index, "prompt": prompt}
+        with events.subscribe(sink), usage.track() as item_usage:
+            try:
+                with deadline.within(config.REQUEST_DEADLINE, endpoint="generate_batch"):
+                    artifact = await agenerate_artifact(prompt)
+                if artifact:
+                    item.update(status="ok", preview_url=artifact["sandbox"]["final_url"], sandbox=artifact["sandbox"])
+                    if include_files:
+                        item["files"] = artifact["files"]
+                else:
+                    item.update(status="error", error="Failed to generate code")
+            except deadline.DeadlineExceeded as e:
+                logger.error(f"Deadline of {config.REQUEST_DEADLINE:.0f}s exceeded for batch prompt {index}: {prompt}")
+                item.update(status="error", error=str(e))
+            except Exception as e:
+                logger.exception(f"An error occurred generating batch prompt {index}")
+                item.update(status="error", error=str(e))
+        item["cache"] = _cache_outcome(seen)
+        # Seconds spent waiting for a pipeline slot, then running the pipeline
+        item["queued"] = round(started - submitted, 3)
+        item["latency"] = round(time.monotonic() - started, 3)
+        item["usage"] = item_usage.summary()
+    ITEMS.inc(outcome=item["status"])
+    return item
+
+def _summary(items: List[Dict[str, Any]], elapsed) -> Dict[str, Any]:
+    totals = dict.fromkeys(_USAGE_FIELDS, 0)
+    cache_hits = {"exact": 0, "similar": 0, "coalesced": 0}
+    for item in items:
+        for name in _USAGE_FIELDS:
+            totals[name] += item["usage"][name]
+        if item["cache"]:
+            cache_hits[item["cache"]] += 1
+    totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+    totals["cached_ratio"] = usage.cached_ratio(totals["prompt_tokens"], totals["cached_tokens"])
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    latencies = sorted(item["latency"] for item in items)
+    succeeded = sum(1 for item in items if item["status"] == "ok")
+    return {
+        "type": "summary",
+        "items": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "cache_hits": {**cache_hits, "total": sum(cache_hits.values())},
+        "latency": {
+            "elapsed": round(elapsed, 3),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": latencies[-1] if latencies else None,
+        },
+        "usage": totals,
+    }
+
+async def run(prompts: Sequence[str], concurrency=None, include_files=False) -> AsyncGenerator[Dict[str, Any], None]:
+    """Generate an artifact for every prompt, yielding each result as it finishes and then the summary.
+    concurrency caps how many of this batch's prompts run at once, within the shared limit."""
+    started = time.monotonic()
+    batch_slots = asyncio.Semaphore(min(concurrency or config.BATCH_CONCURRENCY, config.BATCH_CONCURRENCY))
+    tasks = [asyncio.ensure_future(_run_item(index, prompt, batch_slots, include_files))
+             for index, prompt in enumerate(prompts)]
+    items = []
+    try:
+        for next_item in asyncio.as_completed(tasks):
+            item = await next_item
+            items.append(item)
+            yield item
+        yield _summary(items, time.monotonic() - started)
+    finally:
+        # Runs when the client disconnects too: stop the prompts still waiting or running
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            deadline.ABANDONED.inc(len(unfinished), endpoint="generate_batch", reason="disconnect")
+            logger.info(f"Batch stopped early; cancelled {len(unfinished)} of {len(tasks)} prompts")
+            await asyncio.gather(*unfinished, return_exceptions=True)
@@ -0,0 +1,274 @@
+# cassette.py file that records and replays the app's external traffic. In record mode every completion request and response (streamed responses chunk by chunk, with their arrival offsets) and every define API exchange is appended to a JSONL cassette, one exchange per line, along with the prompts that started each pipeline run. In replay mode the recorded responses are served back in place of litellm and the define API, keyed by a hash of the request, with the original latencies divided by CASSETTE_SPEED, so a captured traffic mix can be rerun offline at 10x or 100x speed without tokens or network. scripts/replay_cassette.py drives a replay.
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from litellm import ModelResponse
+from litellm.types.utils import ModelResponseStream
+
+from agentic_artifacts.services import llm_client, sandbox_client
+from agentic_artifacts.utils import config
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+# Request fields that identify a completion; transport options such as timeout are left out
+LLM_KEY_FIELDS = (
+    "model", "messages", "functions", "function_call", "tools", "tool_choice",
+    "temperature", "top_p", "max_tokens", "response_format", "stream",
+)
+
+class CassetteMissError(LookupError):
+    """Replay found no recorded exchange for a request."""
+
+class ReplayedError(Exception):
+    """A provider error captured while recording, raised again on replay."""
+
+    def __init__(self, message, error_type=None, status_code=None):
+        super().__init__(message)
+        self.error_type = error_type
+        self.status_code = status_code
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if hasattr(value, "__dict__"):
+        return _jsonable(vars(value))
+    return value
+
+def _request_fields(kwargs):
+    return {field: _jsonable(kwargs[field]) for field in LLM_KEY_FIELDS if field in kwargs}
+
+def llm_key(kwargs: Dict[str, Any]) -> str:
+    canonical = json.dumps(_request_fields(kwargs), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def define_key(encoded_parameters: str) -> str:
+    return hashlib.sha256(encoded_parameters.encode("utf-8")).hexdigest()
+
+def _error_fields(error):
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "status_code": getattr(error, "status_code", None),
+    }
+
+def _replayed_error(fields):
+    return ReplayedError(fields.get("message", ""), fields.get("type"), fields.get("status_code"))
+
+class Cassette:
+    def __init__(self, path, mode=OFF, speed=1.0):
+        if mode not in (OFF, RECORD, REPLAY):
+            logger.warning(f"Unknown cassette mode {mode!r}; recording and replay are off")
+            mode = OFF
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.prompts: List[Dict[str, Any]] = []
+        self._file = None
+        self._started = time.monotonic()
+        self._entries: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._cursors: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    def install(self):
+        """Put the recording or replaying backends in front of litellm and the define API."""
+        if self.mode == RECORD:
+            backend = llm_client.get_backend()
+
+            async def recording_backend(**kwargs):
+                return await self._record_llm(backend, kwargs)
+
+            llm_client.set_backend(recording_backend)
+            sandbox_client.set_define_backend(self._record_define)
+            logger.info(f"Recording LLM and define API traffic to {self.path}")
+        elif self.mode == REPLAY:
+            self.load()
+            llm_client.set_backend(self._replay_llm)
+            sandbox_client.set_define_backend(self._replay_define)
+            logger.info(f"Replaying {sum(len(e) for e in self._entries.values())} exchanges from {self.path} at {self.speed}x")
+
+    # Recording
+
+    def _offset(self, started):
+        return round(started - self._started, 4)
+
+    def _write(self, entry):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+    def record_prompt(self, prompt):
+        """Note the prompt that starts a pipeline run so a replay can reissue it."""
+        if self.mode == RECORD:
+            self._write({"kind": "prompt", "t": self._offset(time.monotonic()), "prompt": prompt})
+
+    async def _record_llm(self, backend, kwargs):
+        started = time.monotonic()
+        entry = {
+            "kind": "llm",
+            "key": llm_key(kwargs),
+            "t": self._offset(started),
+            "stream": bool(kwargs.get("stream")),
+            "request": _request_fields(kwargs),
+        }
+        try:
+            response = await backend(**kwargs)
+        except Exception as e:
+            entry["latency"] = round(time.monotonic() - started, 4)
+            entry["error"] = _error_fields(e)
+            self._write(entry)
+            raise
+        if not entry["stream"]:
+            entry["latency"] = round(time.monotonic() - started, 4)
+            entry["response"] = _jsonable(response)
+            self._write(entry)
+            return response
+        return self._record_stream(response, entry, started)
+
+    async def _record_stream(self, response, entry, started):
+        chunks = []
+        finished = False
+        try:
+            async for chunk in response:
+                chunks.append({"t": round(time.monotonic() - started, 4), "data": _jsonable(chunk)})
+                yield chunk
+            finished = True
+        except Exception as e:
+            entry["error"] = _error_fields(e)
+            raise
+        finally:
+            entry["latency"] = round(time.monotonic() - started, 4)
+            entry["chunks"] = chunks
+            if not finished and "error" not in entry:
+                # The consumer stopped reading; later chunks were never seen
+                entry["incomplete"] = True
+            self._write(entry)
+            aclose = getattr(response, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _record_define(self, encoded_parameters):
+        started = time.monotonic()
+        entry = {
+            "kind": "define",
+            "key": define_key(encoded_parameters),
+            "t": self._offset(started),
+            "request": {"url": config.CODESANDBOX_DEFINE_URL, "parameters_bytes": len(encoded_parameters)},
+        }
+        try:
+            result = await sandbox_client.post_define(encoded_parameters)
+        except Exception as e:
+            entry["latency"] = round(time.monotonic() - started, 4)
+            entry["error"] = _error_fields(e)
+            self._write(entry)
+            raise
+        entry["latency"] = round(time.monotonic() - started, 4)
+        entry["response"] = result
+        self._write(entry)
+        return result
+
+    # Replay
+
+    def load(self):
+        self.prompts = []
+        self._entries.clear()
+        self._cursors.clear()
+        if not os.path.exists(self.path):
+            logger.warning(f"Cassette {self.path} does not exist; every request will miss")
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping unreadable cassette line {number}: {e}")
+                    continue
+                if entry.get("kind") == "prompt":
+                    self.prompts.append(entry)
+                else:
+                    self._entries[(entry.get("kind"), entry.get("key"))].append(entry)
+
+    def _next(self, kind, key):
+        """Return the next recording for a request, cycling when the same request repeats more often than recorded."""
+        entries = self._entries.get((kind, key))
+        if not entries:
+            self.misses += 1
+            raise CassetteMissError(f"No recorded {kind} exchange for request {key[:12]}")
+        index = self._cursors[(kind, key)]
+        self._cursors[(kind, key)] = index + 1
+        self.replayed += 1
+        return entries[index % len(entries)]
+
+    async def _sleep(self, seconds):
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+    async def _replay_llm(self, **kwargs):
+        entry = self._next("llm", llm_key(kwargs))
+        if "chunks" in entry:
+            return self._replay_stream(entry)
+        await self._sleep(entry.get("latency", 0.0))
+        if "error" in entry:
+            raise _replayed_error(entry["error"])
+        return ModelResponse(**entry["response"])
+
+    async def _replay_stream(self, entry):
+        elapsed = 0.0
+        for chunk in entry["chunks"]:
+            await self._sleep(chunk["t"] - elapsed)
+            elapsed = chunk["t"]
+            yield ModelResponseStream(**chunk["data"])
+        if "error" in entry:
+            await self._sleep(entry.get("latency", elapsed) - elapsed)
+            raise _replayed_error(entry["error"])
+
+    async def _replay_define(self, encoded_parameters):
+        entry = self._next("define", define_key(encoded_parameters))
+        await self._sleep(entry.get("latency", 0.0))
+        if "error" in entry:
+            raise _replayed_error(entry["error"])
+        return entry.get("response")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "speed": self.speed,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+cassette = Cassette(config.CASSETTE_PATH, config.CASSETTE_MODE, config.CASSETTE_SPEED)
+if cassette.mode != OFF:
+    cassette.install()
+
+async def shutdown():
+    """Flush and close the cassette file when the app stops."""
+    cassette.close()
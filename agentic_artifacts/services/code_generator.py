@@ -1,195 +1,412 @@
-# code_generator.py file that contains the code generation logic for generating code files and creating a CodeSandbox URL. The file defines functions to generate code files based on a prompt, create a CodeSandbox URL, verify the generated code, and return the final sandbox URL. The generate_code function is called from the generate_artifact route handler in the routes.py file to generate the code files and create the CodeSandbox URL. The code_generator module uses the Litellm completion function to interact with the GPT-4o model for code generation.
+# code_generator.py file that contains the code generation logic for generating code files and creating a CodeSandbox URL. The file defines functions to generate code files based on a prompt, create a CodeSandbox URL, verify the generated code, and return the final sandbox URL. The agenerate_code coroutine is awaited from the route handlers in the routes.py file; generate_code and the other synchronous functions are wrappers for scripts. The code_generator module calls the GPT-4o model through llm_client for code generation.
 #code_generator.py agentic_artifacts/services/code_generator.py
 import os
-import httpx
+import re
 import json
+import time
+import asyncio
 import logging
-import lzstring
 from urllib.parse import quote
-from litellm import completion
+from agentic_artifacts.services import cassette, events, llm_client, model_router, prompts, result_cache, sandbox_client, sandbox_index, scaffolds, semantic_cache, singleflight, static_verifier
+from agentic_artifacts.utils import config, deadline, tracing
+from agentic_artifacts.utils.metrics import SIZE_BUCKETS, registry
+from agentic_artifacts.utils.log import log_payload
+from agentic_artifacts.utils.lz_string import compress_to_base64
+from agentic_artifacts.services.static_verifier import Finding
+from agentic_artifacts.services.stream_parser import FunctionArgumentsParser, StreamParseError
 
 logger = logging.getLogger(__name__)
 
+GENERATION_RETRIES = registry.counter(
+    "agentic_generation_retries_total", "Generation attempts after the first, by why the previous attempt failed", ["reason"])
+VERIFICATION_FAILURES = registry.counter(
+    "agentic_verification_failures_total", "Code file sets rejected by verification", ["stage"])
+JSON_DECODE_ERRORS = registry.counter(
+    "agentic_json_decode_errors_total", "Streamed function call arguments that failed to parse", ["stage"])
+REPAIRED_FILES = registry.counter(
+    "agentic_repair_files_total", "Files in targeted repair attempts, by whether they were regenerated or kept", ["kind"])
+PAYLOAD_SIZE = registry.histogram(
+    "agentic_payload_chars", "Size of pipeline payloads in characters", ["kind"], buckets=SIZE_BUCKETS)
+
+# Models generation may use, in order; part of the result cache key
+GENERATION_MODELS = ",".join(model_router.router.models("generate"))
+
+# Minimum seconds between streamed progress events
+PROGRESS_EVENT_INTERVAL = 0.25
+
+FILE_NAMES = prompts.FILE_NAMES
+SYSTEM_PROMPT = prompts.GENERATE.system
+
+def artifact_cache_key(prompt):
+    """Result cache key for a prompt: the prompt, the generation models and the scaffold it is built on."""
+    return result_cache.cache_key(prompt, GENERATION_MODELS, scaffolds.select(prompt).fingerprint)
+
+def semantic_namespace(prompt):
+    """Prompts only match cached prompts generated by the same models on the same scaffold."""
+    return f"{GENERATION_MODELS}:{scaffolds.select(prompt).fingerprint}"
+
+@tracing.traced("compress_and_encode")
 def compress_and_encode(json_data):
     """Compress and encode JSON data for embedding in URL."""
-    lz = lzstring.LZString()
-    compressed = lz.compressToBase64(json_data)
-    return quote(compressed)
+    return quote(compress_to_base64(json_data))
 
-def create_codesandbox(files):
+async def acreate_codesandbox(files):
     """Generate CodeSandbox URL based on the provided files."""
+    fp = sandbox_index.fingerprint(files)
+    sandbox_id = sandbox_index.index.get(fp)
+    if sandbox_id:
+        logger.info(f"Reusing sandbox {sandbox_id} for identical file set")
+        sandbox_info = sandbox_client.sandbox_urls(sandbox_id)
+        events.emit("sandbox", reused=True, **sandbox_info)
+        return sandbox_info
+
+    events.emit("stage", stage="sandbox")
     parameters = {"files": files}
     parameters_json = json.dumps(parameters)
     encoded_compressed_parameters = compress_and_encode(parameters_json)
-    url = f"https://codesandbox.io/api/v1/sandboxes/define?json=1&parameters={encoded_compressed_parameters}"
-    
-    response = httpx.post(url)
-    if response.status_code == 200:
-        response_data = response.json()
-        sandbox_id = response_data.get('sandbox_id')
-        return {
-            "sandbox_id": sandbox_id,
-            "final_url": f"https://codesandbox.io/s/{sandbox_id}",
-            "sandbox_url": f"https://{sandbox_id}.csb.app/"
-        }
-    else:
-        logger.error(f"Error creating sandbox: {response.text}")
-        return None
+    PAYLOAD_SIZE.observe(len(parameters_json), kind="sandbox_files")
+    PAYLOAD_SIZE.observe(len(encoded_compressed_parameters), kind="sandbox_parameters")
+    sandbox_info = await sandbox_client.define_sandbox(encoded_compressed_parameters)
+    if sandbox_info:
+        sandbox_index.index.put(fp, sandbox_info['sandbox_id'])
+        events.emit("sandbox", reused=False, **sandbox_info)
+    return sandbox_info
 
 def is_valid_verification(response):
     """Check if the verification response is valid."""
     try:
         message_content = response['choices'][0]['message']['content'].strip().upper()
-        return "VALID" in message_content
-    except (KeyError, IndexError) as e:
+        # "VALID" is a substring of "INVALID", so match whole words and let INVALID win
+        if re.search(r"\bINVALID\b", message_content):
+            return False
+        return re.search(r"\bVALID\b", message_content) is not None
+    except (KeyError, IndexError, TypeError) as e:
         logger.error(f"Error parsing verification response: {e}")
         return False
 
-def verify_and_refine_code(function_response, retry_count=3):
-    verification_prompt = (
-        "Please verify that the following code files are correct and functional. "
-        "Respond with 'VALID' if the code is correct or 'INVALID' if there are issues. "
-        "Evaluate the code for the following aspects: "
-        "1. Correctness: Ensure the code does what is expected based on the prompt. "
-        "2. Functionality: Verify that the code runs without errors and performs the intended task. "
-        "3. Completeness: Check that all necessary files and dependencies are included. "
-        "4. Formatting: Ensure the code is properly formatted and adheres to coding standards. "
-        "5. Syntax: Verify that there are no syntax errors in the code. "
-        "6. Best Practices: Ensure the code follows best practices for readability, maintainability, and performance. "
-        "7. Deployment: Confirm that the code is ready to be deployed to CodeSandbox and includes necessary configurations. "
-        f"Here are the code files: {function_response}"
+# "<file>: <problem>" lines in a verifier's INVALID answer, allowing list markers, quotes and a line number
+_FINDING_LINE = re.compile(r"""^\s*(?:(?:[-*>]|\d+[.)])\s+)*[`'"*]*([^\s`'"*:]+)[`'"*]*(?::(\d+))?\s*:\s*(.+)$""")
+
+def verification_findings(response, filenames):
+    """Findings in an LLM verification response: none when it answers VALID, otherwise one per
+    "<file>: <problem>" line naming a generated file, or a single finding for no file in particular."""
+    if is_valid_verification(response):
+        return []
+    try:
+        content = response['choices'][0]['message']['content'] or ""
+    except (KeyError, IndexError, TypeError):
+        content = ""
+    findings = []
+    for line in content.splitlines():
+        match = _FINDING_LINE.match(line)
+        if match and match.group(1) in filenames:
+            findings.append(Finding(match.group(1), match.group(3).strip(), int(match.group(2)) if match.group(2) else None))
+    return findings or [Finding("", content.strip()[:500] or "Rejected by the verifier")]
+
+def run_static_checks(code_files):
+    """Run the local static verifier, emitting its verdict. Returns the findings."""
+    findings = static_verifier.verify_files(code_files)
+    for finding in findings:
+        logger.error(f"Static verification: {finding}")
+    events.emit("verification", stage="static", passed=not findings, findings=[str(f) for f in findings])
+    return findings
+
+async def _verify_once(verification_prompt, filenames):
+    verification_response = await llm_client.acomplete("verify", messages=prompts.VERIFY.messages(verification_prompt))
+    log_payload(logger, "Verification response", verification_response)
+    return verification_findings(verification_response, filenames)
+
+def _merge_findings(findings):
+    return list(dict.fromkeys(findings))
+
+async def _verify_by_quorum(verification_prompt, filenames, voters, required):
+    """Run voters verifier calls concurrently and stop as soon as the quorum outcome is decided.
+    Returns no findings when the quorum passes, otherwise the rejecting voters' findings."""
+    tasks = [asyncio.ensure_future(_verify_once(verification_prompt, filenames)) for _ in range(voters)]
+    passes = 0
+    failures = 0
+    rejections = []
+    try:
+        for next_vote in asyncio.as_completed(tasks):
+            try:
+                findings = await next_vote
+            except deadline.DeadlineExceeded:
+                raise
+            except Exception:
+                logger.exception("Verifier call failed; counting it as a rejection")
+                findings = [Finding("", "Verifier call failed")]
+            passed = not findings
+            if passed:
+                passes += 1
+            else:
+                failures += 1
+                rejections.extend(findings)
+            events.emit("verification", stage="llm", attempt=passes + failures, passed=passed,
+                        findings=[str(f) for f in findings])
+            if passes >= required:
+                return []
+            if failures > voters - required:
+                return _merge_findings(rejections)
+        return _merge_findings(rejections)
+    finally:
+        # Outstanding votes cannot change the outcome any more
+        for task in tasks:
+            task.cancel()
+
+@tracing.traced("verify_and_refine_code")
+async def averify_code_files(function_response, retry_count=3):
+    """Verify a file set and return the findings; an empty list means it passed."""
+    code_files = json.loads(function_response) if isinstance(function_response, str) else function_response
+
+    # Cheap deterministic checks first; only call the LLM verifier when they pass
+    events.emit("stage", stage="verify")
+    findings = run_static_checks(code_files)
+    if findings:
+        VERIFICATION_FAILURES.inc(stage="static")
+        return findings
+
+    # The checklist is in the frozen system message; only the files vary
+    verification_prompt = "Here are the code files: " + json.dumps(code_files)
+    PAYLOAD_SIZE.observe(len(verification_prompt), kind="verification_prompt")
+
+    filenames = set(code_files)
+    if config.VERIFY_MODE == "quorum":
+        findings = await _verify_by_quorum(verification_prompt, filenames, config.VERIFY_QUORUM_VOTERS,
+                                           config.VERIFY_QUORUM_REQUIRED)
+        if findings:
+            VERIFICATION_FAILURES.inc(stage="llm")
+        return findings
+
+    rejections = []
+    for attempt in range(retry_count):
+        findings = await _verify_once(verification_prompt, filenames)
+        events.emit("verification", stage="llm", attempt=attempt + 1, passed=not findings,
+                    findings=[str(f) for f in findings])
+        if not findings:
+            return []
+        rejections.extend(findings)
+
+    VERIFICATION_FAILURES.inc(stage="llm")
+    return _merge_findings(rejections)
+
+async def averify_and_refine_code(function_response, retry_count=3):
+    return not await averify_code_files(function_response, retry_count=retry_count)
+
+def _file_entries(entries):
+    """Keep only well-formed {"content": str} file entries."""
+    return {
+        name: entry for name, entry in entries.items()
+        if isinstance(entry, dict) and isinstance(entry.get("content"), str)
+    }
+
+def _repair_request(prompt, repair, remaining, completed):
+    """Build the user message for a targeted repair: the findings and current contents of the
+    failing files only, naming the files that passed without sending them again."""
+    findings = [finding for finding in repair["findings"] if finding.file in remaining]
+    files = {name: entry for name, entry in repair["files"].items() if name in remaining}
+    request = (
+        f"{prompt}\nThese generated files failed verification. Fix the problems found and return corrected "
+        f"versions of only these files: {', '.join(sorted(files))}.\nProblems found:\n"
+        + "\n".join(f"- {finding}" for finding in findings)
+        + f"\nCurrent contents of the files to fix: {json.dumps(files)}"
     )
+    if completed:
+        request += (
+            f"\nThese files passed and are kept as they are, so stay compatible with them: {', '.join(sorted(completed))}"
+        )
+    return request
 
-    for _ in range(retry_count):
-        verification_response = completion(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert in code verification."},
-                {"role": "user", "content": verification_prompt}
-            ]
+def _generation_request(prompt, completed, error, repair=None, remaining=()):
+    """Build the user message, asking only for files that are still missing."""
+    if repair:
+        request = _repair_request(prompt, repair, remaining, completed)
+        if error:
+            request += f"\nError encountered: {error}"
+        return request
+    request = prompt
+    if error:
+        request += f"\nError encountered: {error}"
+    if completed:
+        request += (
+            "\nThese files were already generated and must be kept as they are; "
+            "generate only the remaining files so that they work with them: "
+            f"{json.dumps(completed)}"
         )
-        logger.info(f"Verification response: {verification_response}")
-        if is_valid_verification(verification_response):
-            return True
+    return request
 
-    return False
+def _edit_request(prompt, seed):
+    """Build the user message that adapts a similar prompt's files instead of generating from scratch."""
+    request = (
+        f"{prompt}\nStart from this existing project, written for the similar request \"{seed['prompt']}\". "
+        "Change it only as much as this request needs. Return complete versions of only the files you change; "
+        f"files you leave out are kept as they are.\nCurrent files: {json.dumps(seed['files'])}"
+    )
+    if seed["dependencies"]:
+        request += f"\nExtra npm dependencies it already declares: {json.dumps(seed['dependencies'])}"
+    return request
 
-def generate_code_files(prompt, timeout=320.0, retry_count=3):
+async def _read_function_call_stream(response, parser):
+    """Feed streamed function call arguments to parser, emitting progress and each file as it completes."""
+    parts = []
+    finish_reason = None
+    chunks = 0
+    chars = 0
+    last_progress = 0.0
+    try:
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            function_call = getattr(choice.delta, "function_call", None)
+            if function_call is not None and function_call.arguments:
+                parts.append(function_call.arguments)
+                chunks += 1
+                chars += len(function_call.arguments)
+                for name, entry in parser.feed(function_call.arguments):
+                    if isinstance(entry, dict) and isinstance(entry.get("content"), str):
+                        events.emit("file", name=name, content=entry["content"])
+                now = time.monotonic()
+                if now - last_progress >= PROGRESS_EVENT_INTERVAL:
+                    events.emit("progress", stage="generate", tokens=chunks, chars=chars)
+                    last_progress = now
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+    finally:
+        aclose = getattr(response, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    events.emit("progress", stage="generate", tokens=chunks, chars=chars)
+    return "".join(parts), finish_reason
+
+def _emit_scaffold_files(scaffold, code_files, emitted):
+    """Emit the scaffold's files that are new or changed since they were last emitted."""
+    for name, entry in code_files.items():
+        if name not in scaffold.app_files and emitted.get(name) != entry["content"]:
+            emitted[name] = entry["content"]
+            events.emit("file", name=name, content=entry["content"])
+
+@tracing.traced("generate_code_files")
+async def agenerate_code_files(prompt, timeout=320.0, retry_count=3, seed=None):
+    """Generate, verify and return the project files for prompt. seed, {"prompt", "files"} of a similar
+    prompt's artifact, makes the first attempt an edit of those files.
+
+    Generation builds on a project scaffold (see scaffolds.py): the LLM writes only the scaffold's app files
+    and lists any extra npm dependencies, and the scaffold's boilerplate files are filled in around them.
+    When verification rejects a file set, only the files with findings are sent back with those findings
+    and regenerated; the files that passed are kept."""
+    scaffold = scaffolds.select(prompt)
+    if seed is not None:
+        app_files, seed_dependencies = scaffold.split(seed["files"])
+        seed = {"prompt": seed["prompt"], "files": app_files, "dependencies": seed_dependencies} if app_files else None
+    # Generated app files and the extra npm dependencies they need
+    completed = {}
+    dependencies = {}
+    error = None
+    failure = None
+    # Findings and contents of the files a targeted repair regenerates
+    repair = None
+    emitted = {}
+    events.emit("scaffold", name=scaffold.name, files=list(scaffold.provided_files()))
+    _emit_scaffold_files(scaffold, scaffold.assemble({}, {}), emitted)
     for attempt in range(retry_count):
+        if failure is not None:
+            GENERATION_RETRIES.inc(reason=failure)
+        failure = "error"
+        remaining = [name for name in scaffold.app_files if name not in completed]
+        # Only the first attempt edits the seed; later attempts repair or regenerate as usual
+        editing, seed = seed, None
+        if editing:
+            request = _edit_request(prompt, editing)
+            dependencies = dict(editing["dependencies"])
+        else:
+            request = _generation_request(prompt, completed, error, repair, remaining)
+        events.emit("stage", stage="edit" if editing else "generate", attempt=attempt + 1)
         try:
-            response = completion(
-                model="gpt-4o",
-                messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in generating clean, efficient, and modern code. "
-                        "Generate only the necessary code files based on the given prompt. "
-                        "Ensure the code is fully functional, formatted correctly, and includes all necessary dependencies. "
-                        "Make sure to use correct import paths for all modules, including 'react-dom/client'. "
-                        "Include error handling, comments, and modular code structure where applicable. "
-                        "Provide multiple functionalities and configuration options if relevant. "
-                        "Include detailed comments explaining the purpose and functionality of each section of the code. "
-                        "Adhere to best practices for readability, maintainability, and performance. "
-                        "Use modern JavaScript features and ensure compatibility with the latest standards. "
-                        "Perform recursive self-assessment with three internal loops for code review and improvement. "
-                        "For example, respond with: "
-                        '{"index.js": {"content": "code here"}, "App.css": {"content": "code here"}, "package.json": {"content": "code here"}}'
-                    )
-                },
-                {"role": "user", "content": prompt}
-            ],
-
-                functions=[
-                    {
-                        "name": "generate_code_files",
-                        "description": "Generates code files",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "index.js": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                "App.css": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                "package.json": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                "App.js": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                "README.md": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                ".eslintrc.json": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                },
-                                "babel.config.json": {
-                                    "type": "object",
-                                    "properties": {
-                                        "content": {"type": "string"}
-                                    },
-                                    "required": ["content"]
-                                }
-                            },
-                            "required": ["index.js", "App.css", "package.json", "App.js", "README.md", ".eslintrc.json", "babel.config.json"]
-                        }
-                    }
-                ],
-                function_call="auto",
-                timeout=timeout
-            )
-
-            logger.info(f"Raw response: {response}")
-
-            if response.choices[0].finish_reason == 'function_call':
-                function_response = response.choices[0].message.function_call.arguments
-                if not function_response:
-                    logger.error("Function call returned empty response.")
-                    continue
-
-                # Try to load the function response as JSON
+            if remaining:
+                # Most attempts succeed, so this one gets the rest of the deadline bar time to verify and publish
+                attempt_timeout = deadline.leaving(config.GENERATION_RESERVE, timeout)
+                parser = FunctionArgumentsParser()
+                response = llm_client.astream(
+                    "generate",
+                    messages=scaffold.prompt.messages(request),
+                    functions=[scaffold.function(remaining, partial=bool(editing))],
+                    function_call="auto",
+                    timeout=attempt_timeout
+                )
                 try:
-                    code_files = json.loads(function_response)
-                except json.JSONDecodeError as e:
+                    with tracing.span("generate_attempt", attempt=attempt + 1, files=len(remaining),
+                                      scaffold=scaffold.name, edit=bool(editing)) as attempt_span:
+                        function_response, finish_reason = await asyncio.wait_for(
+                            _read_function_call_stream(response, parser), attempt_timeout)
+                        attempt_span.set_attribute("finish_reason", str(finish_reason))
+                        PAYLOAD_SIZE.observe(len(function_response), kind="generation_response")
+                        if function_response:
+                            parser.close()
+                except StreamParseError as e:
+                    # Keep every file that closed before the error and only ask for the rest
+                    completed.update(_file_entries(parser.entries))
+                    dependencies.update(scaffold.dependencies(parser.entries))
+                    JSON_DECODE_ERRORS.inc(stage="generate")
+                    failure = "parse_error"
                     logger.error(f"JSONDecodeError: {e}")
-                    prompt += f"\nError encountered: {str(e)}"
+                    events.emit("parse_error", stage="generate", attempt=attempt + 1, message=str(e),
+                                position=e.position, kept=sorted(completed))
+                    error = str(e)
                     continue
+                except asyncio.TimeoutError:
+                    completed.update(_file_entries(parser.entries))
+                    dependencies.update(scaffold.dependencies(parser.entries))
+                    failure = "timeout"
+                    logger.error(f"Generation attempt {attempt + 1} timed out after {attempt_timeout:.1f}s")
+                    deadline.check()
+                    continue
+
+                log_payload(logger, "Raw response", function_response)
 
-                # Perform verification
-                if verify_and_refine_code(function_response):
-                    logger.info(f"Verified code files: {code_files}")
-                    return code_files
-                else:
-                    logger.error("Code verification failed after retries.")
+                if finish_reason != 'function_call':
+                    logger.error("No valid function call arguments found in the response")
+                    failure = "no_function_call"
                     continue
+                if not function_response:
+                    logger.error("Function call returned empty response.")
+                    failure = "empty_response"
+                    continue
+                entries = {name: entry for name, entry in parser.entries.items() if name in remaining}
+                dependencies.update(scaffold.dependencies(parser.entries))
+                if editing:
+                    for name, entry in editing["files"].items():
+                        if name not in entries:
+                            events.emit("file", name=name, content=entry.get("content", ""))
+                app_files = {**(editing["files"] if editing else completed), **entries}
+            else:
+                app_files = dict(completed)
+            code_files = scaffold.assemble(app_files, dependencies)
+            _emit_scaffold_files(scaffold, code_files, emitted)
 
-            logger.error("No valid function call arguments found in the response")
+            # Perform verification
+            findings = await averify_code_files(code_files)
+            if not findings:
+                log_payload(logger, "Verified code files", code_files)
+                return code_files
+            logger.error("Code verification failed after retries.")
+            failure = "verification_failed"
+            error = None
+            failing = {finding.file for finding in findings}
+            if config.REPAIR_ENABLED and failing <= set(app_files) and len(failing) < len(app_files):
+                # Keep the files that passed and regenerate only the ones with findings
+                completed = {name: entry for name, entry in app_files.items() if name not in failing}
+                repair = {"findings": findings, "files": {name: app_files[name] for name in failing}}
+                REPAIRED_FILES.inc(len(failing), kind="repaired")
+                REPAIRED_FILES.inc(len(completed), kind="kept")
+                events.emit("repair", files=sorted(failing), kept=sorted(completed),
+                            findings=[str(finding) for finding in findings])
+            else:
+                completed = {}
+                dependencies = {}
+                repair = None
+            continue
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception("An error occurred during code generation")
     return None
@@ -201,12 +418,106 @@ def get_final_sandbox_url(sandbox_id):
         return final_url
     return None
 
-def generate_code(prompt):
-    files = generate_code_files(prompt)
+async def _agenerate_uncached(prompt, key, seed=None):
+    files = await agenerate_code_files(prompt, seed=seed)
     if files:
-        sandbox_info = create_codesandbox(files)
+        sandbox_info = await acreate_codesandbox(files)
         if sandbox_info:
-            final_url = sandbox_info['final_url']
-            print(f"Final URL: {final_url}")  # Print the final URL to the console
-            return final_url
+            artifact = {"files": files, "sandbox": sandbox_info}
+            await result_cache.cache.aset(key, artifact)
+            semantic_cache.index.add(prompt, key, semantic_namespace(prompt))
+            return artifact
+    return None
+
+async def _similar_artifact(prompt, key):
+    """Look up a near-duplicate prompt. Returns (artifact to return as is, or None; seed for an edit, or None).
+
+    A close enough match with the same numbers and negations (see semantic_cache.qualifiers) is reused as is;
+    any other match seeds an edit request that returns only the files it changes."""
+    if not semantic_cache.index.enabled:
+        return None, None
+    match = semantic_cache.index.lookup(prompt, semantic_namespace(prompt), config.SEMANTIC_CACHE_EDIT_THRESHOLD)
+    if match is None or match.key == key:
+        semantic_cache.index.count("miss")
+        return None, None
+    artifact = await result_cache.cache.aget(match.key)
+    if artifact is None:
+        # The artifact expired or was invalidated since the prompt was indexed
+        semantic_cache.index.discard(match.key)
+        semantic_cache.index.count("stale")
+        return None, None
+    # Wording alone is not enough: a different number or negation asks for a different app, so it is an edit
+    if match.score >= config.SEMANTIC_CACHE_THRESHOLD and (
+            semantic_cache.qualifiers(prompt) == semantic_cache.qualifiers(match.prompt)):
+        semantic_cache.index.count("hit")
+        logger.info(f"Semantic cache hit ({match.score:.2f}) for prompt: {prompt}, matched: {match.prompt}")
+        return artifact, None
+    semantic_cache.index.count("seed")
+    logger.info(f"Editing the artifact of a similar prompt ({match.score:.2f}) for prompt: {prompt}, matched: {match.prompt}")
+    events.emit("seed", prompt=match.prompt, score=round(match.score, 3))
+    return None, {"prompt": match.prompt, "files": artifact["files"]}
+
+@tracing.traced("generate_artifact")
+async def agenerate_artifact(prompt):
+    """Generate, verify and publish an artifact, returning its files and sandbox info."""
+    cassette.cassette.record_prompt(prompt)
+    key = artifact_cache_key(prompt)
+    cached = await result_cache.cache.aget(key)
+    if cached:
+        logger.info(f"Result cache hit for prompt: {prompt}")
+        events.emit("cache", hit=True)
+        for name, entry in cached["files"].items():
+            events.emit("file", name=name, content=entry.get("content", ""))
+        events.emit("sandbox", reused=True, **cached["sandbox"])
+        return cached
+
+    similar, seed = await _similar_artifact(prompt, key)
+    if similar:
+        # Not stored under this prompt's key: it was generated for another prompt, and the semantic entry
+        # it came from may be evicted or invalidated
+        events.emit("cache", hit=True, similar=True)
+        for name, entry in similar["files"].items():
+            events.emit("file", name=name, content=entry.get("content", ""))
+        events.emit("sandbox", reused=True, **similar["sandbox"])
+        return similar
+
+    if config.SINGLEFLIGHT_ENABLED:
+        # Identical prompts already being generated share that run instead of starting another
+        return await singleflight.group.do(key, lambda: _agenerate_uncached(prompt, key, seed))
+    return await _agenerate_uncached(prompt, key, seed)
+
+async def agenerate_code(prompt):
+    artifact = await agenerate_artifact(prompt)
+    if artifact:
+        final_url = artifact['sandbox']['final_url']
+        print(f"Final URL: {final_url}")  # Print the final URL to the console
+        return final_url
     return None
+
+# Synchronous wrappers for scripts and other callers without a running event loop.
+
+def _run_sync(coro):
+    """Run a coroutine to completion, closing the shared sandbox client bound to its loop. The pipeline is
+    asynchronous (llm_client awaits Litellm's acompletion behind the shared LLM scheduler), so scripts
+    without a running event loop go through here."""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await sandbox_client.shutdown()
+    return asyncio.run(runner())
+
+def create_codesandbox(files):
+    return _run_sync(acreate_codesandbox(files))
+
+def verify_and_refine_code(function_response, retry_count=3):
+    return _run_sync(averify_and_refine_code(function_response, retry_count=retry_count))
+
+def generate_code_files(prompt, timeout=320.0, retry_count=3):
+    return _run_sync(agenerate_code_files(prompt, timeout=timeout, retry_count=retry_count))
+
+def generate_artifact(prompt):
+    return _run_sync(agenerate_artifact(prompt))
+
+def generate_code(prompt):
+    return _run_sync(agenerate_code(prompt))
@@ -0,0 +1,29 @@
+# events.py file that carries pipeline progress events from the code generator to whoever is listening. A caller subscribes a callback for the duration of a pipeline run; because the sink lives in a context variable, tasks spawned by the pipeline inherit it and emit without threading a callback through every function. Emitting with no subscriber is a no-op, so the plain /generate path pays nothing.
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+EventSink = Callable[[str, Dict[str, Any]], None]
+
+_sink: contextvars.ContextVar[Optional[EventSink]] = contextvars.ContextVar("pipeline_event_sink", default=None)
+
+def emit(event: str, **data: Any) -> None:
+    """Send an event to the current subscriber, if any."""
+    sink = _sink.get()
+    if sink is not None:
+        sink(event, data)
+
+def has_subscriber() -> bool:
+    return _sink.get() is not None
+
+def current_sink() -> Optional[EventSink]:
+    return _sink.get()
+
+@contextmanager
+def subscribe(sink: EventSink):
+    """Route events emitted in this context to sink."""
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
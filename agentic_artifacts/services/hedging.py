@@ -0,0 +1,122 @@
+# hedging.py file that implements hedged LLM requests. llm_client runs every call through hedger.run: once a call has been dispatched (it holds a scheduler slot) and has not produced its response, or its first chunk when streaming, within the stage and model's adaptive deadline, a duplicate request is fired and whichever succeeds first is used while the other is cancelled. The deadline is a high percentile (AGENTIC_LLM_HEDGE_PERCENTILE) of the recent latencies observed for the stage and model, never below AGENTIC_LLM_HEDGE_MIN_DELAY; until enough latencies are known, calls are not hedged. Hedges are paid for from a budget that every call adds AGENTIC_LLM_HEDGE_MAX_RATE to, so at most that fraction of calls (plus a small burst) is duplicated.
+import asyncio
+import logging
+import math
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+HEDGES = registry.counter("agentic_llm_hedges_total", "Duplicate LLM requests fired after the hedge deadline", ["stage", "model"])
+HEDGES_DENIED = registry.counter(
+    "agentic_llm_hedges_denied_total", "LLM calls past the hedge deadline that the hedge budget did not cover", ["stage", "model"])
+HEDGE_WINS = registry.counter(
+    "agentic_llm_hedge_wins_total", "Hedged LLM calls by which request answered first", ["stage", "model", "winner"])
+
+Key = Tuple[str, str]
+# Called with an event the call sets once it is dispatched; returns the awaitable to race
+Launch = Callable[[asyncio.Event], Awaitable[Any]]
+
+async def _until_dispatched(dispatched: asyncio.Event, task: asyncio.Future):
+    """Wait until the call has been dispatched (or has already finished)."""
+    waiter = asyncio.ensure_future(dispatched.wait())
+    try:
+        await asyncio.wait({waiter, task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+
+class Hedger:
+    def __init__(self, enabled=True, percentile=95.0, max_rate=0.05, burst=5, min_samples=20,
+                 min_delay=0.5, window=200):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.burst = float(burst)
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self._budget = float(burst)
+        self._latencies: Dict[Key, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: Key, latency):
+        """Record the time from dispatch to response (or first chunk) for a call."""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def delay(self, key: Key) -> Optional[float]:
+        """Seconds after dispatch before a call is hedged, or None while too few latencies are known."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(self.percentile / 100.0 * len(samples)) - 1))
+        return max(self.min_delay, samples[index])
+
+    def _earn(self):
+        with self._lock:
+            self._budget = min(self.burst, self._budget + self.max_rate)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
+
+    async def run(self, key: Key, launch: Launch) -> Tuple[int, Any]:
+        """Run launch, hedging it with a second launch if it is slow. Returns (index of the winner, its result);
+        the loser is cancelled. Raises the first error when every launched call fails."""
+        self._earn()
+        delay = self.delay(key)
+        dispatched = asyncio.Event()
+        tasks = [asyncio.ensure_future(launch(dispatched))]
+        try:
+            if delay is not None:
+                await _until_dispatched(dispatched, tasks[0])
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self._spend():
+                        HEDGES.inc(stage=key[0], model=key[1])
+                        logger.info(f"Hedging {key[0]} call to {key[1]} after {delay:.2f}s")
+                        tasks.append(asyncio.ensure_future(launch(asyncio.Event())))
+                    else:
+                        HEDGES_DENIED.inc(stage=key[0], model=key[1])
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for index, task in enumerate(tasks):
+                    if task not in done:
+                        continue
+                    if task.exception() is None:
+                        if len(tasks) > 1:
+                            HEDGE_WINS.inc(stage=key[0], model=key[1], winner="primary" if index == 0 else "hedge")
+                        return index, task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                # Let cancelled calls release their scheduler slots before returning
+                await asyncio.gather(*losers, return_exceptions=True)
+
+hedger = Hedger(
+    enabled=config.LLM_HEDGE_ENABLED,
+    percentile=config.LLM_HEDGE_PERCENTILE,
+    max_rate=config.LLM_HEDGE_MAX_RATE,
+    burst=config.LLM_HEDGE_BURST,
+    min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+    min_delay=config.LLM_HEDGE_MIN_DELAY,
+)
@@ -0,0 +1,272 @@
+# jobs.py file that implements the background job subsystem for artifact generation. POST /jobs stores a job and returns its id immediately; a bounded pool of worker tasks pulls job ids from an in-process queue and runs the generation pipeline, recording partial results (current stage, files as they complete) and the final sandbox URLs in a SQLite store. Partial results of running jobs are kept in memory and written to the store at most every AGENTIC_JOB_PARTIAL_FLUSH_INTERVAL seconds and on status changes, so streamed events do not each commit to SQLite. All SQLite work runs on the store's own writer thread, never on the event loop. Jobs that were queued or running when the process stopped are re-queued on startup, so restarts do not lose work.
+import asyncio
+import functools
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from agentic_artifacts.services import events, usage
+from agentic_artifacts.services.code_generator import agenerate_artifact
+from agentic_artifacts.utils import config, deadline
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Events whose payload is worth persisting as partial progress
+_PARTIAL_EVENTS = ("stage", "file", "verification", "parse_error", "sandbox", "cache")
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its configured depth."""
+
+class JobStore:
+    """SQLite-backed persistence for job records. The a-prefixed methods run the blocking ones on a single
+    writer thread in submission order and return awaitables."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, method, *args, **kwargs) -> asyncio.Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        return asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    def aopen(self):
+        return self._submit(self.open)
+
+    async def aclose(self):
+        if self._executor is None:
+            return
+        await self._submit(self.close)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def acreate(self, prompt):
+        return self._submit(self.create, prompt)
+
+    def aupdate(self, job_id, **fields):
+        # JSON is encoded now, so later changes to a partial result do not race with the write
+        return self._submit(self._write_update, job_id, self._encode(fields))
+
+    def aget(self, job_id):
+        return self._submit(self.get, job_id)
+
+    def apending(self):
+        return self._submit(self.pending)
+
+    def open(self):
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " prompt TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " partial TEXT,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def create(self, prompt):
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO jobs (id, prompt, status, created_at, updated_at, partial) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, prompt, QUEUED, now, now, json.dumps({})),
+        )
+        self._conn.commit()
+        return job_id
+
+    @staticmethod
+    def _encode(fields):
+        fields["updated_at"] = time.time()
+        for name in ("partial", "result"):
+            if name in fields and fields[name] is not None:
+                fields[name] = json.dumps(fields[name])
+        return fields
+
+    def update(self, job_id, **fields):
+        self._write_update(job_id, self._encode(fields))
+
+    def _write_update(self, job_id, fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        self._conn.commit()
+
+    def get(self, job_id) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "prompt": row["prompt"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "partial": json.loads(row["partial"]) if row["partial"] else {},
+        }
+        if row["result"]:
+            result = json.loads(row["result"])
+            job["preview_url"] = result["sandbox"]["final_url"]
+            job["sandbox"] = result["sandbox"]
+            job["files"] = result["files"]
+        if row["error"]:
+            job["error"] = row["error"]
+        return job
+
+    def pending(self):
+        """Ids of jobs that were queued or interrupted mid-run, oldest first."""
+        rows = self._conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+class JobQueue:
+    """Bounded in-process queue of job ids drained by a fixed pool of worker tasks."""
+
+    def __init__(self, store, workers=4, max_depth=100):
+        self.store = store
+        self.worker_count = workers
+        self.max_depth = max_depth
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._running = 0
+        # Submissions between the depth check and the job entering the queue
+        self._submitting = 0
+        # job id -> partial result of running jobs, newer than what the store holds
+        self._partials: Dict[str, Dict[str, Any]] = {}
+
+    async def start(self):
+        await self.store.aopen()
+        self._queue = asyncio.Queue()
+        recovered = await self.store.apending()
+        for job_id in recovered:
+            self.store.aupdate(job_id, status=QUEUED)
+            self._queue.put_nowait(job_id)
+        if recovered:
+            logger.info(f"Re-queued {len(recovered)} jobs from the job store")
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.store.aclose()
+
+    async def submit(self, prompt):
+        """Persist a new job and queue it. Raises QueueFullError when the queue is at max depth."""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.qsize() + self._submitting >= self.max_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting)")
+        self._submitting += 1
+        try:
+            job_id = await self.store.acreate(prompt)
+        finally:
+            self._submitting -= 1
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id):
+        job = await self.store.aget(job_id)
+        partial = self._partials.get(job_id)
+        if job is not None and partial is not None:
+            job["partial"] = json.loads(json.dumps(partial))
+        return job
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "workers": self.worker_count,
+            "max_depth": self.max_depth,
+        }
+
+    async def _worker(self, number):
+        while True:
+            job_id = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Worker {number} failed while running job {job_id}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id):
+        job = await self.store.aget(job_id)
+        if job is None:
+            return
+        partial: Dict[str, Any] = {"files": {}}
+        self.store.aupdate(job_id, status=RUNNING, partial=partial)
+        self._partials[job_id] = partial
+        flushed = time.monotonic()
+
+        def sink(event, data):
+            nonlocal flushed
+            if event not in _PARTIAL_EVENTS:
+                return
+            if event == "file":
+                partial["files"][data["name"]] = {"content": data["content"]}
+            elif event == "stage":
+                partial["stage"] = data["stage"]
+            else:
+                partial[event] = data
+            # Readers get the in-memory copy; the store only needs it often enough to survive a restart
+            if time.monotonic() - flushed >= config.JOB_PARTIAL_FLUSH_INTERVAL:
+                flushed = time.monotonic()
+                self.store.aupdate(job_id, partial=partial)
+
+        try:
+            with events.subscribe(sink), usage.track(job_id) as job_usage:
+                try:
+                    with deadline.within(config.REQUEST_DEADLINE, endpoint="job"):
+                        artifact = await agenerate_artifact(job["prompt"])
+                except Exception as e:
+                    logger.exception(f"Job {job_id} failed")
+                    await self.store.aupdate(job_id, status=FAILED, partial=partial, error=str(e))
+                    return
+            if artifact:
+                await self.store.aupdate(job_id, status=SUCCEEDED, partial=partial,
+                                  result={**artifact, "usage": job_usage.summary()})
+            else:
+                await self.store.aupdate(job_id, status=FAILED, partial=partial, error="Failed to generate code")
+        finally:
+            self._partials.pop(job_id, None)
+
+queue = JobQueue(
+    JobStore(os.path.join(config.CACHE_DIR, "jobs.sqlite3")),
+    workers=config.JOB_WORKERS,
+    max_depth=config.JOB_QUEUE_MAX_DEPTH,
+)
+
+async def startup():
+    await queue.start()
+
+async def shutdown():
+    await queue.stop()
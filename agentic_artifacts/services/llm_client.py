@@ -0,0 +1,190 @@
+# llm_client.py file that is the single entry point for LLM calls. Every completion in the app (generation, verification, /plan and /overview) goes through acomplete or astream with the name of the pipeline stage making the call, so scheduling, rate limiting and model routing apply uniformly. Calls normally leave the model to the router (services/model_router.py), which orders the stage's configured models by health; a failed call is retried on the next one. Calls slow to answer are hedged with a duplicate request (services/hedging.py). Stages map onto scheduler lanes; token use is estimated up front for the token bucket and corrected with the usage the provider reports, which is also passed to the usage module for per-request, per-stage and per-model accounting (streams ask for it with stream_options include_usage). The completion backend defaults to litellm's acompletion and can be swapped with set_backend, which the benchmark harness uses to run the real pipeline against a fake provider.
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from litellm import acompletion
+
+from agentic_artifacts.services import usage as usage_accounting
+from agentic_artifacts.services.hedging import hedger
+from agentic_artifacts.services.llm_scheduler import scheduler
+from agentic_artifacts.services.model_router import FAILOVERS, router
+from agentic_artifacts.utils import deadline, tracing
+
+logger = logging.getLogger(__name__)
+
+STAGE_LANES = {
+    "generate": "generate",
+    "verify": "verify",
+    "plan": "interactive",
+    "overview": "interactive",
+}
+
+# Rough output sizes used when a call does not set max_tokens
+EXPECTED_OUTPUT_TOKENS = {
+    "generate": 4000,
+    "verify": 200,
+    "plan": 1000,
+    "overview": 1000,
+}
+
+# Returned for a stream that ends before its first chunk
+_END = object()
+
+Backend = Callable[..., Awaitable[Any]]
+
+_backend: Optional[Backend] = None
+
+def set_backend(backend: Optional[Backend]) -> Optional[Backend]:
+    """Route completions to backend (same signature as litellm.acompletion); None restores litellm. Returns the previous backend."""
+    global _backend
+    previous = _backend
+    _backend = backend
+    return previous
+
+def get_backend() -> Backend:
+    return _backend or acompletion
+
+def estimate_tokens(stage, kwargs: Dict[str, Any]) -> int:
+    """Estimate prompt plus completion tokens for a call (about four characters per token)."""
+    prompt_chars = len(json.dumps(kwargs.get("messages", []))) + len(json.dumps(kwargs.get("functions", [])))
+    output = kwargs.get("max_tokens") or EXPECTED_OUTPUT_TOKENS.get(stage, 1000)
+    return prompt_chars // 4 + output
+
+def _with_deadline(kwargs):
+    """Cap the call's timeout at the time left before the request deadline."""
+    limit = deadline.timeout(kwargs.get("timeout"))
+    return {**kwargs, "timeout": limit} if limit is not None else kwargs
+
+def _usage_tokens(usage):
+    if usage is None:
+        return None
+    total = getattr(usage, "total_tokens", None)
+    if total is None and isinstance(usage, dict):
+        total = usage.get("total_tokens")
+    return total
+
+async def _acomplete_once(stage, lane, kwargs, dispatched: Optional[asyncio.Event] = None):
+    model = kwargs["model"]
+    with tracing.span(f"llm.{stage}", model=str(model)):
+        async with scheduler.slot(lane, estimate_tokens(stage, kwargs)) as slot:
+            if dispatched is not None:
+                dispatched.set()
+            started = time.monotonic()
+            try:
+                response = await get_backend()(**kwargs)
+            except Exception:
+                router.observe(stage, model, ok=False)
+                raise
+            latency = time.monotonic() - started
+            router.observe(stage, model, latency)
+            hedger.observe((stage, model), latency)
+            usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+            slot.tokens = _usage_tokens(usage)
+            usage_accounting.record(stage, model, usage, latency)
+            return response
+
+async def acomplete(stage: str, **kwargs):
+    """Run a non-streaming completion for stage through the scheduler. Unless kwargs names a model,
+    the router's models for the stage are tried in turn until one succeeds. Each call is hedged:
+    if it is slow to answer a duplicate is sent and the first answer is used."""
+    lane = STAGE_LANES.get(stage, "interactive")
+    models = [kwargs.pop("model")] if "model" in kwargs else router.candidates(stage)
+    for index, model in enumerate(models):
+        attempt_kwargs = _with_deadline({**kwargs, "model": model})
+        try:
+            _, response = await deadline.bound(hedger.run(
+                (stage, model), lambda dispatched: _acomplete_once(stage, lane, attempt_kwargs, dispatched)))
+            return response
+        except Exception as e:
+            if index == len(models) - 1 or isinstance(e, deadline.DeadlineExceeded):
+                raise
+            FAILOVERS.inc(stage=stage, model=model)
+            logger.warning(f"{stage} call to {model} failed ({e}); trying {models[index + 1]}")
+
+async def _astream_once(stage, lane, kwargs, dispatched: Optional[asyncio.Event] = None):
+    model = kwargs["model"]
+    # Not activated: the generator is suspended at every yield and may be closed from another context
+    with tracing.span(f"llm.{stage}", activate=False, model=str(model), stream=True) as span:
+        async with scheduler.slot(lane, estimate_tokens(stage, kwargs)) as slot:
+            if dispatched is not None:
+                dispatched.set()
+            started = time.monotonic()
+            chunks = 0
+            reported = None
+            finished = False
+            try:
+                response = await get_backend()(stream=True, **kwargs)
+            except Exception:
+                router.observe(stage, model, ok=False)
+                raise
+            try:
+                async for chunk in response:
+                    chunks += 1
+                    if chunks == 1:
+                        hedger.observe((stage, model), time.monotonic() - started)
+                    usage = getattr(chunk, "usage", None)
+                    if usage:
+                        reported = usage
+                        slot.tokens = _usage_tokens(usage)
+                    yield chunk
+                finished = True
+            except Exception:
+                router.observe(stage, model, ok=False)
+                raise
+            finally:
+                span.set_attribute("chunks", chunks)
+                latency = time.monotonic() - started
+                if finished:
+                    router.observe(stage, model, latency)
+                # Usage arrives in the last chunk, so streams closed early go unaccounted
+                usage_accounting.record(stage, model, reported, latency)
+                aclose = getattr(response, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+async def _first_chunk(stream):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+async def astream(stage: str, **kwargs) -> AsyncIterator[Any]:
+    """Run a streaming completion for stage, holding its scheduler slot until the stream ends. Unless
+    kwargs names a model, a stream that fails before its first chunk is retried on the router's next model.
+    A stream slow to send its first chunk is hedged with a duplicate; the one that starts first is kept."""
+    lane = STAGE_LANES.get(stage, "interactive")
+    kwargs.setdefault("stream_options", {"include_usage": True})
+    models = [kwargs.pop("model")] if "model" in kwargs else router.candidates(stage)
+    for index, model in enumerate(models):
+        attempt_kwargs = _with_deadline({**kwargs, "model": model})
+        streams = []
+
+        def launch(dispatched):
+            stream = _astream_once(stage, lane, attempt_kwargs, dispatched)
+            streams.append(stream)
+            return _first_chunk(stream)
+
+        try:
+            try:
+                winner, chunk = await deadline.bound(hedger.run((stage, model), launch))
+            except Exception as e:
+                if index == len(models) - 1 or isinstance(e, deadline.DeadlineExceeded):
+                    raise
+                FAILOVERS.inc(stage=stage, model=model)
+                logger.warning(f"{stage} stream from {model} failed ({e}); trying {models[index + 1]}")
+                continue
+            if chunk is _END:
+                return
+            yield chunk
+            async for chunk in streams[winner]:
+                yield chunk
+            return
+        finally:
+            # Release scheduler slots now rather than when the generators are collected. A stream still
+            # running belongs to a hedge task being cancelled, which closes it as it unwinds.
+            for stream in streams:
+                if not stream.ag_running:
+                    await stream.aclose()
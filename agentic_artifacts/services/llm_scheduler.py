@@ -0,0 +1,241 @@
+# llm_scheduler.py file that implements the central scheduler every LLM call goes through. It enforces token-bucket limits on requests per minute and estimated tokens per minute, adapts its concurrency limit AIMD-style (additive increase on healthy calls, multiplicative decrease on 429s and on latency well above the lane's running average, with a dispatch pause after a 429) and dispatches waiting calls by lane priority with aging, so generation goes first without starving verification. snapshot() exposes live queue and limit gauges.
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from agentic_artifacts.utils import config
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first. Waiting calls gain one priority level per LLM_PRIORITY_AGING seconds.
+LANE_PRIORITIES = {
+    "interactive": 0,
+    "generate": 1,
+    "verify": 2,
+}
+
+class TokenBucket:
+    """Refilling bucket holding up to one minute of budget. A rate of 0 disables the limit."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def delay(self, amount):
+        """Seconds until amount can be taken (requests larger than capacity wait for a full bucket)."""
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed * 60.0 / self.per_minute)
+
+    def take(self, amount):
+        if self.per_minute <= 0:
+            return
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Charge (positive) or refund (negative) the difference between estimated and actual use."""
+        if self.per_minute <= 0:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+class _Waiter:
+    __slots__ = ("lane", "priority", "tokens", "future", "enqueued_at")
+
+    def __init__(self, lane, tokens, future):
+        self.lane = lane
+        self.priority = LANE_PRIORITIES.get(lane, max(LANE_PRIORITIES.values()))
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class Slot:
+    """Handle for an admitted call; set tokens to the actual usage once known."""
+
+    def __init__(self, lane, estimated_tokens):
+        self.lane = lane
+        self.estimated_tokens = estimated_tokens
+        self.tokens: Optional[int] = None
+
+class LLMScheduler:
+    def __init__(self, max_rpm=0, max_tpm=0, initial_concurrency=8, min_concurrency=1,
+                 max_concurrency=64, latency_tolerance=2.0, aging=10.0, rate_limit_backoff=2.0):
+        self.requests = TokenBucket(max_rpm)
+        self.tokens = TokenBucket(max_tpm)
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.aging = aging
+        self.rate_limit_backoff = rate_limit_backoff
+        self.in_flight = 0
+        self._waiting: List[_Waiter] = []
+        # Pending dispatch timer and the loop it runs on; the sync wrappers run each call on a fresh loop
+        self._timer: Optional[Tuple[asyncio.TimerHandle, asyncio.AbstractEventLoop]] = None
+        self._paused_until = 0.0
+        self._latency: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    # Dispatch
+
+    def _effective_priority(self, waiter, now):
+        return waiter.priority - (now - waiter.enqueued_at) / self.aging
+
+    def _schedule(self, delay):
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            timer, timer_loop = self._timer
+            if timer_loop is loop and not timer.cancelled():
+                return
+            # Left over from a loop that is closed or no longer running; it would never fire here
+            timer.cancel()
+
+        def fire():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = (loop.call_later(delay, fire), loop)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule(self._paused_until - now)
+            return
+        while self._waiting and self.in_flight < int(self.limit):
+            waiter = min(self._waiting, key=lambda w: self._effective_priority(w, now))
+            delay = max(self.requests.delay(1), self.tokens.delay(waiter.tokens))
+            if delay > 0:
+                self._schedule(delay)
+                return
+            self._waiting.remove(waiter)
+            if waiter.future.done():
+                continue
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, lane, tokens):
+        waiter = _Waiter(lane, tokens, asyncio.get_running_loop().create_future())
+        self._waiting.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just before the cancel landed; give the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+    # Feedback
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        # At most one multiplicative decrease per second so a burst of 429s is one signal
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+
+    def release(self, slot, latency, outcome="ok", retry_after=None):
+        """Return a slot. outcome is "ok", "rate_limited", "failed" or "aborted" (cancelled or closed early)."""
+        self.in_flight -= 1
+        if slot.tokens is not None:
+            self.tokens.adjust(slot.tokens - slot.estimated_tokens)
+        if outcome == "rate_limited":
+            self.rate_limited += 1
+            self._decrease(0.5)
+            backoff = retry_after if retry_after is not None else self.rate_limit_backoff
+            self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+            logger.warning(f"LLM rate limited; concurrency limit now {int(self.limit)}, pausing {backoff:.1f}s")
+        elif outcome == "failed":
+            self.failed += 1
+        elif outcome == "ok":
+            self.completed += 1
+            average = self._latency.get(slot.lane)
+            if average is not None and latency > average * self.latency_tolerance:
+                self._decrease(0.9)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+            self._latency[slot.lane] = latency if average is None else 0.8 * average + 0.2 * latency
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, lane, estimated_tokens):
+        """Admit one call in lane, release it on exit and feed its outcome back into the limits."""
+        await self.acquire(lane, estimated_tokens)
+        slot = Slot(lane, estimated_tokens)
+        started = time.monotonic()
+        outcome = "ok"
+        retry_after = None
+        try:
+            yield slot
+        except Exception as e:
+            outcome = "rate_limited" if getattr(e, "status_code", None) == 429 else "failed"
+            retry_after = _retry_after(e)
+            raise
+        except BaseException:
+            # Cancellation or an early close of a stream says nothing about provider health
+            outcome = "aborted"
+            raise
+        finally:
+            self.release(slot, time.monotonic() - started, outcome, retry_after)
+
+    def snapshot(self):
+        now = time.monotonic()
+        waiting = {lane: 0 for lane in LANE_PRIORITIES}
+        for waiter in self._waiting:
+            waiting[waiter.lane] = waiting.get(waiter.lane, 0) + 1
+        return {
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": waiting,
+            "paused_for": max(0.0, self._paused_until - now),
+            "requests_available": round(self.requests.level, 1) if self.requests.per_minute else None,
+            "tokens_available": round(self.tokens.level) if self.tokens.per_minute else None,
+            "max_rpm": self.requests.per_minute,
+            "max_tpm": self.tokens.per_minute,
+            "lane_latency": {lane: round(value, 3) for lane, value in self._latency.items()},
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+        }
+
+def _retry_after(error) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+scheduler = LLMScheduler(
+    max_rpm=config.LLM_MAX_RPM,
+    max_tpm=config.LLM_MAX_TPM,
+    initial_concurrency=config.LLM_INITIAL_CONCURRENCY,
+    min_concurrency=config.LLM_MIN_CONCURRENCY,
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    latency_tolerance=config.LLM_LATENCY_TOLERANCE,
+    aging=config.LLM_PRIORITY_AGING,
+    rate_limit_backoff=config.LLM_RATE_LIMIT_BACKOFF,
+)
@@ -0,0 +1,141 @@
+# model_router.py file that decides which model each LLM call uses. Every pipeline stage has an ordered list of models in utils/config (AGENTIC_LLM_MODELS_<STAGE>). Each stage defaults to gpt-4o alone; a deployment can opt into, for example, a small fast model first for verification and planning. llm_client asks the router for the stage's candidates and tries them in order, falling over to the next model when a call fails. The router keeps a rolling window of latencies and outcomes per stage and model; a model whose error rate or p90 latency over the window goes above the configured limits is moved to the back of the list for a cooldown, after which it is tried again with a fresh window.
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+FAILOVERS = registry.counter(
+    "agentic_llm_failovers_total", "LLM calls retried on the next model, by the model that failed", ["stage", "model"])
+COOLDOWNS = registry.counter(
+    "agentic_llm_model_cooldowns_total", "Models taken out of rotation for being slow or failing", ["stage", "model", "reason"])
+
+def _p90(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.9 * len(ordered)) - 1)]
+
+class ModelStats:
+    """Rolling latency and outcome window for one model on one stage."""
+
+    def __init__(self, window):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def p90(self) -> Optional[float]:
+        return _p90(self.latencies) if self.latencies else None
+
+class ModelRouter:
+    def __init__(self, stage_models: Dict[str, List[str]], latency_budgets: Dict[str, float], window=50,
+                 min_samples=5, max_error_rate=0.5, cooldown=60.0, default_models=("gpt-4o",)):
+        self.stage_models = {stage: list(models) for stage, models in stage_models.items()}
+        self.latency_budgets = dict(latency_budgets)
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.default_models = list(default_models)
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def models(self, stage) -> List[str]:
+        """The models configured for stage, in order."""
+        return self.stage_models.get(stage) or self.default_models
+
+    def _get(self, stage, model) -> ModelStats:
+        stats = self._stats.get((stage, model))
+        if stats is None:
+            stats = self._stats[(stage, model)] = ModelStats(self.window)
+        return stats
+
+    def candidates(self, stage) -> List[str]:
+        """Models to try for stage: the configured order, with models cooling down moved to the back."""
+        now = time.monotonic()
+        with self._lock:
+            ready = []
+            cooling = []
+            for model in self.models(stage):
+                stats = self._stats.get((stage, model))
+                if stats is not None and stats.cooldown_until > now:
+                    cooling.append((stats.cooldown_until, model))
+                else:
+                    ready.append(model)
+        return ready + [model for _, model in sorted(cooling)]
+
+    def select(self, stage) -> str:
+        return self.candidates(stage)[0]
+
+    def observe(self, stage, model, latency=None, ok=True):
+        """Record a finished call. latency is None for calls whose duration says nothing about the model."""
+        with self._lock:
+            stats = self._get(stage, model)
+            stats.calls += 1
+            stats.outcomes.append(ok)
+            if not ok:
+                stats.errors += 1
+            elif latency is not None:
+                stats.latencies.append(latency)
+            reason = None
+            budget = self.latency_budgets.get(stage)
+            if len(stats.outcomes) >= self.min_samples and stats.error_rate() > self.max_error_rate:
+                reason = "errors"
+            elif budget and len(stats.latencies) >= self.min_samples and stats.p90() > budget:
+                reason = "slow"
+            if reason is None:
+                return
+            stats.cooldown_until = time.monotonic() + self.cooldown
+            # Judge the model afresh once the cooldown is over
+            stats.latencies.clear()
+            stats.outcomes.clear()
+        COOLDOWNS.inc(stage=stage, model=model, reason=reason)
+        logger.warning(f"Model {model} is {'failing' if reason == 'errors' else 'slow'} for stage {stage}; "
+                       f"trying other models first for {self.cooldown:.0f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        stages = {}
+        with self._lock:
+            for stage in sorted(set(self.stage_models) | {stage for stage, _ in self._stats}):
+                rows = []
+                for model in self.models(stage):
+                    stats = self._stats.get((stage, model)) or ModelStats(self.window)
+                    p90 = stats.p90()
+                    rows.append({
+                        "model": model,
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "error_rate": round(stats.error_rate(), 3),
+                        "p90_latency": round(p90, 3) if p90 is not None else None,
+                        "cooldown_for": round(max(0.0, stats.cooldown_until - now), 1),
+                    })
+                stages[stage] = {"latency_budget": self.latency_budgets.get(stage), "models": rows}
+        return stages
+
+router = ModelRouter(
+    config.LLM_MODELS,
+    config.LLM_LATENCY_BUDGETS,
+    window=config.LLM_ROUTER_WINDOW,
+    min_samples=config.LLM_ROUTER_MIN_SAMPLES,
+    max_error_rate=config.LLM_ROUTER_MAX_ERROR_RATE,
+    cooldown=config.LLM_ROUTER_COOLDOWN,
+)
+
+def _router_metrics():
+    now = time.monotonic()
+    with router._lock:
+        items = list(router._stats.items())
+    yield ("agentic_llm_model_available", "gauge", "1 when a model is in rotation for a stage, 0 while it cools down",
+           [({"stage": stage, "model": model}, 0 if stats.cooldown_until > now else 1) for (stage, model), stats in items])
+
+registry.add_collector(_router_metrics)
@@ -0,0 +1,124 @@
+# prompts.py file that is the registry of the prompts and function schemas sent to the LLM. Each stage's system message is built once at import and frozen, and generation function schemas are built once per file list and cached, so every request sends byte-identical static content instead of rebuilding it. Project scaffolds register their own generation prompts here as well. Messages are ordered so that this static part comes first (the system message holds all fixed instructions, including the verification checklist) and the request's own content (prompt, files to check, findings) comes last in the user message; providers that cache prompt prefixes, such as OpenAI, can then reuse the cached prefix across requests. The cached-token share they report is accounted in the usage module.
+import copy
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+class FrozenDict(dict):
+    """A dict that cannot be changed in place. Copies (copy.copy, copy.deepcopy, pickling) are plain dicts."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Prompt registry entries are frozen")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+def freeze(value):
+    """Recursively turn dicts into FrozenDicts and lists into tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class Prompt:
+    """A stage's frozen system message; messages() appends the variable user content after it."""
+    __slots__ = ("name", "system", "system_message")
+
+    def __init__(self, name, system):
+        self.name = name
+        self.system = system
+        self.system_message = freeze({"role": "system", "content": system})
+
+    def messages(self, user_content) -> List[Dict[str, Any]]:
+        return [self.system_message, {"role": "user", "content": user_content}]
+
+# Files the generation function call must produce
+FILE_NAMES: Tuple[str, ...] = ("index.js", "App.css", "package.json", "App.js", "README.md", ".eslintrc.json", "babel.config.json")
+
+GENERATE = Prompt("generate", (
+    "You are an expert in generating clean, efficient, and modern code. "
+    "Generate only the necessary code files based on the given prompt. "
+    "Ensure the code is fully functional, formatted correctly, and includes all necessary dependencies. "
+    "Make sure to use correct import paths for all modules, including 'react-dom/client'. "
+    "Include error handling, comments, and modular code structure where applicable. "
+    "Provide multiple functionalities and configuration options if relevant. "
+    "Include detailed comments explaining the purpose and functionality of each section of the code. "
+    "Adhere to best practices for readability, maintainability, and performance. "
+    "Use modern JavaScript features and ensure compatibility with the latest standards. "
+    "Perform recursive self-assessment with three internal loops for code review and improvement. "
+    "For example, respond with: "
+    '{"index.js": {"content": "code here"}, "App.css": {"content": "code here"}, "package.json": {"content": "code here"}}'
+))
+
+VERIFY = Prompt("verify", (
+    "You are an expert in code verification. "
+    "Please verify that the code files in the user's message are correct and functional. "
+    "Respond with 'VALID' if the code is correct or 'INVALID' if there are issues. "
+    "Evaluate the code for the following aspects: "
+    "1. Correctness: Ensure the code does what is expected based on the prompt. "
+    "2. Functionality: Verify that the code runs without errors and performs the intended task. "
+    "3. Completeness: Check that all necessary files and dependencies are included. "
+    "4. Formatting: Ensure the code is properly formatted and adheres to coding standards. "
+    "5. Syntax: Verify that there are no syntax errors in the code. "
+    "6. Best Practices: Ensure the code follows best practices for readability, maintainability, and performance. "
+    "7. Deployment: Confirm that the code is ready to be deployed to CodeSandbox and includes necessary configurations. "
+    "If the answer is 'INVALID', follow it with one line per problem in the form '<file name>: <problem>'."
+))
+
+PLAN = Prompt("plan", "You are an expert in software planning.")
+
+OVERVIEW = Prompt("overview", "You are an expert in software implementation.")
+
+PROMPTS: Dict[str, Prompt] = {prompt.name: prompt for prompt in (GENERATE, VERIFY, PLAN, OVERVIEW)}
+
+def get(name) -> Prompt:
+    return PROMPTS[name]
+
+def register(prompt: Prompt) -> Prompt:
+    PROMPTS[prompt.name] = prompt
+    return prompt
+
+# Function call argument holding the npm packages the generated files need beyond the scaffold's own
+DEPENDENCIES = "dependencies"
+
+@lru_cache(maxsize=None)
+def _generation_function(filenames: Tuple[str, ...], dependencies: bool, partial: bool):
+    properties = {
+        name: {
+            "type": "object",
+            "properties": {
+                "content": {"type": "string"}
+            },
+            "required": ["content"]
+        }
+        for name in filenames
+    }
+    if dependencies:
+        properties[DEPENDENCIES] = {
+            "type": "object",
+            "description": "npm packages the files import beyond the scaffold's, as package name to version range",
+            "additionalProperties": {"type": "string"}
+        }
+    return freeze({
+        "name": "generate_code_files",
+        "description": "Generates code files",
+        "parameters": {
+            "type": "object",
+            "properties": properties,
+            "required": [] if partial else list(filenames)
+        }
+    })
+
+def generation_function(filenames: Sequence[str], dependencies=False, partial=False):
+    """The frozen generate_code_files function schema requiring the given files, built once per file list.
+    With dependencies, the schema also takes an optional dependencies object; with partial, every file is optional."""
+    return _generation_function(tuple(filenames), bool(dependencies), bool(partial))
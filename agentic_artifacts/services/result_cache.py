@@ -0,0 +1,187 @@
+# result_cache.py file that implements the content-addressed result cache for generate_code. Results are keyed on a hash of the normalized prompt, the generation model and the system prompt. Lookups go through an in-memory LRU with a TTL first and fall back to one JSON file per key on disk, so a repeated prompt returns its verified files and sandbox URLs without running the LLM pipeline again. The pipeline uses aget and aset, which do the disk tier's reads and writes in a worker thread.
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.storage import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(prompt):
+    """Lowercase a prompt and collapse its whitespace."""
+    return " ".join(prompt.lower().split())
+
+def cache_key(prompt, model, system_prompt):
+    """Hash the normalized prompt, model and system prompt into a cache key."""
+    material = json.dumps([normalize_prompt(prompt), model, system_prompt], separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Two-tier cache: a bounded in-memory LRU backed by JSON files on disk."""
+
+    def __init__(self, directory, max_entries=256, ttl=7 * 24 * 3600.0, enabled=True):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, expires_at, value):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _memory_get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._entries[key]
+        return None
+
+    def _disk_record(self, key, now):
+        """The unexpired disk record for key, deleting an expired one."""
+        record = read_json(self._path(key))
+        if record is not None:
+            if record.get("expires_at", 0) > now:
+                return record
+            self._delete_file(key)
+        return None
+
+    def _disk_hit(self, key, record):
+        if record is None:
+            self.misses += 1
+            return None
+        self._remember(key, record["expires_at"], record["value"])
+        self.disk_hits += 1
+        return record["value"]
+
+    def get(self, key) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._disk_hit(key, self._disk_record(key, now))
+
+    async def aget(self, key) -> Optional[Dict[str, Any]]:
+        """get() that reads the disk tier in a worker thread."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._disk_hit(key, await asyncio.to_thread(self._disk_record, key, now))
+
+    def _store(self, key, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+        self.stores += 1
+        return {"expires_at": expires_at, "value": value}
+
+    def _write(self, key, record):
+        try:
+            atomic_write_json(self._path(key), record)
+        except OSError as e:
+            logger.error(f"Error writing result cache entry {key}: {e}")
+
+    def set(self, key, value):
+        """Store value under key in both tiers."""
+        if not self.enabled:
+            return
+        self._write(key, self._store(key, value))
+
+    async def aset(self, key, value):
+        """set() that writes the disk tier in a worker thread; the memory tier has the value at once."""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self._write, key, self._store(key, value))
+
+    def _delete_file(self, key):
+        try:
+            os.unlink(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def invalidate(self, key):
+        """Drop a single entry from both tiers. Returns True if anything was removed."""
+        in_memory = self._entries.pop(key, None) is not None
+        on_disk = self._delete_file(key)
+        return in_memory or on_disk
+
+    def clear(self):
+        """Drop every entry from both tiers and return how many disk entries were removed."""
+        self._entries.clear()
+        removed = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json") and self._delete_file(name[:-len(".json")]):
+                    removed += 1
+        return removed
+
+    def prune(self):
+        """Remove expired entries from disk."""
+        if not os.path.isdir(self.directory):
+            return 0
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            record = read_json(self._path(key), {})
+            if record.get("expires_at", 0) <= now and self._delete_file(key):
+                removed += 1
+        return removed
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+cache = ResultCache(
+    os.path.join(config.CACHE_DIR, "results"),
+    max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+    ttl=config.RESULT_CACHE_TTL,
+    enabled=config.RESULT_CACHE_ENABLED,
+)
+
+async def startup():
+    """Prune expired disk entries when the app starts."""
+    removed = cache.prune()
+    if removed:
+        logger.info(f"Pruned {removed} expired result cache entries")
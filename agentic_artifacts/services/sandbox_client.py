@@ -0,0 +1,93 @@
+# sandbox_client.py file that owns the shared HTTP client used to talk to the CodeSandbox define API. A single pooled httpx.AsyncClient (keep-alive, HTTP/2 when the h2 package is available) lives for the whole app so artifacts reuse warm connections instead of paying DNS, TCP and TLS setup on every request. startup and shutdown are registered as Litestar lifecycle hooks in routes.py. define_sandbox goes through a swappable backend (post_define by default) so cassette replay can serve recorded responses.
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from agentic_artifacts.utils import config, deadline, tracing
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+DefineBackend = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+_define_backend: Optional[DefineBackend] = None
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _build_client():
+    http2 = config.SANDBOX_HTTP2 and _http2_available()
+    if config.SANDBOX_HTTP2 and not http2:
+        logger.warning("HTTP/2 requested for the sandbox client but the h2 package is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.SANDBOX_MAX_CONNECTIONS,
+            max_keepalive_connections=config.SANDBOX_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.SANDBOX_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(config.SANDBOX_TIMEOUT, connect=config.SANDBOX_CONNECT_TIMEOUT),
+    )
+
+def get_client():
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+async def startup():
+    """Open the shared client when the app starts."""
+    get_client()
+
+async def shutdown():
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def sandbox_urls(sandbox_id):
+    """Build the editor and preview URLs for a sandbox id."""
+    return {
+        "sandbox_id": sandbox_id,
+        "final_url": f"https://codesandbox.io/s/{sandbox_id}",
+        "sandbox_url": f"https://{sandbox_id}.csb.app/"
+    }
+
+def set_define_backend(backend: Optional[DefineBackend]) -> Optional[DefineBackend]:
+    """Route define_sandbox to backend; None restores post_define. Returns the previous backend."""
+    global _define_backend
+    previous = _define_backend
+    _define_backend = backend
+    return previous
+
+async def define_sandbox(encoded_parameters: str) -> Optional[Dict[str, Any]]:
+    """Create a sandbox from compressed parameters and return its URLs."""
+    return await (_define_backend or post_define)(encoded_parameters)
+
+async def post_define(encoded_parameters: str) -> Optional[Dict[str, Any]]:
+    """POST compressed sandbox parameters to the define API and return the sandbox URLs."""
+    url = f"{config.CODESANDBOX_DEFINE_URL}?json=1&parameters={encoded_parameters}"
+    with tracing.span("sandbox_post", parameters_chars=len(encoded_parameters)) as span:
+        # Never wait past the request deadline
+        request_timeout = deadline.timeout(config.SANDBOX_TIMEOUT)
+        response = await get_client().post(url, timeout=httpx.Timeout(
+            request_timeout, connect=min(config.SANDBOX_CONNECT_TIMEOUT, request_timeout)))
+        span.set_attribute("status_code", response.status_code)
+    if response.status_code == 200:
+        try:
+            response_data = response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON from define API: {e}")
+            return None
+        return sandbox_urls(response_data.get('sandbox_id'))
+    logger.error(f"Error creating sandbox: {response.text}")
+    return None
@@ -0,0 +1,91 @@
+# sandbox_index.py file that de-duplicates sandboxes by content. Every generated file set is fingerprinted over a canonical JSON serialization of its files dict, and a bounded LRU index maps fingerprints to the sandbox_id the define API returned for them. acreate_codesandbox consults the index first so byte-identical projects reuse an existing sandbox without a network round trip. The index is persisted to a JSON file under AGENTIC_CACHE_DIR so it survives restarts; writes are debounced and done off the event loop.
+import hashlib
+import json
+import logging
+import atexit
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.storage import DebouncedSave, atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(files):
+    """Hash a files dict over its canonical JSON serialization."""
+    canonical = json.dumps(files, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class SandboxIndex:
+    """Bounded LRU map of file-set fingerprints to sandbox ids, persisted as JSON."""
+
+    def __init__(self, path, max_entries=4096, enabled=True):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._saver = DebouncedSave(lambda: list(self._entries.items()), self._write)
+        self._load()
+        if self.enabled:
+            atexit.register(self.close)
+
+    def _load(self):
+        if not self.enabled:
+            return
+        # Stored oldest first, so replaying the pairs restores the LRU order
+        for fp, sandbox_id in read_json(self.path, []):
+            self._entries[fp] = sandbox_id
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write(self, entries):
+        try:
+            atomic_write_json(self.path, entries)
+        except OSError as e:
+            logger.error(f"Error persisting sandbox index: {e}")
+
+    def get(self, fp) -> Optional[str]:
+        if not self.enabled:
+            return None
+        sandbox_id = self._entries.get(fp)
+        if sandbox_id is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(fp)
+        self._saver.request()
+        self.hits += 1
+        return sandbox_id
+
+    def put(self, fp, sandbox_id):
+        if not self.enabled or not sandbox_id:
+            return
+        self._entries[fp] = sandbox_id
+        self._entries.move_to_end(fp)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._saver.request()
+
+    def close(self):
+        """Write out a pending save."""
+        self._saver.flush()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+index = SandboxIndex(
+    os.path.join(config.CACHE_DIR, "sandbox_index.json"),
+    max_entries=config.SANDBOX_INDEX_MAX_ENTRIES,
+    enabled=config.SANDBOX_INDEX_ENABLED,
+)
+
+async def shutdown():
+    index.close()
@@ -1,20 +1,23 @@
-#code_generator.py agentic_artifacts/services/code_generator.py
-
-import os
-import httpx
+# sandbox_manager.py file kept for backwards compatibility with callers of the original synchronous pipeline. It used to carry its own copy of generation and verification that called litellm directly, outside the LLM scheduler, model routing and usage accounting. Those functions now delegate to code_generator, whose LLM calls all go through llm_client, and warn that they are deprecated; new code should use code_generator. The define URL and sandbox id helpers are unchanged.
 import json
 import logging
-import lzstring
+import warnings
 from urllib.parse import quote
-from litellm import completion
+
+from agentic_artifacts.services import code_generator
+from agentic_artifacts.utils.lz_string import compress_to_base64, decompress_from_base64
 
 logger = logging.getLogger(__name__)
 
+def _deprecated(name):
+    warnings.warn(
+        f"sandbox_manager.{name} is deprecated; use agentic_artifacts.services.code_generator.{name}",
+        DeprecationWarning, stacklevel=3,
+    )
+
 def compress_and_encode(json_data):
     """Compress and encode JSON data for embedding in URL."""
-    lz = lzstring.LZString()
-    compressed = lz.compressToBase64(json_data)
-    return quote(compressed)
+    return quote(compress_to_base64(json_data))
 
 def create_codesandbox(files):
     """Generate CodeSandbox URL based on the provided files."""
@@ -26,181 +29,27 @@ def create_codesandbox(files):
 
 def is_valid_verification(response):
     """Check if the verification response is valid."""
-    try:
-        message_content = response['choices'][0]['message']['content'].strip().upper()
-        return "VALID" in message_content
-    except (KeyError, IndexError) as e:
-        logger.error(f"Error parsing verification response: {e}")
-        return False
+    return code_generator.is_valid_verification(response)
 
 def verify_and_refine_code(function_response, retry_count=3):
-    verification_prompt = (
-        "Please verify that the following code files are correct and functional. "
-        "Respond with 'VALID' if the code is correct or 'INVALID' if there are issues. "
-        "Evaluate the code for the following aspects: "
-        "1. Correctness: Ensure the code does what is expected based on the prompt. "
-        "2. Functionality: Verify that the code runs without errors and performs the intended task. "
-        "3. Completeness: Check that all necessary files and dependencies are included. "
-        "4. Formatting: Ensure the code is properly formatted and adheres to coding standards. "
-        "5. Syntax: Verify that there are no syntax errors in the code. "
-        "6. Best Practices: Ensure the code follows best practices for readability, maintainability, and performance. "
-        "7. Deployment: Confirm that the code is ready to be deployed to CodeSandbox and includes necessary configurations. "
-        f"Here are the code files: {function_response}"
-    )
-
-    for _ in range(retry_count):
-        verification_response = completion(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert in code verification."},
-                {"role": "user", "content": verification_prompt}
-            ]
-        )
-        logger.info(f"Verification response: {verification_response}")
-        if is_valid_verification(verification_response):
-            return True
-
-    return False
+    _deprecated("verify_and_refine_code")
+    return code_generator.verify_and_refine_code(function_response, retry_count=retry_count)
 
 def generate_code_files(prompt, timeout=320.0):
-    try:
-        response = completion(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in generating clean, efficient, and modern code. "
-                        "Generate only the necessary code files based on the given prompt. "
-                        "Ensure the code is fully functional, formatted correctly, and includes all necessary dependencies. "
-                        "Make sure to use correct import paths for all modules, including 'react-dom/client'. "
-                        "Include error handling, comments, and modular code structure where applicable. "
-                        "Provide multiple functionalities and configuration options if relevant. "
-                        "Perform recursive self-assessment with three internal loops for code review and improvement. "
-                        "For example, respond with: "
-                        '{"index.js": {"content": "code here"}, "App.css": {"content": "code here"}, "package.json": {"content": "code here"}}'
-                    )
-                },
-                {"role": "user", "content": prompt}
-            ],
-            functions=[
-                {
-                    "name": "generate_code_files",
-                    "description": "Generates code files",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "index.js": {
-                                "type": "object",
-                                "properties": {
-                                    "content": {"type": "string"}
-                                },
-                                "required": ["content"]
-                            },
-                            "App.css": {
-                                "type": "object",
-                                "properties": {
-                                    "content": {"type": "string"}
-                                },
-                                "required": ["content"]
-                            },
-                            "package.json": {
-                                "type": "object",
-                                "properties": {
-                                    "content": {"type": "string"}
-                                },
-                                "required": ["content"]
-                            },
-                            "App.js": {
-                                "type": "object",
-                                "properties": {
-                                    "content": {"type": "string"}
-                                },
-                                "required": ["content"]
-                            }
-                        },
-                        "required": ["index.js", "App.css", "package.json", "App.js"]
-                    }
-                }
-            ],
-            function_call="auto",
-            timeout=timeout
-        )
-
-        logger.info(f"Raw response: {response}")
-
-        if response.choices[0].finish_reason == 'function_call':
-            function_response = response.choices[0].message.function_call.arguments
-            if not function_response:
-                logger.error("Function call returned empty response.")
-                return None
-
-            # Try to load the function response as JSON
-            try:
-                code_files = json.loads(function_response)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSONDecodeError: {e}")
-                prompt += f"\nError encountered: {str(e)}"
-                response = completion(
-                    model="gpt-4o",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are an expert in generating clean, efficient, and modern code. "
-                                "Generate only the necessary code files based on the given prompt. "
-                                "Ensure the code is fully functional, formatted correctly, and includes all necessary dependencies. "
-                                "Make sure to use correct import paths for all modules, including 'react-dom/client'. "
-                                "Include error handling, comments, and modular code structure where applicable. "
-                                "Provide multiple functionalities and configuration options if relevant. "
-                                "Perform recursive self-assessment with three internal loops for code review and improvement. "
-                                "For example, respond with: "
-                                '{"index.js": {"content": "code here"}, "App.css": {"content": "code here"}, "package.json": {"content": "code here"}}'
-                            )
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    function_call="auto",
-                    timeout=timeout
-                )
-                function_response = response.choices[0].message.function_call.arguments
-
-                if not function_response:
-                    logger.error("Retry failed: Function call returned empty response.")
-                    return None
-
-                code_files = json.loads(function_response)
-
-            # Perform verification
-            if verify_and_refine_code(function_response):
-                logger.info(f"Verified code files: {code_files}")
-                return code_files
-            else:
-                logger.error("Code verification failed after retries.")
-                return None
-
-        logger.error("No valid function call arguments found in the response")
-        return None
-
-    except Exception as e:
-        logger.exception("An error occurred during code generation")
-        raise
+    _deprecated("generate_code_files")
+    return code_generator.generate_code_files(prompt, timeout=timeout)
 
 def get_final_sandbox_url(sandbox_id):
     """Retrieve the final sandbox URL using the sandbox_id."""
-    if sandbox_id:
-        final_url = f"https://codesandbox.io/s/{sandbox_id}"
-        return final_url
-    return None
+    return code_generator.get_final_sandbox_url(sandbox_id)
 
 def extract_sandbox_id(sandbox_url):
     """Extract sandbox ID from the sandbox URL."""
     try:
         # Extract the base64 parameters from the URL
         parameters = sandbox_url.split('=')[1]
-        lz = lzstring.LZString()
         # Decode the base64 parameters
-        decoded = lz.decompressFromBase64(parameters)
+        decoded = decompress_from_base64(parameters)
         # Convert the JSON string back to a dictionary
         params_dict = json.loads(decoded)
         # Extract the sandbox ID (assuming it's a single key in the dictionary)
@@ -211,19 +60,5 @@ def extract_sandbox_id(sandbox_url):
         return None
 
 def generate_code(prompt):
-    files = generate_code_files(prompt)
-    if files:
-        result = create_codesandbox(files)
-        if result:
-            sandbox_url = result['sandbox_url']
-            sandbox_id = result['sandbox_id']
-            final_url = result['final_url']
-            print(f"Generated CodeSandbox URL: {sandbox_url}")  # Print the URL to the console
-            print(f"Generated sandbox ID: {sandbox_id}")  # Print the sandbox ID to the console
-            print(f"Final URL: {final_url}")  # Print the final URL to the console
-            return sandbox_url
-        else:
-            print("Failed to create CodeSandbox.")
-            return None
-    else:
-        return None
\ No newline at end of file
+    _deprecated("generate_code")
+    return code_generator.generate_code(prompt)
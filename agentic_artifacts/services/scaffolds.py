@@ -0,0 +1,227 @@
+# scaffolds.py file that holds the project scaffolds generated apps are built on. A scaffold fixes the boilerplate of a project type (package.json, the entry point, lint and Babel configuration, README) so the LLM does not write it on every call: generation asks only for the scaffold's app files plus an optional list of extra npm dependencies, and assemble() merges those into the scaffold's files deterministically. Each scaffold has its own frozen generation prompt, registered with the prompts module, and a fingerprint of its prompt and files that is part of the result cache key, so changing a scaffold invalidates the artifacts built on it. AGENTIC_SCAFFOLD picks the scaffold; "none" keeps the original behaviour of generating every file.
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from agentic_artifacts.services import prompts
+from agentic_artifacts.utils import config
+
+logger = logging.getLogger(__name__)
+
+# npm package names (optionally scoped) and the version ranges, tags, URLs and git specs npm accepts
+_PACKAGE_NAME = re.compile(r"^(?:@[a-z0-9][a-z0-9._~-]*/)?[a-z0-9][a-z0-9._~-]*$")
+_VERSION_RANGE = re.compile(r"^[A-Za-z0-9.^~<>=*|:/#@+ -]{1,100}$")
+MAX_EXTRA_DEPENDENCIES = 20
+
+# Prompts that ask for a framework-free project
+_VANILLA_PROMPT = re.compile(
+    r"\b(?:vanilla|plain|pure)\s+(?:js|javascript|html)\b|\bno\s+framework\b|\bwithout\s+(?:react|a\s+framework)\b",
+    re.IGNORECASE)
+
+def _json(value):
+    return json.dumps(value, indent=2) + "\n"
+
+class Scaffold:
+    """A project type: fixed files, a base package.json and the app files the LLM writes."""
+
+    def __init__(self, name, description, app_files: Sequence[str], files: Dict[str, str],
+                 package: Optional[Dict[str, Any]], instructions="", prompt: Optional[prompts.Prompt] = None):
+        self.name = name
+        self.description = description
+        self.app_files: Tuple[str, ...] = tuple(app_files)
+        self.files = prompts.freeze(dict(files))
+        self.package = prompts.freeze(package) if package is not None else None
+        self.prompt = prompt or prompts.register(prompts.Prompt(f"generate:{name}", _scaffold_system(self, instructions)))
+        material = json.dumps([self.prompt.system, self.files, self.package], sort_keys=True)
+        self.fingerprint = hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @property
+    def takes_dependencies(self) -> bool:
+        """Whether the LLM lists extra dependencies instead of writing package.json."""
+        return self.package is not None
+
+    def provided_files(self) -> Tuple[str, ...]:
+        if self.package is None:
+            return tuple(self.files)
+        return ("package.json", "README.md", *self.files)
+
+    def function(self, filenames: Sequence[str], partial=False):
+        return prompts.generation_function(filenames, dependencies=self.takes_dependencies, partial=partial)
+
+    def base_dependencies(self) -> Dict[str, str]:
+        declared = {}
+        for field in ("dependencies", "devDependencies"):
+            declared.update((self.package or {}).get(field, {}))
+        return declared
+
+    def dependencies(self, entries: Dict[str, Any]) -> Dict[str, str]:
+        """The well-formed extra dependencies in parsed function call arguments; the scaffold's own
+        packages keep their versions."""
+        requested = entries.get(prompts.DEPENDENCIES) if self.takes_dependencies else None
+        if not isinstance(requested, dict):
+            return {}
+        base = self.base_dependencies()
+        extra = {}
+        for name, version in requested.items():
+            if name in base:
+                continue
+            if not (isinstance(version, str) and _PACKAGE_NAME.match(name) and _VERSION_RANGE.match(version.strip())):
+                logger.warning(f"Ignoring malformed dependency {name!r}: {version!r}")
+                continue
+            if len(extra) >= MAX_EXTRA_DEPENDENCIES:
+                logger.warning(f"Ignoring dependencies past the first {MAX_EXTRA_DEPENDENCIES}")
+                break
+            extra[name] = version.strip()
+        return extra
+
+    def package_json(self, dependencies: Dict[str, str]) -> str:
+        package = json.loads(json.dumps(self.package))
+        package["dependencies"] = {**package.get("dependencies", {}), **dict(sorted(dependencies.items()))}
+        return _json(package)
+
+    def readme(self) -> str:
+        # The same for every app, so identical app files make identical file sets and share a sandbox
+        return (
+            "# Generated app\n\n"
+            f"Built on the {self.description} scaffold. Run `npm install` and then `npm start` to try it locally.\n"
+        )
+
+    def split(self, files: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Undo assemble(): the app files and extra dependencies of a file set built on this scaffold."""
+        app_files = {name: files[name] for name in self.app_files if name in files}
+        dependencies = {}
+        if self.takes_dependencies:
+            try:
+                declared = json.loads(files.get("package.json", {}).get("content", "{}")).get("dependencies", {})
+            except (ValueError, AttributeError):
+                declared = {}
+            dependencies = self.dependencies({prompts.DEPENDENCIES: declared})
+        return app_files, dependencies
+
+    def assemble(self, app_files: Dict[str, Any], dependencies: Dict[str, str]) -> Dict[str, Any]:
+        """The complete file set: the scaffold's files with the generated app files and dependencies merged in."""
+        files = {name: {"content": content} for name, content in self.files.items()}
+        if self.package is not None:
+            files["package.json"] = {"content": self.package_json(dependencies)}
+            files["README.md"] = {"content": self.readme()}
+        files.update(app_files)
+        return files
+
+def _scaffold_system(scaffold, instructions):
+    base = ", ".join(sorted(scaffold.base_dependencies()))
+    app_files = ", ".join(scaffold.app_files)
+    example = json.dumps({**{name: {"content": "code here"} for name in scaffold.app_files}, prompts.DEPENDENCIES: {}})
+    return (
+        "You are an expert in generating clean, efficient, and modern code. "
+        f"The project is built on a fixed {scaffold.description} scaffold that already provides "
+        f"{', '.join(scaffold.provided_files())}; do not write those files. "
+        f"Generate only these app files based on the given prompt: {app_files}. "
+        f"{instructions}"
+        "Ensure the code is fully functional and formatted correctly. "
+        "Include error handling, comments, and modular code structure where applicable. "
+        "Provide multiple functionalities and configuration options if relevant. "
+        "Include detailed comments explaining the purpose and functionality of each section of the code. "
+        "Adhere to best practices for readability, maintainability, and performance. "
+        "Use modern JavaScript features and ensure compatibility with the latest standards. "
+        "Perform recursive self-assessment with three internal loops for code review and improvement. "
+        f"The scaffold's package.json already depends on {base}. If the app files import any other npm package, "
+        f"list it in '{prompts.DEPENDENCIES}' as package name to version range, for example "
+        '{"react-router-dom": "^6.22.0"}; otherwise leave it empty. '
+        f"For example, respond with: {example}"
+    )
+
+REACT = Scaffold(
+    "react",
+    "React 18 (Create React App)",
+    app_files=("App.js", "App.css"),
+    files={
+        "index.js": (
+            "import React from 'react';\n"
+            "import { createRoot } from 'react-dom/client';\n"
+            "import App from './App';\n"
+            "import './App.css';\n"
+            "\n"
+            "const root = createRoot(document.getElementById('root'));\n"
+            "root.render(\n"
+            "  <React.StrictMode>\n"
+            "    <App />\n"
+            "  </React.StrictMode>\n"
+            ");\n"
+        ),
+        ".eslintrc.json": _json({"extends": ["react-app", "react-app/jest"]}),
+        "babel.config.json": _json({"presets": ["@babel/preset-env", "@babel/preset-react"]}),
+    },
+    package={
+        "name": "react-app",
+        "version": "1.0.0",
+        "private": True,
+        "main": "index.js",
+        "dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0", "react-scripts": "5.0.1"},
+        "scripts": {"start": "react-scripts start", "build": "react-scripts build"},
+        "browserslist": {
+            "production": [">0.2%", "not dead", "not op_mini all"],
+            "development": ["last 1 chrome version", "last 1 firefox version", "last 1 safari version"],
+        },
+    },
+    instructions=(
+        "index.js renders the default export of App.js into the #root element inside React.StrictMode and imports "
+        "App.css, so App.js must default-export the root component. App.js may import App.css and npm packages "
+        "but no other local files. "
+    ),
+)
+
+VANILLA = Scaffold(
+    "vanilla",
+    "vanilla JavaScript (Parcel)",
+    app_files=("index.js", "styles.css"),
+    files={
+        "index.html": (
+            "<!DOCTYPE html>\n"
+            "<html lang=\"en\">\n"
+            "  <head>\n"
+            "    <meta charset=\"UTF-8\" />\n"
+            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />\n"
+            "    <title>App</title>\n"
+            "  </head>\n"
+            "  <body>\n"
+            "    <div id=\"app\"></div>\n"
+            "    <script src=\"index.js\"></script>\n"
+            "  </body>\n"
+            "</html>\n"
+        ),
+    },
+    package={
+        "name": "vanilla-app",
+        "version": "1.0.0",
+        "private": True,
+        "main": "index.html",
+        "dependencies": {},
+        "devDependencies": {"parcel-bundler": "^1.12.5"},
+        "scripts": {"start": "parcel index.html --open", "build": "parcel build index.html"},
+    },
+    instructions=(
+        "index.html contains an empty <div id=\"app\"></div> and loads index.js, so index.js must build the whole "
+        "page inside #app and import './styles.css'. Do not use a framework. "
+    ),
+)
+
+# The LLM writes every file itself, as before scaffolds existed
+NONE = Scaffold("none", "none", app_files=prompts.FILE_NAMES, files={}, package=None, prompt=prompts.GENERATE)
+
+SCAFFOLDS: Dict[str, Scaffold] = {scaffold.name: scaffold for scaffold in (REACT, VANILLA, NONE)}
+
+def get(name) -> Scaffold:
+    return SCAFFOLDS[name]
+
+def select(prompt) -> Scaffold:
+    """The scaffold to build the prompt's app on."""
+    choice = config.SCAFFOLD
+    if choice == "auto":
+        return VANILLA if _VANILLA_PROMPT.search(prompt or "") else REACT
+    scaffold = SCAFFOLDS.get(choice)
+    if scaffold is None:
+        logger.warning(f"Unknown scaffold {choice!r}; using {REACT.name}")
+        return REACT
+    return scaffold
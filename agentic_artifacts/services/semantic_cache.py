@@ -0,0 +1,313 @@
+# semantic_cache.py file that implements the near-duplicate prompt cache in front of generate_code. The exact-match result cache only hits on the same prompt after normalization, so "build a todo app" and "make me a simple to-do list app" both run the whole pipeline from scratch. This module turns a prompt into a vector offline (hashed character n-grams and words, no model or network involved) and keeps the vectors of prompts with a cached artifact in a NumPy index. A lookup is one batched cosine search over the index. A match at or above AGENTIC_SEMANTIC_CACHE_THRESHOLD whose numbers and negations are the same as the prompt's (see qualifiers()) returns the stored artifact directly: "a counter with 5 buttons" must not be answered with the 6-button app. Any other match at or above AGENTIC_SEMANTIC_CACHE_EDIT_THRESHOLD gives code_generator a seed: the matched artifact's files, which a cheaper edit request adapts to the new prompt. The index holds at most AGENTIC_SEMANTIC_CACHE_MAX_ENTRIES prompts and evicts the least recently used one. Vectors live in a memory-mapped file under AGENTIC_CACHE_DIR, with the prompt and key of each slot in a JSON file next to it, so the index survives restarts without being loaded into memory. The files are opened on first use (or at startup), never when the cache is disabled, and changes are written out in a worker thread at most every SAVE_DELAY seconds rather than on every lookup and store. NumPy is a declared dependency; if it is missing anyway the cache is disabled with an error.
+import asyncio
+import atexit
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+from agentic_artifacts.utils.storage import DebouncedSave, atomic_write_json, read_json
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+LOOKUPS = registry.counter(
+    "agentic_semantic_cache_lookups_total", "Near-duplicate prompt lookups by outcome", ["outcome"])
+
+# Words that say how to ask rather than what to build
+_FILLER_WORDS = frozenset("""
+    a an the me us my our i we you please can could would will just some for with of to and that which
+    build make create generate write code develop implement give show need want simple basic small little quick
+    app apps application web website page
+""".split())
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Words that change what an otherwise identical prompt asks for, so they must agree for a direct hit
+_NUMBER_WORDS = frozenset("""
+    zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen
+    seventeen eighteen nineteen twenty thirty forty fifty sixty seventy eighty ninety hundred thousand million
+    single double triple half dozen
+""".split())
+_NEGATIONS = frozenset("""
+    no not non without never none nor dont doesnt isnt arent cant cannot wont shouldnt except excluding exclude avoid
+""".split())
+NGRAM_SIZES = (3, 4)
+# Rows scored per matrix product, so a search never allocates more than this many scores at once
+SEARCH_BATCH = 4096
+# Seconds changes to the index wait before they are written out, so bursts of them cost one write
+SAVE_DELAY = 2.0
+
+def prompt_terms(prompt) -> List[str]:
+    """The words of a prompt that describe what to build, lowercased, with in-word punctuation dropped
+    so "to-do" and "todo" match."""
+    text = re.sub(r"(?<=[a-z0-9])['\-](?=[a-z0-9])", "", prompt.lower())
+    return [word for word in _WORD.findall(text) if word not in _FILLER_WORDS]
+
+def qualifiers(prompt) -> Tuple[str, ...]:
+    """The numbers and negations in a prompt, sorted. Two prompts whose qualifiers differ ask for different
+    things however similar the rest of their wording is."""
+    text = re.sub(r"(?<=[a-z0-9])'(?=[a-z])", "", prompt.lower())
+    found = _NUMBER.findall(text)
+    found.extend(word for word in _WORD.findall(text) if word in _NUMBER_WORDS or word in _NEGATIONS)
+    return tuple(sorted(found))
+
+def _features(prompt) -> Counter:
+    """Whole words and the character n-grams of each word and of all the words run together,
+    so "tic tac toe" and "tic-tac-toe" share most of their features."""
+    terms = prompt_terms(prompt)
+    features = Counter("w:" + word for word in terms)
+    texts = [f" {word} " for word in terms]
+    if len(terms) > 1:
+        texts.append(f" {''.join(terms)} ")
+    for text in texts:
+        for size in NGRAM_SIZES:
+            for start in range(max(1, len(text) - size + 1)):
+                features[text[start:start + size]] += 1
+    return features
+
+def vectorize(prompt, dimensions) -> "np.ndarray":
+    """Unit-length hashed n-gram vector of a prompt (all zeros when it has no terms)."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in _features(prompt).items():
+        digest = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if (digest // dimensions) & 1 else -1.0
+        vector[digest % dimensions] += sign * (1.0 + math.log(count))
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+class Match(NamedTuple):
+    key: str
+    prompt: str
+    score: float
+
+class SemanticIndex:
+    """Bounded LRU index of prompt vectors in a memory-mapped array, searched by cosine similarity.
+    Every entry belongs to a namespace (the generation models and scaffold), and only entries in the
+    query's namespace can match."""
+
+    def __init__(self, directory, max_entries=4096, dimensions=1024, enabled=True):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.dimensions = dimensions
+        self.enabled = enabled and max_entries > 0
+        if self.enabled and np is None:
+            logger.error("numpy is not installed; the semantic prompt cache is disabled "
+                         "(install numpy or set AGENTIC_SEMANTIC_CACHE_ENABLED=0)")
+            self.enabled = False
+        self._vectors = None
+        # key -> slot, least recently used first
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._meta: Dict[int, Dict[str, str]] = {}
+        self._namespaces = None
+        self._free: List[int] = []
+        self.hits = 0
+        self.seeds = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._saver = DebouncedSave(self._snapshot, self._write, SAVE_DELAY)
+        self._lock = threading.Lock()
+        if self.enabled:
+            atexit.register(self.close)
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "vectors.f32")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def open(self) -> bool:
+        """Open the index files if that has not happened yet. Returns whether the index is usable."""
+        if not self.enabled:
+            return False
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None:
+                    self._open()
+        return True
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = read_json(self._meta_path, {})
+        shape = (self.max_entries, self.dimensions)
+        compatible = (meta.get("dimensions") == self.dimensions and meta.get("max_entries") == self.max_entries
+                      and os.path.exists(self._vectors_path))
+        if not compatible and meta:
+            logger.info("Semantic cache index settings changed; starting a new index")
+        vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+" if compatible else "w+", shape=shape)
+        self._namespaces = np.zeros(self.max_entries, dtype=np.int64)
+        entries = meta.get("entries", []) if compatible else []
+        # Stored least recently used first, so replaying them restores the LRU order
+        for entry in entries:
+            slot = entry["slot"]
+            if 0 <= slot < self.max_entries and entry["key"] not in self._slots:
+                self._slots[entry["key"]] = slot
+                self._meta[slot] = {"key": entry["key"], "prompt": entry["prompt"], "namespace": entry["namespace"]}
+                self._namespaces[slot] = _namespace_id(entry["namespace"])
+        used = set(self._slots.values())
+        self._free = [slot for slot in range(self.max_entries - 1, -1, -1) if slot not in used]
+        # Set last: open() treats a non-None _vectors as a fully loaded index
+        self._vectors = vectors
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "dimensions": self.dimensions, "max_entries": self.max_entries, "saved_at": time.time(),
+            "entries": [{"slot": slot, **self._meta[slot]} for slot in self._slots.values()],
+        }
+
+    def _write(self, snapshot):
+        try:
+            self._vectors.flush()
+            atomic_write_json(self._meta_path, snapshot)
+        except OSError as e:
+            logger.error(f"Error persisting semantic cache index: {e}")
+
+    def search(self, queries: "np.ndarray", namespace) -> List[Optional[Match]]:
+        """Best match in namespace for each row of queries, in batches of SEARCH_BATCH index rows."""
+        best_scores = np.full(len(queries), -np.inf, dtype=np.float32)
+        best_slots = np.full(len(queries), -1, dtype=np.int64)
+        if self.open() and self._slots:
+            wanted = _namespace_id(namespace)
+            slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+            slots = slots[self._namespaces[slots] == wanted]
+            for start in range(0, len(slots), SEARCH_BATCH):
+                batch = slots[start:start + SEARCH_BATCH]
+                scores = queries @ self._vectors[batch].T
+                top = scores.argmax(axis=1)
+                top_scores = scores[np.arange(len(queries)), top]
+                better = top_scores > best_scores
+                best_scores[better] = top_scores[better]
+                best_slots[better] = batch[top[better]]
+        matches = []
+        for slot, score in zip(best_slots.tolist(), best_scores.tolist()):
+            if slot < 0:
+                matches.append(None)
+                continue
+            meta = self._meta[slot]
+            matches.append(Match(meta["key"], meta["prompt"], float(score)))
+        return matches
+
+    def lookup(self, prompt, namespace, threshold) -> Optional[Match]:
+        """The indexed prompt most similar to prompt, if its similarity is at least threshold."""
+        if not self.enabled:
+            return None
+        query = vectorize(prompt, self.dimensions)
+        if not query.any():
+            return None
+        match = self.search(query[np.newaxis, :], namespace)[0]
+        if match is None or match.score < threshold:
+            return None
+        self._slots.move_to_end(match.key)
+        self._saver.request()
+        return match
+
+    def add(self, prompt, key, namespace):
+        """Index prompt as the source of the artifact cached under key, evicting the least recently used entry when full."""
+        if not self.enabled:
+            return
+        vector = vectorize(prompt, self.dimensions)
+        if not vector.any() or not self.open():
+            return
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                _, slot = self._slots.popitem(last=False)
+                self.evictions += 1
+        self._vectors[slot] = vector
+        self._namespaces[slot] = _namespace_id(namespace)
+        self._meta[slot] = {"key": key, "prompt": prompt, "namespace": namespace}
+        self._slots[key] = slot
+        self.stores += 1
+        self._saver.request()
+
+    def discard(self, key):
+        """Drop the entry for key, for instance because its artifact is no longer cached."""
+        if not self.open():
+            return False
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        self._meta.pop(slot, None)
+        self._namespaces[slot] = 0
+        self._free.append(slot)
+        self._saver.request()
+        return True
+
+    def clear(self):
+        if not self.open():
+            return 0
+        removed = len(self._slots)
+        self._slots.clear()
+        self._meta.clear()
+        self._namespaces[:] = 0
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._saver.request()
+        return removed
+
+    def count(self, outcome):
+        """Record the outcome of a lookup: "hit", "seed", "stale" or "miss"."""
+        if outcome == "hit":
+            self.hits += 1
+        elif outcome == "seed":
+            self.seeds += 1
+        else:
+            self.misses += 1
+        LOOKUPS.inc(outcome=outcome)
+
+    def close(self):
+        """Write out pending changes."""
+        if self._vectors is not None:
+            self._saver.flush()
+
+    def stats(self):
+        self.open()
+        lookups = self.hits + self.seeds + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._slots),
+            "max_entries": self.max_entries,
+            "dimensions": self.dimensions,
+            "threshold": config.SEMANTIC_CACHE_THRESHOLD,
+            "edit_threshold": config.SEMANTIC_CACHE_EDIT_THRESHOLD,
+            "hits": self.hits,
+            "seeds": self.seeds,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.seeds) / lookups if lookups else 0.0,
+        }
+
+def _namespace_id(namespace) -> int:
+    # 0 marks a free slot, so no namespace maps to it
+    return (zlib.crc32(namespace.encode("utf-8")) << 1) | 1
+
+index = SemanticIndex(
+    os.path.join(config.CACHE_DIR, "semantic"),
+    max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+    dimensions=config.SEMANTIC_CACHE_DIMENSIONS,
+    enabled=config.SEMANTIC_CACHE_ENABLED and config.RESULT_CACHE_ENABLED,
+)
+
+async def startup():
+    """Open the index files before the first request needs them."""
+    await asyncio.to_thread(index.open)
+
+async def shutdown():
+    index.close()
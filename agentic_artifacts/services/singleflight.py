@@ -0,0 +1,85 @@
+# singleflight.py file that coalesces identical in-flight work. The first caller for a key (the leader) starts the work as a task; callers that arrive while it is running (followers) attach to the same task and receive the same result instead of starting their own pipeline run. Pipeline events emitted by the shared task are fanned out to every attached caller's event sink, and events emitted before a follower attached are replayed to it. The shared task runs with its own usage tracker and its own AGENTIC_REQUEST_DEADLINE rather than the leader's: every attached caller, leader included, adds the task's usage to its own tracker when it gets the result, and each caller stops waiting when its own deadline passes without cancelling the work for the others. The task is cancelled only when every attached caller has gone away, including when the leader disconnects or times out while it is the only caller: nobody would receive the result then, so the pipeline is abandoned rather than left running to fill the cache.
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from agentic_artifacts.services import events, usage
+from agentic_artifacts.utils import config, deadline
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    def __init__(self):
+        self.task: asyncio.Future = None
+        self.waiters = 0
+        self.sinks: List[events.EventSink] = []
+        self.history: List[Tuple[str, Dict[str, Any]]] = []
+        self.usage: usage.RequestUsage = None
+
+    def publish(self, event, data):
+        self.history.append((event, data))
+        for sink in list(self.sinks):
+            sink(event, data)
+
+class SingleFlight:
+    """Run at most one instance of the work for a key at a time and share its result."""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]):
+        call = self._calls.get(key)
+        sink = events.current_sink()
+        if call is None:
+            call = _Call()
+            leader_usage = usage.current()
+            # Ledger rows of the shared run keep the leader's request id
+            call.usage = usage.RequestUsage(leader_usage.request_id if leader_usage else None)
+
+            async def run():
+                with events.subscribe(call.publish), usage.attach(call.usage), deadline.separate(config.REQUEST_DEADLINE):
+                    return await work()
+
+            call.task = asyncio.ensure_future(run())
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._calls[key] = call
+            self.leaders += 1
+        else:
+            self.followers += 1
+            logger.info(f"Coalescing with in-flight work for key {key[:12]}")
+            if sink is not None:
+                for event, data in call.history:
+                    sink(event, data)
+                sink("coalesced", {"waiters": call.waiters + 1})
+        if sink is not None:
+            call.sinks.append(sink)
+        call.waiters += 1
+        try:
+            # Bounded by this caller's deadline; the shield keeps the others' run going when it passes
+            return await deadline.bound(asyncio.shield(call.task))
+        finally:
+            call.waiters -= 1
+            if sink is not None:
+                call.sinks.remove(sink)
+            if call.task.done():
+                tracker = usage.current()
+                if tracker is not None:
+                    tracker.merge(call.usage)
+            elif call.waiters == 0:
+                # Nobody is waiting for the result any more, the leader included
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+group = SingleFlight()
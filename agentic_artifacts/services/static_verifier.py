@@ -0,0 +1,376 @@
+# static_verifier.py file that implements the deterministic local verification stage run before any LLM verification call. It parses the JSON configuration files, syntax-checks JS/JSX sources with a small pure-Python scanner (strings, template literals, regex literals, comments, bracket balance and JSX element nesting), resolves relative imports against the generated file set, checks bare imports against the dependencies declared in package.json and checks that react-dom/client is only used with a react-dom version that provides it. verify_files returns a list of Findings; an empty list means the files passed.
+import json
+import posixpath
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+JSON_FILES = ("package.json", ".eslintrc.json", "babel.config.json")
+SCRIPT_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs")
+RESOLVE_EXTENSIONS = ("", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".json", ".css")
+RESOLVE_INDEXES = ("/index.js", "/index.jsx")
+
+# Keywords after which an expression starts, so "/" opens a regex and "<" opens JSX
+_EXPRESSION_KEYWORDS = frozenset([
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await", "export", "default", "extends",
+])
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+_IDENTIFIER_START = re.compile(r"[A-Za-z_$\u0080-\uffff]")
+_WORD = re.compile(r"[A-Za-z0-9_$\u0080-\uffff]+")
+_JSX_NAME = re.compile(r"[A-Za-z0-9_$.:\-\u0080-\uffff]+")
+
+_IMPORT_PATTERNS = (
+    re.compile(r"""^\s*import\s+(?:[\w$*{},\s]+?\s+from\s+)?['"]([^'"]+)['"]""", re.MULTILINE),
+    re.compile(r"""^\s*export\s+(?:\*|\{[^}]*\})\s*(?:as\s+[\w$]+\s+)?from\s+['"]([^'"]+)['"]""", re.MULTILINE),
+    re.compile(r"""\brequire\(\s*['"]([^'"]+)['"]\s*\)"""),
+    re.compile(r"""\bimport\(\s*['"]([^'"]+)['"]\s*\)"""),
+)
+
+class Finding(NamedTuple):
+    file: str
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self):
+        location = f"{self.file}:{self.line}" if self.line else self.file
+        return f"{location}: {self.message}"
+
+class _SyntaxProblem(Exception):
+    def __init__(self, message, pos):
+        super().__init__(message)
+        self.message = message
+        self.pos = pos
+
+class _JSScanner:
+    """Single-pass scanner that rejects the syntax errors LLM output typically contains."""
+
+    def __init__(self, source):
+        self.src = source
+        self.n = len(source)
+        self.pos = 0
+        # True when the next token starts an expression (regex or JSX allowed)
+        self.expression_start = True
+
+    def line_of(self, pos):
+        return self.src.count("\n", 0, pos) + 1
+
+    def fail(self, message, pos=None):
+        raise _SyntaxProblem(message, self.pos if pos is None else pos)
+
+    def check(self):
+        self.scan_code(None)
+
+    def skip_comment(self):
+        """Skip a comment at pos if there is one; return True if skipped."""
+        src, pos = self.src, self.pos
+        if src.startswith("//", pos):
+            end = src.find("\n", pos)
+            self.pos = self.n if end < 0 else end
+            return True
+        if src.startswith("/*", pos):
+            end = src.find("*/", pos + 2)
+            if end < 0:
+                self.fail("Unterminated comment")
+            self.pos = end + 2
+            return True
+        return False
+
+    def scan_code(self, terminator):
+        """Scan JS until terminator closes at this nesting level (or EOF when terminator is None)."""
+        src = self.src
+        start = self.pos
+        stack = []
+        while self.pos < self.n:
+            c = src[self.pos]
+            if c in " \t\r\n":
+                self.pos += 1
+            elif c == "/" and self.skip_comment():
+                pass
+            elif c in "'\"":
+                self.scan_string(c)
+                self.expression_start = False
+            elif c == "`":
+                self.scan_template()
+                self.expression_start = False
+            elif c == "/" and self.expression_start:
+                self.scan_regex()
+                self.expression_start = False
+            elif c == "<" and self.expression_start and self.pos + 1 < self.n and (
+                    src[self.pos + 1] == ">" or _IDENTIFIER_START.match(src[self.pos + 1])):
+                self.scan_jsx_element()
+                self.expression_start = False
+            elif c in "([{":
+                stack.append((c, self.pos))
+                self.pos += 1
+                self.expression_start = True
+            elif c in ")]}":
+                if not stack:
+                    if c == terminator:
+                        self.pos += 1
+                        return
+                    self.fail(f"Unexpected '{c}'")
+                opener, _ = stack.pop()
+                if opener != _CLOSERS[c]:
+                    self.fail(f"Mismatched '{c}' closing '{opener}'")
+                self.pos += 1
+                self.expression_start = False
+            elif c.isdigit() or _IDENTIFIER_START.match(c):
+                match = _WORD.match(src, self.pos)
+                self.pos = match.end()
+                self.expression_start = match.group() in _EXPRESSION_KEYWORDS
+            elif src.startswith("++", self.pos) or src.startswith("--", self.pos):
+                # One token: after an operand (a++ / 2) it ends the operand, before one (++a) an expression follows
+                self.pos += 2
+            else:
+                self.pos += 1
+                self.expression_start = True
+        if stack:
+            opener, opened_at = stack[-1]
+            self.fail(f"Unclosed '{opener}'", opened_at)
+        if terminator is not None:
+            self.fail(f"Expected '{terminator}'", start)
+
+    def scan_string(self, quote, multiline=False):
+        src = self.src
+        start = self.pos
+        self.pos += 1
+        while self.pos < self.n:
+            c = src[self.pos]
+            if c == "\\":
+                self.pos += 2
+                continue
+            if c == quote:
+                self.pos += 1
+                return
+            if c == "\n" and not multiline:
+                break
+            self.pos += 1
+        self.fail("Unterminated string literal", start)
+
+    def scan_template(self):
+        src = self.src
+        start = self.pos
+        self.pos += 1
+        while self.pos < self.n:
+            c = src[self.pos]
+            if c == "\\":
+                self.pos += 2
+            elif c == "`":
+                self.pos += 1
+                return
+            elif src.startswith("${", self.pos):
+                self.pos += 2
+                self.expression_start = True
+                self.scan_code("}")
+            else:
+                self.pos += 1
+        self.fail("Unterminated template literal", start)
+
+    def scan_regex(self):
+        src = self.src
+        start = self.pos
+        self.pos += 1
+        in_class = False
+        while self.pos < self.n:
+            c = src[self.pos]
+            if c == "\\":
+                self.pos += 2
+                continue
+            if c == "\n":
+                break
+            if c == "[":
+                in_class = True
+            elif c == "]":
+                in_class = False
+            elif c == "/" and not in_class:
+                self.pos += 1
+                match = _WORD.match(src, self.pos)
+                if match:
+                    self.pos = match.end()
+                return
+            self.pos += 1
+        self.fail("Unterminated regular expression", start)
+
+    def skip_jsx_space(self):
+        while self.pos < self.n:
+            if self.src[self.pos] in " \t\r\n":
+                self.pos += 1
+            elif not (self.src[self.pos] == "/" and self.skip_comment()):
+                return
+
+    def scan_jsx_expression(self):
+        self.pos += 1
+        self.expression_start = True
+        self.scan_code("}")
+
+    def scan_jsx_element(self):
+        """Scan a JSX element starting at '<', including its children and closing tag."""
+        src = self.src
+        start = self.pos
+        self.pos += 1
+        name = ""
+        if src[self.pos] != ">":
+            match = _JSX_NAME.match(src, self.pos)
+            name = match.group()
+            self.pos = match.end()
+
+        # Attributes
+        while True:
+            self.skip_jsx_space()
+            if self.pos >= self.n:
+                self.fail(f"Unterminated <{name}> tag", start)
+            c = src[self.pos]
+            if src.startswith("/>", self.pos):
+                self.pos += 2
+                return
+            if c == ">":
+                self.pos += 1
+                break
+            if c == "{":
+                self.scan_jsx_expression()
+                continue
+            match = _JSX_NAME.match(src, self.pos)
+            if not match:
+                self.fail(f"Unexpected '{c}' in <{name}> tag")
+            self.pos = match.end()
+            self.skip_jsx_space()
+            if self.pos < self.n and src[self.pos] == "=":
+                self.pos += 1
+                self.skip_jsx_space()
+                if self.pos >= self.n:
+                    continue
+                c = src[self.pos]
+                if c in "'\"":
+                    self.scan_string(c, multiline=True)
+                elif c == "{":
+                    self.scan_jsx_expression()
+                else:
+                    self.fail(f"Invalid attribute value in <{name}> tag")
+
+        # Children
+        while self.pos < self.n:
+            c = src[self.pos]
+            if c == "{":
+                self.scan_jsx_expression()
+            elif c == "<":
+                if src.startswith("</", self.pos):
+                    close_start = self.pos
+                    end = src.find(">", self.pos)
+                    if end < 0:
+                        self.fail("Unterminated closing tag", close_start)
+                    closing = src[self.pos + 2:end].strip()
+                    self.pos = end + 1
+                    if closing != name:
+                        self.fail(f"Expected closing tag </{name}> but found </{closing}>", close_start)
+                    return
+                self.scan_jsx_element()
+            else:
+                self.pos += 1
+        self.fail(f"Unclosed <{name}> element", start)
+
+def check_js_syntax(source) -> Optional[tuple]:
+    """Return (line, message) for the first syntax problem in source, or None."""
+    scanner = _JSScanner(source)
+    try:
+        scanner.check()
+    except _SyntaxProblem as e:
+        return scanner.line_of(e.pos), e.message
+    except (IndexError, AttributeError):
+        # Input ended in the middle of a construct the scanner was reading
+        return scanner.line_of(min(scanner.pos, scanner.n)), "Unexpected end of input"
+    return None
+
+def find_imports(source) -> List[str]:
+    """Return the module specifiers imported by source."""
+    specifiers = []
+    for pattern in _IMPORT_PATTERNS:
+        specifiers.extend(match.group(1) for match in pattern.finditer(source))
+    return specifiers
+
+def package_name(specifier):
+    """Map a bare import specifier to its npm package name."""
+    parts = specifier.split("/")
+    if specifier.startswith("@") and len(parts) > 1:
+        return "/".join(parts[:2])
+    return parts[0]
+
+def major_version(spec) -> Optional[int]:
+    """Extract the major version from a semver range like '^18.2.0', or None."""
+    match = re.search(r"\d+", spec or "")
+    return int(match.group()) if match else None
+
+def resolve_import(importer, specifier, filenames):
+    """Resolve a relative import against the generated file set."""
+    base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+    for candidate in [base + ext for ext in RESOLVE_EXTENSIONS] + [base + index for index in RESOLVE_INDEXES]:
+        if candidate in filenames:
+            return candidate
+    return None
+
+def _file_contents(files: Dict[str, dict]):
+    contents = {}
+    for name, entry in files.items():
+        if isinstance(entry, dict) and isinstance(entry.get("content"), str):
+            contents[posixpath.normpath(name.lstrip("/"))] = entry["content"]
+    return contents
+
+def verify_files(files: Dict[str, dict]) -> List[Finding]:
+    """Run every local check over a generated file set and return the findings."""
+    findings = []
+    contents = _file_contents(files)
+    for name, entry in files.items():
+        if posixpath.normpath(name.lstrip("/")) not in contents:
+            findings.append(Finding(name, "Entry is missing its string 'content'"))
+
+    # Configuration files
+    parsed = {}
+    for name in JSON_FILES:
+        if name not in contents:
+            continue
+        try:
+            parsed[name] = json.loads(contents[name])
+        except json.JSONDecodeError as e:
+            findings.append(Finding(name, f"Invalid JSON: {e.msg} (column {e.colno})", e.lineno))
+    package = parsed.get("package.json")
+    dependencies = None
+    if package is not None:
+        if not isinstance(package, dict):
+            findings.append(Finding("package.json", "Top level must be an object"))
+        else:
+            dependencies = {}
+            for field in ("dependencies", "devDependencies", "peerDependencies"):
+                declared = package.get(field, {})
+                if not isinstance(declared, dict):
+                    findings.append(Finding("package.json", f"'{field}' must be an object"))
+                    continue
+                dependencies.update(declared)
+
+    # Scripts: syntax, then imports
+    uses_react_dom_client = None
+    for name, source in contents.items():
+        if not name.endswith(SCRIPT_EXTENSIONS):
+            continue
+        problem = check_js_syntax(source)
+        if problem:
+            line, message = problem
+            findings.append(Finding(name, f"Syntax error: {message}", line))
+            continue
+        for specifier in find_imports(source):
+            if specifier.startswith("."):
+                if resolve_import(name, specifier, contents) is None:
+                    findings.append(Finding(name, f"Cannot resolve import '{specifier}'"))
+                continue
+            if specifier == "react-dom/client":
+                uses_react_dom_client = uses_react_dom_client or name
+            if dependencies is not None and package_name(specifier) not in dependencies:
+                findings.append(Finding(name, f"Import '{specifier}' is not declared in package.json dependencies"))
+
+    # react-dom/client only exists from React 18 on
+    if uses_react_dom_client and dependencies is not None and "react-dom" in dependencies:
+        react_dom_major = major_version(dependencies["react-dom"])
+        if react_dom_major is not None and react_dom_major < 18:
+            findings.append(Finding(uses_react_dom_client, f"'react-dom/client' requires react-dom 18 or later, package.json declares {dependencies['react-dom']}"))
+        react_major = major_version(dependencies.get("react"))
+        if react_dom_major is not None and react_major is not None and react_major != react_dom_major:
+            findings.append(Finding("package.json", f"react {dependencies['react']} and react-dom {dependencies['react-dom']} major versions differ"))
+    return findings
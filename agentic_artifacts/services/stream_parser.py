@@ -0,0 +1,225 @@
+# stream_parser.py file that incrementally parses the streamed function_call arguments of a code generation call. The arguments are a single JSON object mapping filenames to {"content": ...} entries; FunctionArgumentsParser consumes argument deltas as they arrive, hands back each top-level entry as soon as its value closes, and on malformed input raises StreamParseError with the exact line, column and offset where the JSON went bad. Entries completed before the error are kept on the parser so a retry only has to ask for the rest.
+import json
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+# Parser states
+_EXPECT_OPEN = 0
+_EXPECT_KEY_OR_CLOSE = 1
+_EXPECT_KEY = 2
+_IN_KEY = 3
+_EXPECT_COLON = 4
+_EXPECT_VALUE = 5
+_IN_VALUE = 6
+_EXPECT_COMMA_OR_CLOSE = 7
+_DONE = 8
+
+class StreamParseError(ValueError):
+    """Malformed function call arguments, with the absolute position of the problem."""
+
+    def __init__(self, message, position, line, column):
+        self.message = message
+        self.position = position
+        self.line = line
+        self.column = column
+        super().__init__(f"{message}: line {line} column {column} (char {position})")
+
+class FunctionArgumentsParser:
+    """Incremental parser for a streamed top-level JSON object of file entries."""
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+        self._buffer = ""
+        self._offset = 0          # absolute position of _buffer[0]
+        self._pos = 0             # scan position within _buffer
+        self._line = 1            # line number at _buffer[0]
+        self._line_start = 0      # absolute position where that line starts
+        self._state = _EXPECT_OPEN
+        self._token_start = 0
+        self._key = None
+        # Value scanning state, kept across feeds so nothing is rescanned
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = False
+
+    @property
+    def done(self):
+        return self._state == _DONE
+
+    def _error(self, message, index):
+        position = self._offset + index
+        line = self._line + self._buffer.count("\n", 0, index)
+        last_newline = self._buffer.rfind("\n", 0, index)
+        line_start = self._offset + last_newline + 1 if last_newline >= 0 else self._line_start
+        return StreamParseError(message, position, line, position - line_start + 1)
+
+    def _value_error(self, message, index):
+        """Report an error inside the value in progress at the first position json itself rejects."""
+        if self._state == _IN_VALUE:
+            try:
+                json.loads(self._buffer[self._token_start:index])
+            except json.JSONDecodeError as e:
+                if self._token_start + e.pos < index:
+                    return self._error(f"Invalid value for {self._key!r}: {e.msg}", self._token_start + e.pos)
+        return self._error(message, index)
+
+    def _decode(self, start, end, what):
+        raw = self._buffer[start:end]
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise self._error(f"Invalid {what}: {e.msg}", start + e.pos) from None
+
+    def _compact(self):
+        """Drop consumed input so the buffer only holds the token in progress."""
+        cut = self._token_start if self._state in (_IN_KEY, _IN_VALUE) else self._pos
+        if cut <= 0:
+            return
+        consumed = self._buffer[:cut]
+        newlines = consumed.count("\n")
+        if newlines:
+            self._line += newlines
+            self._line_start = self._offset + consumed.rfind("\n") + 1
+        self._offset += cut
+        self._buffer = self._buffer[cut:]
+        self._pos -= cut
+        self._token_start -= cut
+
+    def _scan_string(self, buffer, i):
+        """Advance through a string body; return the index after the closing quote or -1."""
+        n = len(buffer)
+        while i < n:
+            if self._escape:
+                self._escape = False
+            else:
+                c = buffer[i]
+                if c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    return i + 1
+                elif c < " ":
+                    raise self._value_error("Invalid control character in string", i)
+            i += 1
+        return -1
+
+    def _scan_value(self, buffer, i):
+        """Advance through the current value; return the index after it or -1 if incomplete."""
+        n = len(buffer)
+        if self._scalar:
+            while i < n and buffer[i] not in _WHITESPACE and buffer[i] not in ",}":
+                i += 1
+            return i if i < n else -1
+        while i < n:
+            if self._in_string:
+                end = self._scan_string(buffer, i)
+                if end < 0:
+                    return -1
+                i = end
+                if self._depth == 0:
+                    return i
+                continue
+            c = buffer[i]
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    return i + 1
+                if self._depth < 0:
+                    raise self._value_error("Unbalanced bracket", i)
+            i += 1
+        return -1
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk of arguments and return the entries completed by it."""
+        completed = []
+        self._buffer += delta
+        buffer = self._buffer
+        n = len(buffer)
+        i = self._pos
+        while i < n:
+            state = self._state
+            if state == _IN_KEY:
+                end = self._scan_string(buffer, i)
+                if end < 0:
+                    i = n
+                    break
+                self._key = self._decode(self._token_start, end, "key")
+                self._state = _EXPECT_COLON
+                i = end
+                continue
+            if state == _IN_VALUE:
+                end = self._scan_value(buffer, i)
+                if end < 0:
+                    i = n
+                    break
+                value = self._decode(self._token_start, end, f"value for {self._key!r}")
+                self.entries[self._key] = value
+                completed.append((self._key, value))
+                self._state = _EXPECT_COMMA_OR_CLOSE
+                i = end
+                continue
+
+            c = buffer[i]
+            if c in _WHITESPACE:
+                i += 1
+                continue
+            if state == _EXPECT_OPEN:
+                if c != "{":
+                    raise self._error("Expected '{' at start of arguments", i)
+                self._state = _EXPECT_KEY_OR_CLOSE
+            elif state in (_EXPECT_KEY_OR_CLOSE, _EXPECT_KEY):
+                if c == '"':
+                    self._state = _IN_KEY
+                    self._token_start = i
+                    self._in_string = True
+                    self._escape = False
+                elif c == "}" and state == _EXPECT_KEY_OR_CLOSE:
+                    self._state = _DONE
+                else:
+                    raise self._error("Expected property name enclosed in double quotes", i)
+            elif state == _EXPECT_COLON:
+                if c != ":":
+                    raise self._error("Expected ':' delimiter", i)
+                self._state = _EXPECT_VALUE
+            elif state == _EXPECT_VALUE:
+                if c in ",}]:":
+                    raise self._error("Expected value", i)
+                self._state = _IN_VALUE
+                self._token_start = i
+                self._depth = 0
+                self._in_string = False
+                self._escape = False
+                self._scalar = c not in '{["'
+                continue
+            elif state == _EXPECT_COMMA_OR_CLOSE:
+                if c == ",":
+                    self._state = _EXPECT_KEY
+                elif c == "}":
+                    self._state = _DONE
+                else:
+                    raise self._error("Expected ',' or '}' after property value", i)
+            elif state == _DONE:
+                raise self._error("Extra data after end of arguments", i)
+            i += 1
+        self._pos = i
+        self._compact()
+        return completed
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """Signal end of stream; raise if the arguments were not a complete object."""
+        completed = []
+        if self._state == _IN_VALUE and self._scalar:
+            # A trailing scalar is only delimited by the end of input
+            value = self._decode(self._token_start, len(self._buffer), f"value for {self._key!r}")
+            self.entries[self._key] = value
+            completed.append((self._key, value))
+            self._state = _EXPECT_COMMA_OR_CLOSE
+        if self._state != _DONE:
+            raise self._value_error("Unexpected end of arguments", len(self._buffer))
+        return completed
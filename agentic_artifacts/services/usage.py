@@ -0,0 +1,323 @@
+# usage.py file that accounts for LLM token use and cost. llm_client reports the usage litellm returns for every call (prompt, completion and cached prompt tokens) along with the stage and model; the cost comes from litellm's price table. Each call is added to the usage tracker of the request it belongs to (a context variable set by track(), so calls made by tasks inside the pipeline are attributed to the right request), counted in Prometheus metrics, and written to a SQLite ledger that keeps every call plus daily rollups per stage and model for the /usage route. Ledger rows are queued and written in batches by a background thread, as utils/log.py does for log records, so recording a call does no disk I/O on the event loop; when the queue is full rows are dropped and counted. Summaries and metrics report cached_ratio, the share of prompt tokens the provider served from its prompt cache.
+import asyncio
+import contextvars
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from litellm import cost_per_token
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+TOKENS = registry.counter("agentic_llm_tokens_total", "LLM tokens by stage, model and kind", ["stage", "model", "kind"])
+COST = registry.counter("agentic_llm_cost_usd_total", "Estimated LLM spend in US dollars", ["stage", "model"])
+DROPPED_ROWS = registry.counter("agentic_usage_ledger_rows_dropped_total", "Ledger rows dropped because the ledger queue was full")
+
+# Most rows the ledger writer commits in one transaction
+LEDGER_BATCH = 500
+
+def usage_fields(usage) -> Optional[Tuple[int, int, int]]:
+    """Return (prompt, completion, cached prompt) tokens from a litellm usage object or dict."""
+    if not usage:
+        return None
+
+    def field(source, name):
+        if source is None:
+            return None
+        return source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+
+    details = field(usage, "prompt_tokens_details")
+    return (
+        int(field(usage, "prompt_tokens") or 0),
+        int(field(usage, "completion_tokens") or 0),
+        int(field(details, "cached_tokens") or 0),
+    )
+
+def cached_ratio(prompt_tokens, cached_tokens) -> float:
+    """Share of prompt tokens served from the provider's prompt cache."""
+    return round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0
+
+def estimate_cost(model, prompt_tokens, completion_tokens) -> float:
+    try:
+        prompt_cost, completion_cost = cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    except Exception:
+        # Models missing from litellm's price table are counted at zero
+        return 0.0
+    return float(prompt_cost) + float(completion_cost)
+
+class RequestUsage:
+    """Token and cost totals for one request, broken down by stage and model."""
+
+    def __init__(self, request_id=None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self._rows: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def add(self, stage, model, prompt_tokens, completion_tokens, cached_tokens, cost):
+        row = self._rows.setdefault((stage, model), {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0,
+        })
+        row["calls"] += 1
+        row["prompt_tokens"] += prompt_tokens
+        row["completion_tokens"] += completion_tokens
+        row["cached_tokens"] += cached_tokens
+        row["cost_usd"] += cost
+
+    def merge(self, other: "RequestUsage"):
+        """Add other's totals to this tracker, for instance those of a pipeline run shared with other requests."""
+        for (stage, model), row in other._rows.items():
+            mine = self._rows.setdefault((stage, model), dict.fromkeys(row, 0))
+            for name, value in row.items():
+                mine[name] += value
+
+    def summary(self) -> Dict[str, Any]:
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0}
+        by_stage: Dict[str, Dict[str, float]] = {}
+        by_model: Dict[str, Dict[str, float]] = {}
+        for (stage, model), row in self._rows.items():
+            for bucket in (totals, by_stage.setdefault(stage, dict.fromkeys(totals, 0)),
+                           by_model.setdefault(model, dict.fromkeys(totals, 0))):
+                for name, value in row.items():
+                    bucket[name] += value
+        for bucket in [totals, *by_stage.values(), *by_model.values()]:
+            bucket["total_tokens"] = bucket["prompt_tokens"] + bucket["completion_tokens"]
+            bucket["cached_ratio"] = cached_ratio(bucket["prompt_tokens"], bucket["cached_tokens"])
+            bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+        return {"request_id": self.request_id, **totals, "by_stage": by_stage, "by_model": by_model}
+
+class UsageLedger:
+    """SQLite ledger of LLM calls with daily rollups per stage and model. Rows are written by a background thread."""
+
+    def __init__(self, path, enabled=True, queue_size=10000):
+        self.path = path
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def open(self):
+        if self._conn is not None or not self.enabled:
+            return
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_calls ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " created_at REAL NOT NULL,"
+            " day TEXT NOT NULL,"
+            " request_id TEXT,"
+            " stage TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " prompt_tokens INTEGER NOT NULL,"
+            " completion_tokens INTEGER NOT NULL,"
+            " cached_tokens INTEGER NOT NULL,"
+            " cost_usd REAL NOT NULL,"
+            " latency REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_request ON llm_calls (request_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage_daily ("
+            " day TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " calls INTEGER NOT NULL,"
+            " prompt_tokens INTEGER NOT NULL,"
+            " completion_tokens INTEGER NOT NULL,"
+            " cached_tokens INTEGER NOT NULL,"
+            " cost_usd REAL NOT NULL,"
+            " PRIMARY KEY (day, stage, model))"
+        )
+        self._conn.commit()
+
+    def close(self):
+        """Write out queued rows, stop the writer thread and close the database."""
+        with self._lock:
+            if self._writer is not None:
+                self._rows.put(None)
+                self._writer.join()
+                self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def record(self, request_id, stage, model, prompt_tokens, completion_tokens, cached_tokens, cost, latency=None):
+        """Queue one call for the writer thread."""
+        if not self.enabled:
+            return
+        self._start_writer()
+        now = time.time()
+        day = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        try:
+            self._rows.put_nowait(
+                (now, day, request_id, stage, model, prompt_tokens, completion_tokens, cached_tokens, cost, latency))
+        except queue.Full:
+            DROPPED_ROWS.inc()
+
+    def flush(self):
+        """Wait until every queued row is written."""
+        if self._writer is not None:
+            self._rows.join()
+
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self.open()
+                self._writer = threading.Thread(target=self._write_rows, name="usage-ledger", daemon=True)
+                self._writer.start()
+
+    def _write_rows(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._rows.get()]
+                while batch[-1] is not None and len(batch) < LEDGER_BATCH:
+                    try:
+                        batch.append(self._rows.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [row for row in batch if row is not None]
+                try:
+                    if rows:
+                        self._insert(conn, rows)
+                except sqlite3.Error as e:
+                    logger.error(f"Could not write {len(rows)} usage ledger entries: {e}")
+                finally:
+                    for _ in batch:
+                        self._rows.task_done()
+                if batch[-1] is None:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn, rows):
+        conn.executemany(
+            "INSERT INTO llm_calls (created_at, day, request_id, stage, model, prompt_tokens,"
+            " completion_tokens, cached_tokens, cost_usd, latency) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.executemany(
+            "INSERT INTO usage_daily (day, stage, model, calls, prompt_tokens, completion_tokens, cached_tokens, cost_usd)"
+            " VALUES (?, ?, ?, 1, ?, ?, ?, ?)"
+            " ON CONFLICT (day, stage, model) DO UPDATE SET"
+            " calls = calls + 1,"
+            " prompt_tokens = prompt_tokens + excluded.prompt_tokens,"
+            " completion_tokens = completion_tokens + excluded.completion_tokens,"
+            " cached_tokens = cached_tokens + excluded.cached_tokens,"
+            " cost_usd = cost_usd + excluded.cost_usd",
+            [(day, stage, model, prompt, completion, cached, cost)
+             for _, day, _, stage, model, prompt, completion, cached, cost, _ in rows],
+        )
+        conn.commit()
+
+    def daily(self, days=30, stage=None, model=None) -> List[Dict[str, Any]]:
+        """Daily rollups for the last days days, newest first, optionally for one stage or model.
+        Waits for queued rows to be written, so call it off the event loop."""
+        if not self.enabled:
+            return []
+        self.open()
+        self.flush()
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        query = "SELECT * FROM usage_daily WHERE day >= ?"
+        params: List[Any] = [since]
+        if stage:
+            query += " AND stage = ?"
+            params.append(stage)
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        rows = self._conn.execute(query + " ORDER BY day DESC, stage, model", params).fetchall()
+        return [{**row, "cached_ratio": cached_ratio(row["prompt_tokens"], row["cached_tokens"])}
+                for row in map(dict, rows)]
+
+    def for_request(self, request_id) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        self.open()
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT created_at, stage, model, prompt_tokens, completion_tokens, cached_tokens, cost_usd, latency"
+            " FROM llm_calls WHERE request_id = ? ORDER BY id", (request_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+ledger = UsageLedger(os.path.join(config.CACHE_DIR, "usage.sqlite3"), enabled=config.USAGE_LEDGER_ENABLED,
+                     queue_size=config.USAGE_LEDGER_QUEUE_SIZE)
+
+_current: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar("request_usage", default=None)
+
+@contextmanager
+def track(request_id=None):
+    """Attribute LLM usage in this context to a new RequestUsage."""
+    with attach(RequestUsage(request_id)) as tracker:
+        yield tracker
+
+@contextmanager
+def attach(tracker: RequestUsage):
+    """Attribute LLM usage in this context to tracker."""
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+def current() -> Optional[RequestUsage]:
+    return _current.get()
+
+def record(stage, model, usage, latency=None):
+    """Account for one LLM call's usage."""
+    fields = usage_fields(usage)
+    if fields is None:
+        return
+    prompt_tokens, completion_tokens, cached_tokens = fields
+    model = str(model)
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    TOKENS.inc(prompt_tokens, stage=stage, model=model, kind="prompt")
+    TOKENS.inc(completion_tokens, stage=stage, model=model, kind="completion")
+    if cached_tokens:
+        TOKENS.inc(cached_tokens, stage=stage, model=model, kind="cached")
+    COST.inc(cost, stage=stage, model=model)
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.add(stage, model, prompt_tokens, completion_tokens, cached_tokens, cost)
+    ledger.record(tracker.request_id if tracker else None, stage, model,
+                  prompt_tokens, completion_tokens, cached_tokens, cost, latency)
+
+def _cache_metrics():
+    prompt: Dict[Tuple[str, str], float] = {}
+    cached: Dict[Tuple[str, str], float] = {}
+    for _, labels, value in TOKENS.samples():
+        labels = dict(labels)
+        key = (labels["stage"], labels["model"])
+        if labels["kind"] == "prompt":
+            prompt[key] = value
+        elif labels["kind"] == "cached":
+            cached[key] = value
+    yield ("agentic_llm_prompt_cache_ratio", "gauge", "Share of prompt tokens served from the provider's prompt cache",
+           [({"stage": stage, "model": model}, cached_ratio(tokens, cached.get((stage, model), 0)))
+            for (stage, model), tokens in prompt.items()])
+
+registry.add_collector(_cache_metrics)
+
+async def shutdown():
+    await asyncio.to_thread(ledger.close)
@@ -4,20 +4,56 @@ document.addEventListener('DOMContentLoaded', () => {
     const resultDiv = document.getElementById('result');
     const loadingSpinner = document.getElementById('loading-spinner');
 
-    const fakeSteps = [
-        "Initializing code generation...",
-        "Generating initial structure...",
-        "Adding components...",
-        "Integrating styles...",
-        "Setting up dependencies...",
-        "Creating configuration files...",
-        "Reviewing code for errors...",
-        "Performing final checks...",
-        "Preparing sandbox environment...",
-        "Finalizing..."
-    ];
+    const stageLabels = {
+        generate: "Generating code",
+        edit: "Adapting a similar project",
+        verify: "Verifying code",
+        sandbox: "Creating sandbox"
+    };
 
-    generateForm.addEventListener('submit', async (e) => {
+    const escapeHtml = (text) => String(text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;');
+
+    const renderSandbox = (previewUrl, prompt) => {
+        const sandboxUrl = `https://${previewUrl.split('/').pop()}.csb.app/`;
+        const sandboxDiv = document.getElementById('sandbox-output');
+        sandboxDiv.innerHTML = `
+            <h3>Generated Sandbox:</h3>
+            <iframe id="sandbox-frame" src="${previewUrl}" style="width:100%; height:500px; border:0; border-radius: 4px; overflow:hidden;"></iframe>
+            <p><a href="${previewUrl}" target="_blank">Open in new tab</a></p>
+            <p>Preview URL: <a href="${sandboxUrl}" target="_blank">${sandboxUrl}</a></p>
+        `;
+
+        const iframe = document.getElementById('sandbox-frame');
+        iframe.onload = () => {
+            const iframeWindow = iframe.contentWindow;
+            iframeWindow.onerror = (message, source, lineno, colno, error) => {
+                fetch('/report-error', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        errorMessage: error ? error.stack : message,
+                        prompt
+                    })
+                }).then(res => res.json())
+                  .then(data => {
+                      if (data.fixed_code) {
+                          // Display the fixed code or update the iframe
+                          sandboxDiv.innerHTML += `<pre>${escapeHtml(data.fixed_code)}</pre>`;
+                      } else if (data.error) {
+                          sandboxDiv.innerHTML += `<div class="error">Error: ${escapeHtml(data.error)}</div>`;
+                      }
+                  });
+            };
+        };
+    };
+
+    generateForm.addEventListener('submit', (e) => {
         e.preventDefault();
         const prompt = promptInput.value.trim();
 
@@ -26,75 +62,95 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
-        resultDiv.innerHTML = '';
+        resultDiv.innerHTML = `
+            <ul id="progress-log"></ul>
+            <p id="progress-status"></p>
+            <div id="generated-files"></div>
+            <div id="sandbox-output"></div>
+        `;
         loadingSpinner.style.display = 'block';
 
-        // Display fake steps
-        let currentStep = 0;
-        const stepInterval = 3500; // 2 seconds between each step
-        let stepIntervalId;
+        const progressLog = document.getElementById('progress-log');
+        const progressStatus = document.getElementById('progress-status');
+        const filesDiv = document.getElementById('generated-files');
 
-        const showFakeSteps = () => {
-            if (currentStep < fakeSteps.length) {
-                resultDiv.innerHTML = `<p>${fakeSteps[currentStep]}</p>`;
-                currentStep++;
-                stepIntervalId = setTimeout(showFakeSteps, stepInterval);
+        const logStep = (text, className) => {
+            const item = document.createElement('li');
+            item.textContent = text;
+            if (className) {
+                item.className = className;
             }
+            progressLog.appendChild(item);
         };
 
-        stepIntervalId = setTimeout(showFakeSteps, stepInterval);
+        const source = new EventSource(`/generate/stream?prompt=${encodeURIComponent(prompt)}`);
+        const finish = () => {
+            source.close();
+            loadingSpinner.style.display = 'none';
+            progressStatus.textContent = '';
+        };
+        const listen = (event, handler) => {
+            source.addEventListener(event, (message) => handler(JSON.parse(message.data)));
+        };
 
-        try {
-            const response = await fetch(`/generate?prompt=${encodeURIComponent(prompt)}`);
-            clearTimeout(stepIntervalId); // Clear the interval for fake steps
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+        listen('stage', (data) => {
+            const label = stageLabels[data.stage] || data.stage;
+            logStep(data.attempt ? `${label} (attempt ${data.attempt})...` : `${label}...`);
+        });
+        listen('scaffold', (data) => {
+            if (data.name !== 'none') {
+                logStep(`Using the ${data.name} project scaffold`);
             }
-            const data = await response.json();
-
-            if (data.error) {
-                resultDiv.innerHTML = `<div class="error">Error: ${data.error}</div>`;
-            } else if (data.preview_url) {
-                const sandboxUrl = `https://${data.preview_url.split('/').pop()}.csb.app/`;
-                resultDiv.innerHTML = `
-                    <h3>Generated Sandbox:</h3>
-                    <iframe id="sandbox-frame" src="${data.preview_url}" style="width:100%; height:500px; border:0; border-radius: 4px; overflow:hidden;"></iframe>
-                    <p><a href="${data.preview_url}" target="_blank">Open in new tab</a></p>
-                    <p>Preview URL: <a href="${sandboxUrl}" target="_blank">${sandboxUrl}</a></p>
-                `;
-
-                const iframe = document.getElementById('sandbox-frame');
-                iframe.onload = () => {
-                    const iframeWindow = iframe.contentWindow;
-                    iframeWindow.onerror = (message, source, lineno, colno, error) => {
-                        fetch('/report-error', {
-                            method: 'POST',
-                            headers: {
-                                'Content-Type': 'application/json'
-                            },
-                            body: JSON.stringify({
-                                errorMessage: error ? error.stack : message,
-                                prompt
-                            })
-                        }).then(res => res.json())
-                          .then(data => {
-                              if (data.fixed_code) {
-                                  // Display the fixed code or update the iframe
-                                  resultDiv.innerHTML += `<pre>${data.fixed_code}</pre>`;
-                              } else if (data.error) {
-                                  resultDiv.innerHTML += `<div class="error">Error: ${data.error}</div>`;
-                              }
-                          });
-                    };
-                };
-            } else {
-                resultDiv.innerHTML = `<div class="error">Unexpected response from server</div>`;
+        });
+        listen('progress', (data) => {
+            progressStatus.textContent = `Received ${data.tokens} tokens (${data.chars} characters)`;
+        });
+        listen('parse_error', (data) => {
+            logStep(`Malformed output, retrying: ${data.message}`, 'error');
+        });
+        // A file is sent again when it is repaired or served from a cache; show only its latest version
+        const fileElements = new Map();
+        listen('file', (data) => {
+            let details = fileElements.get(data.name);
+            if (!details) {
+                details = document.createElement('details');
+                details.className = 'generated-file';
+                details.dataset.name = data.name;
+                fileElements.set(data.name, details);
+                filesDiv.appendChild(details);
             }
-        } catch (error) {
-            clearTimeout(stepIntervalId); // Clear the interval for fake steps in case of an error
-            resultDiv.innerHTML = `<div class="error">Error: ${error.message}</div>`;
-        } finally {
-            loadingSpinner.style.display = 'none';
-        }
+            const open = details.open;
+            details.innerHTML = `<summary>${escapeHtml(data.name)}</summary><pre>${escapeHtml(data.content)}</pre>`;
+            details.open = open;
+        });
+        listen('verification', (data) => {
+            const label = data.stage === 'static' ? 'Local checks' : `Verification ${data.attempt}`;
+            logStep(`${label}: ${data.passed ? 'passed' : 'failed'}`, data.passed ? '' : 'error');
+            (data.findings || []).forEach((finding) => logStep(finding, 'error'));
+        });
+        listen('coalesced', () => {
+            logStep('Joined an identical generation that was already running');
+        });
+        listen('cache', (data) => {
+            logStep(data.similar ? 'Found a cached result for a near-identical prompt' : 'Found a cached result for this prompt');
+        });
+        listen('seed', (data) => {
+            logStep(`Starting from the project for a similar prompt: ${data.prompt}`);
+        });
+        listen('sandbox', (data) => {
+            logStep(data.reused ? `Reusing sandbox ${data.sandbox_id}` : `Created sandbox ${data.sandbox_id}`);
+        });
+        listen('done', (data) => {
+            finish();
+            renderSandbox(data.preview_url, prompt);
+        });
+        source.addEventListener('error', (message) => {
+            finish();
+            let error = 'Connection to the server was lost';
+            if (message.data) {
+                error = JSON.parse(message.data).error || error;
+            }
+            logStep(`Error: ${error}`, 'error');
+        });
     });
 });
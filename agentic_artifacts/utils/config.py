@@ -1,6 +1,141 @@
 import os
 from dotenv import load_dotenv
 
+load_dotenv()
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+def _env_list(name, default):
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+# CodeSandbox define API client
+CODESANDBOX_DEFINE_URL = os.getenv("CODESANDBOX_DEFINE_URL", "https://codesandbox.io/api/v1/sandboxes/define")
+SANDBOX_HTTP2 = _env_bool("AGENTIC_SANDBOX_HTTP2", True)
+SANDBOX_MAX_CONNECTIONS = _env_int("AGENTIC_SANDBOX_MAX_CONNECTIONS", 20)
+SANDBOX_MAX_KEEPALIVE_CONNECTIONS = _env_int("AGENTIC_SANDBOX_MAX_KEEPALIVE_CONNECTIONS", 10)
+SANDBOX_KEEPALIVE_EXPIRY = _env_float("AGENTIC_SANDBOX_KEEPALIVE_EXPIRY", 60.0)
+SANDBOX_CONNECT_TIMEOUT = _env_float("AGENTIC_SANDBOX_CONNECT_TIMEOUT", 5.0)
+SANDBOX_TIMEOUT = _env_float("AGENTIC_SANDBOX_TIMEOUT", 30.0)
+
+# Local state (caches, indexes, job stores)
+CACHE_DIR = os.getenv("AGENTIC_CACHE_DIR", ".agentic_cache")
+
+# Result cache for generate_code
+RESULT_CACHE_ENABLED = _env_bool("AGENTIC_RESULT_CACHE_ENABLED", True)
+RESULT_CACHE_MAX_ENTRIES = _env_int("AGENTIC_RESULT_CACHE_MAX_ENTRIES", 256)
+RESULT_CACHE_TTL = _env_float("AGENTIC_RESULT_CACHE_TTL", 7 * 24 * 3600.0)
+
+# Near-duplicate prompt cache (needs numpy): prompts at least SEMANTIC_CACHE_THRESHOLD similar to a cached one
+# reuse its artifact, and prompts at least SEMANTIC_CACHE_EDIT_THRESHOLD similar have it adapted by an edit request
+SEMANTIC_CACHE_ENABLED = _env_bool("AGENTIC_SEMANTIC_CACHE_ENABLED", True)
+SEMANTIC_CACHE_MAX_ENTRIES = _env_int("AGENTIC_SEMANTIC_CACHE_MAX_ENTRIES", 4096)
+SEMANTIC_CACHE_DIMENSIONS = _env_int("AGENTIC_SEMANTIC_CACHE_DIMENSIONS", 1024)
+SEMANTIC_CACHE_THRESHOLD = _env_float("AGENTIC_SEMANTIC_CACHE_THRESHOLD", 0.85)
+SEMANTIC_CACHE_EDIT_THRESHOLD = _env_float("AGENTIC_SEMANTIC_CACHE_EDIT_THRESHOLD", 0.5)
+
+# Coalesce identical in-flight prompts into one pipeline run
+SINGLEFLIGHT_ENABLED = _env_bool("AGENTIC_SINGLEFLIGHT_ENABLED", True)
+
+# Fingerprint -> sandbox_id index used to reuse sandboxes for identical file sets
+SANDBOX_INDEX_ENABLED = _env_bool("AGENTIC_SANDBOX_INDEX_ENABLED", True)
+SANDBOX_INDEX_MAX_ENTRIES = _env_int("AGENTIC_SANDBOX_INDEX_MAX_ENTRIES", 4096)
+
+# LLM verification: "sequential" (the default) calls one verifier at a time until one passes; "quorum" runs
+# VERIFY_QUORUM_VOTERS verifiers concurrently, which is faster but costs up to that many calls per verification
+VERIFY_MODE = os.getenv("AGENTIC_VERIFY_MODE", "sequential").strip().lower()
+VERIFY_QUORUM_VOTERS = _env_int("AGENTIC_VERIFY_QUORUM_VOTERS", 3)
+VERIFY_QUORUM_REQUIRED = _env_int("AGENTIC_VERIFY_QUORUM_REQUIRED", 2)
+
+# Project scaffold generated app files are merged into: "auto" (vanilla JS when the prompt asks for it,
+# React otherwise), "react", "vanilla", or "none" to have the LLM write every file itself
+SCAFFOLD = os.getenv("AGENTIC_SCAFFOLD", "auto").strip().lower()
+
+# After a failed verification, regenerate only the files with findings and keep the rest
+REPAIR_ENABLED = _env_bool("AGENTIC_REPAIR_ENABLED", True)
+
+# LLM scheduler: provider limits (0 disables a bucket) and adaptive concurrency
+LLM_MAX_RPM = _env_int("AGENTIC_LLM_MAX_RPM", 500)
+LLM_MAX_TPM = _env_int("AGENTIC_LLM_MAX_TPM", 300000)
+LLM_INITIAL_CONCURRENCY = _env_int("AGENTIC_LLM_INITIAL_CONCURRENCY", 8)
+LLM_MIN_CONCURRENCY = _env_int("AGENTIC_LLM_MIN_CONCURRENCY", 1)
+LLM_MAX_CONCURRENCY = _env_int("AGENTIC_LLM_MAX_CONCURRENCY", 64)
+LLM_LATENCY_TOLERANCE = _env_float("AGENTIC_LLM_LATENCY_TOLERANCE", 2.0)
+LLM_PRIORITY_AGING = _env_float("AGENTIC_LLM_PRIORITY_AGING", 10.0)
+LLM_RATE_LIMIT_BACKOFF = _env_float("AGENTIC_LLM_RATE_LIMIT_BACKOFF", 2.0)
+
+# Model routing: comma-separated models per stage, tried in order (AGENTIC_LLM_MODELS_VERIFY and so on).
+# Every stage defaults to gpt-4o alone; smaller models and failovers are opt-in, e.g.
+# AGENTIC_LLM_MODELS_VERIFY=gpt-4o-mini,gpt-4o
+LLM_MODELS = {
+    stage: _env_list(f"AGENTIC_LLM_MODELS_{stage.upper()}", "gpt-4o")
+    for stage in ("generate", "verify", "plan", "overview")
+}
+# Seconds; a model whose p90 latency for a stage goes above this is tried last for a while
+LLM_LATENCY_BUDGETS = {
+    stage: _env_float(f"AGENTIC_LLM_LATENCY_BUDGET_{stage.upper()}", default)
+    for stage, default in (("generate", 240.0), ("verify", 30.0), ("plan", 60.0), ("overview", 60.0))
+}
+LLM_ROUTER_WINDOW = _env_int("AGENTIC_LLM_ROUTER_WINDOW", 50)
+LLM_ROUTER_MIN_SAMPLES = _env_int("AGENTIC_LLM_ROUTER_MIN_SAMPLES", 5)
+LLM_ROUTER_MAX_ERROR_RATE = _env_float("AGENTIC_LLM_ROUTER_MAX_ERROR_RATE", 0.5)
+LLM_ROUTER_COOLDOWN = _env_float("AGENTIC_LLM_ROUTER_COOLDOWN", 60.0)
+
+# Hedged LLM requests: a call with no response (or first chunk) by the given percentile of recent
+# latencies is duplicated; at most LLM_HEDGE_MAX_RATE of calls, plus a burst of LLM_HEDGE_BURST, are hedged
+LLM_HEDGE_ENABLED = _env_bool("AGENTIC_LLM_HEDGE_ENABLED", True)
+LLM_HEDGE_PERCENTILE = _env_float("AGENTIC_LLM_HEDGE_PERCENTILE", 95.0)
+LLM_HEDGE_MAX_RATE = _env_float("AGENTIC_LLM_HEDGE_MAX_RATE", 0.05)
+LLM_HEDGE_BURST = _env_int("AGENTIC_LLM_HEDGE_BURST", 5)
+LLM_HEDGE_MIN_SAMPLES = _env_int("AGENTIC_LLM_HEDGE_MIN_SAMPLES", 20)
+LLM_HEDGE_MIN_DELAY = _env_float("AGENTIC_LLM_HEDGE_MIN_DELAY", 0.5)
+
+# Seconds a request (or background job) may run end to end, across every stage and retry; 0 disables
+REQUEST_DEADLINE = _env_float("AGENTIC_REQUEST_DEADLINE", 300.0)
+# Seconds of the deadline a generation attempt leaves for verification and publishing (at most half of what is left)
+GENERATION_RESERVE = _env_float("AGENTIC_GENERATION_RESERVE", 60.0)
+
+# Background job queue
+JOB_WORKERS = _env_int("AGENTIC_JOB_WORKERS", 4)
+JOB_QUEUE_MAX_DEPTH = _env_int("AGENTIC_JOB_QUEUE_MAX_DEPTH", 100)
+# Seconds between writes of a running job's partial result to the job store (it is always written on completion)
+JOB_PARTIAL_FLUSH_INTERVAL = _env_float("AGENTIC_JOB_PARTIAL_FLUSH_INTERVAL", 2.0)
+
+# POST /generate/batch: prompts per batch, and pipelines running at once across all batches
+BATCH_MAX_PROMPTS = _env_int("AGENTIC_BATCH_MAX_PROMPTS", 100)
+BATCH_CONCURRENCY = _env_int("AGENTIC_BATCH_CONCURRENCY", 8)
+
+# Record/replay of LLM and define API traffic: "off", "record" or "replay"
+CASSETTE_MODE = os.getenv("AGENTIC_CASSETTE_MODE", "off").strip().lower()
+CASSETTE_PATH = os.getenv("AGENTIC_CASSETTE_PATH", os.path.join(CACHE_DIR, "cassette.jsonl"))
+# Recorded latencies are divided by this on replay (10 replays ten times faster); 0 replays with no delays
+CASSETTE_SPEED = _env_float("AGENTIC_CASSETTE_SPEED", 1.0)
+
+# Append finished spans to this file as OTLP/JSON lines; empty disables the exporter
+TRACE_FILE = os.getenv("AGENTIC_TRACE_FILE", "")
+
+# SQLite ledger of LLM token use and cost with daily rollups
+USAGE_LEDGER_ENABLED = _env_bool("AGENTIC_USAGE_LEDGER_ENABLED", True)
+# Rows are written in batches by a background thread from a queue of this many rows
+USAGE_LEDGER_QUEUE_SIZE = _env_int("AGENTIC_USAGE_LEDGER_QUEUE_SIZE", 10000)
+
+# Logging: records are written by a background thread from a queue of this many records
+LOG_LEVEL = os.getenv("AGENTIC_LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = _env_int("AGENTIC_LOG_QUEUE_SIZE", 10000)
+# Large payloads (LLM responses, file sets) are cut to this many characters per field
+LOG_MAX_FIELD_CHARS = _env_int("AGENTIC_LOG_MAX_FIELD_CHARS", 2000)
+# Fraction of payloads kept in full, inline or in LOG_PAYLOAD_FILE when that is set
+LOG_PAYLOAD_SAMPLE_RATE = _env_float("AGENTIC_LOG_PAYLOAD_SAMPLE_RATE", 0.01)
+LOG_PAYLOAD_FILE = os.getenv("AGENTIC_LOG_PAYLOAD_FILE", "")
+LOG_PAYLOAD_MAX_BYTES = _env_int("AGENTIC_LOG_PAYLOAD_MAX_BYTES", 50 * 2**20)
+LOG_PAYLOAD_BACKUPS = _env_int("AGENTIC_LOG_PAYLOAD_BACKUPS", 5)
+
 def check_environment():
     load_dotenv()
     
@@ -0,0 +1,102 @@
+# deadline.py file that carries a request-wide deadline through the pipeline. The request handlers (/generate, /generate/stream and background jobs) open within(AGENTIC_REQUEST_DEADLINE) around the pipeline; the deadline lives in a context variable, so every stage and every task started by the pipeline sees it. LLM calls and the define API POST cap their timeouts at the time remaining and fail with DeadlineExceeded once it is used up, and each generation attempt gets what is left minus a reserve for the stages after it, from leaving(). Work given up on, because the deadline passed or because the client disconnected, is counted in agentic_abandoned_requests_total.
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+from agentic_artifacts.utils.metrics import registry
+
+T = TypeVar("T")
+
+ABANDONED = registry.counter(
+    "agentic_abandoned_requests_total", "Requests whose pipeline was stopped before it finished", ["endpoint", "reason"])
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before the pipeline finished."""
+
+class Deadline:
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+@contextmanager
+def within(seconds, endpoint=None):
+    """Run the block under a deadline seconds from now (0 or None for none). A deadline already in force
+    is only ever tightened. When endpoint is given, a block ending in DeadlineExceeded is counted as abandoned."""
+    current = _current.get()
+    token = None
+    if seconds:
+        deadline = Deadline(seconds)
+        if current is None or deadline.expires_at < current.expires_at:
+            token = _current.set(deadline)
+    try:
+        yield
+    except DeadlineExceeded:
+        if endpoint is not None:
+            ABANDONED.inc(endpoint=endpoint, reason="deadline")
+        raise
+    finally:
+        if token is not None:
+            _current.reset(token)
+
+@contextmanager
+def separate(seconds):
+    """Run the block under its own deadline seconds from now (0 or None for none), replacing any deadline
+    in force. For work shared by several requests, which must not end when one of them runs out of time."""
+    token = _current.set(Deadline(seconds) if seconds else None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+def check():
+    """Raise DeadlineExceeded if the current deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+def timeout(default=None) -> Optional[float]:
+    """A timeout of at most default seconds that also ends by the current deadline."""
+    check()
+    left = remaining()
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+def leaving(reserve, default=None) -> Optional[float]:
+    """A timeout that keeps reserve seconds of the time left for later work, capped at default. At most half
+    of the time left is held back, so a nearly spent deadline still leaves this step a usable timeout."""
+    check()
+    left = remaining()
+    if left is None:
+        return default
+    portion = left - min(reserve, left / 2)
+    return portion if default is None else min(default, portion)
+
+async def bound(awaitable: Awaitable[T]) -> T:
+    """Await awaitable, failing with DeadlineExceeded if the current deadline passes first."""
+    try:
+        left = timeout()
+    except DeadlineExceeded:
+        close = getattr(awaitable, "close", None)
+        if close is not None:
+            close()
+        raise
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded") from None
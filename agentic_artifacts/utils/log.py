@@ -0,0 +1,151 @@
+# log.py file that sets up the app's logging so writing a log line costs about the same no matter how big the logged value is. configure_logging() puts a queue handler on the root logger and moves the formatting and writing of records to a listener thread; records are not formatted on the request path, and when the queue is full new records are dropped and counted instead of blocking. log_payload() is for large values such as raw LLM responses and generated file sets: the value is wrapped in a Payload that is only turned into text by the listener, truncated to AGENTIC_LOG_MAX_FIELD_CHARS per field. A sample of payloads (AGENTIC_LOG_PAYLOAD_SAMPLE_RATE) is kept in full, either inline or, when AGENTIC_LOG_PAYLOAD_FILE is set, as a JSON line in that rotating file, with the log line giving the payload id to look it up by.
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+
+PAYLOAD_LOGGER = "agentic_artifacts.payloads"
+
+DROPPED_RECORDS = registry.counter("agentic_log_records_dropped_total", "Log records dropped because the log queue was full", ["logger"])
+PAYLOADS = registry.counter("agentic_log_payloads_total", "Payloads logged, by how much of them was kept", ["mode"])
+
+_lock = threading.Lock()
+_listeners: List[logging.handlers.QueueListener] = []
+_payload_logger: Optional[logging.Logger] = None
+
+def _preview(value, limit):
+    """Text of value cut to about limit characters. Strings and dicts are cut without rendering all of them;
+    a dict is shown key by key, each value cut to what is left of the limit."""
+    if limit is None:
+        return value if isinstance(value, str) else str(value)
+    if isinstance(value, dict):
+        parts = []
+        budget = limit
+        for key, item in value.items():
+            if budget <= 0:
+                parts.append(f"...[{len(value) - len(parts)} more keys]")
+                break
+            part = f"{key!r}: {_preview(item, budget)!r}"
+            parts.append(part)
+            budget -= len(part)
+        return "{" + ", ".join(parts) + "}"
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...[{len(text) - limit} more chars]"
+
+class Payload:
+    """A logged value that is rendered (and truncated) only when its record is formatted."""
+    __slots__ = ("value", "limit", "payload_id")
+
+    def __init__(self, value, limit=None, payload_id=None):
+        # Dicts are copied so later changes to the caller's dict do not leak into the record
+        self.value = dict(value) if isinstance(value, dict) else value
+        self.limit = limit
+        self.payload_id = payload_id
+
+    def __str__(self):
+        text = _preview(self.value, self.limit)
+        if self.payload_id:
+            text += f" [payload id={self.payload_id}]"
+        return text
+
+class _PayloadLine:
+    __slots__ = ("payload_id", "label", "value", "created")
+
+    def __init__(self, payload_id, label, value):
+        self.payload_id = payload_id
+        self.label = label
+        self.value = dict(value) if isinstance(value, dict) else value
+        self.created = time.time()
+
+    def __str__(self):
+        value = self.value
+        if not isinstance(value, (str, dict, list)):
+            value = str(value)
+        return json.dumps({"id": self.payload_id, "time": self.created, "label": self.label, "payload": value},
+                          default=str)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener and drops records when the queue is full."""
+
+    def prepare(self, record):
+        # Tracebacks are rendered now; the frames they refer to may be gone by the time the listener runs
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED_RECORDS.inc(logger=record.name)
+
+def _start_listener(target: logging.Logger, handler: logging.Handler):
+    log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    target.addHandler(_DeferredQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+def configure_logging(level=None):
+    """Send log records through a background listener. Safe to call more than once."""
+    global _payload_logger
+    with _lock:
+        if _listeners:
+            return
+        root = logging.getLogger()
+        root.setLevel(level or config.LOG_LEVEL.upper())
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        _start_listener(root, stream)
+
+        if config.LOG_PAYLOAD_FILE:
+            os.makedirs(os.path.dirname(config.LOG_PAYLOAD_FILE) or ".", exist_ok=True)
+            payload_logger = logging.getLogger(PAYLOAD_LOGGER)
+            payload_logger.propagate = False
+            payload_logger.setLevel(logging.INFO)
+            rotating = logging.handlers.RotatingFileHandler(
+                config.LOG_PAYLOAD_FILE,
+                maxBytes=config.LOG_PAYLOAD_MAX_BYTES,
+                backupCount=config.LOG_PAYLOAD_BACKUPS,
+                encoding="utf-8",
+            )
+            _start_listener(payload_logger, rotating)
+            _payload_logger = payload_logger
+        atexit.register(stop_logging)
+
+def stop_logging():
+    """Write out queued records and stop the listener threads."""
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
+
+def log_payload(target: logging.Logger, label, value, level=logging.INFO):
+    """Log "label: value" with value truncated, keeping a sample of payloads in full."""
+    if not target.isEnabledFor(level):
+        return
+    limit = config.LOG_MAX_FIELD_CHARS
+    payload_id = None
+    mode = "truncated"
+    if config.LOG_PAYLOAD_SAMPLE_RATE > 0 and random.random() < config.LOG_PAYLOAD_SAMPLE_RATE:
+        if _payload_logger is not None:
+            payload_id = uuid.uuid4().hex[:16]
+            _payload_logger.info("%s", _PayloadLine(payload_id, label, value))
+            mode = "offloaded"
+        else:
+            limit = None
+            mode = "full"
+    PAYLOADS.inc(mode=mode)
+    target.log(level, "%s: %s", label, Payload(value, limit, payload_id))
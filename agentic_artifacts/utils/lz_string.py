@@ -0,0 +1,209 @@
+# lz_string.py file that implements LZString's compressToBase64 and decompressFromBase64, tuned for CPython. Longest matches are found by galloping over substring lengths (the dictionary is prefix-closed) rather than one character per loop iteration, codes are written as precomputed or format()-built bit strings that are joined once, and the final 6-bit grouping is done by the C base64 encoder instead of a per-bit loop. Output is identical to the lzstring package for all text in the Basic Multilingual Plane; characters outside it are written as UTF-16 surrogate pairs, like the reference JavaScript implementation CodeSandbox decodes with (the Python package truncates them).
+import base64
+import re
+
+KEY_STR_BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+
+# Bit strings of 8- and 16-bit literals, least significant bit first as LZString writes them
+_LITERAL8 = [format(i, "08b")[::-1] for i in range(256)]
+# Padding reads as 64, whose low six bits are all zero
+_BASE64_BITS = {ord(ch): format(i & 63, "06b") for i, ch in enumerate(KEY_STR_BASE64)}
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+_SURROGATE = re.compile("[\ud800-\udfff]")
+
+def _split_astral(match):
+    code = ord(match.group()) - 0x10000
+    return chr(0xD800 + (code >> 10)) + chr(0xDC00 + (code & 0x3FF))
+
+def _to_utf16_units(text):
+    """Represent characters outside the BMP as surrogate pairs, as JavaScript strings do."""
+    if _ASTRAL.search(text):
+        return _ASTRAL.sub(_split_astral, text)
+    return text
+
+def _from_utf16_units(text):
+    if _SURROGATE.search(text):
+        return text.encode("utf-16-le", "surrogatepass").decode("utf-16-le", "replace")
+    return text
+
+def _compress_bits(text):
+    """Run the LZString dictionary coder over text and return the output as a string of '0'/'1'."""
+    out = []
+    emit = out.append
+    # Phrase -> code. The dictionary is prefix-closed (every phrase is an earlier phrase plus one
+    # character), so the longest phrase starting at i is found by galloping over slice lengths
+    # instead of extending the match one character at a time.
+    dictionary = {}
+    pending = {}
+    dict_size = 3
+    num_bits = 2
+    enlarge_in = 2
+    code_format = "02b"
+    longest = 1
+    n = len(text)
+    i = 0
+    if n:
+        dictionary[text[0]] = dict_size
+        pending[dict_size] = text[0]
+        dict_size += 1
+
+    lookup = dictionary.get
+    while i < n:
+        limit = n - i
+        if limit > longest:
+            limit = longest
+        low = 1
+        w_code = lookup(text[i])
+        high = 2
+        while high <= limit:
+            code = lookup(text[i:i + high])
+            if code is None:
+                break
+            low = high
+            w_code = code
+            high <<= 1
+        if high > limit:
+            high = limit + 1
+        while high - low > 1:
+            middle = (low + high) >> 1
+            code = lookup(text[i:i + middle])
+            if code is None:
+                high = middle
+            else:
+                low = middle
+                w_code = code
+        j = i + low
+
+        if j < n:
+            c = text[j]
+            if c not in dictionary:
+                dictionary[c] = dict_size
+                pending[dict_size] = c
+                dict_size += 1
+
+        # Output the code for w
+        char = pending.pop(w_code, None)
+        if char is not None:
+            value = ord(char)
+            if value < 256:
+                emit("0" * num_bits)
+                emit(_LITERAL8[value])
+            else:
+                emit("1" + "0" * (num_bits - 1))
+                emit(_LITERAL8[value & 0xFF] + _LITERAL8[value >> 8])
+            enlarge_in -= 1
+            if enlarge_in == 0:
+                enlarge_in = 1 << num_bits
+                num_bits += 1
+                code_format = f"0{num_bits}b"
+        else:
+            emit(format(w_code, code_format)[::-1])
+        enlarge_in -= 1
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
+            code_format = f"0{num_bits}b"
+
+        if j < n:
+            dictionary[text[i:j + 1]] = dict_size
+            dict_size += 1
+            if low + 1 > longest:
+                longest = low + 1
+        i = j
+
+    if not n:
+        enlarge_in -= 1
+        if enlarge_in == 0:
+            num_bits += 1
+            code_format = f"0{num_bits}b"
+
+    # End of stream marker
+    emit(format(2, code_format)[::-1])
+    return "".join(out)
+
+def compress_to_base64(text):
+    """Equivalent of LZString.compressToBase64."""
+    if text is None:
+        return ""
+    bits = _compress_bits(_to_utf16_units(text))
+    # LZString always flushes one more (possibly all-zero) character after the last bit
+    n_chars = len(bits) // 6 + 1
+    padded_bits = -(-n_chars * 6 // 24) * 24
+    value = int(bits, 2) << (padded_bits - len(bits))
+    encoded = base64.b64encode(value.to_bytes(padded_bits // 8, "big")).decode("ascii")[:n_chars]
+    remainder = n_chars % 4
+    if remainder:
+        encoded += "=" * (4 - remainder)
+    return encoded
+
+def decompress_from_base64(compressed):
+    """Equivalent of LZString.decompressFromBase64. Returns None for malformed input."""
+    if compressed is None:
+        return ""
+    if compressed == "":
+        return None
+    length = len(compressed)
+    try:
+        bits = compressed.translate(_BASE64_BITS)
+    except (KeyError, TypeError):
+        return None
+    if len(bits) != length * 6:
+        # Characters outside the alphabet pass through translate unchanged
+        return None
+
+    pos = 0
+
+    def read(n):
+        nonlocal pos
+        chunk = bits[pos:pos + n]
+        pos += n
+        return int(chunk[::-1], 2) if len(chunk) == n else -1
+
+    first = read(2)
+    if first == 0 or first == 1:
+        literal = read(8 if first == 0 else 16)
+        if literal < 0:
+            return None
+        c = chr(literal)
+    else:
+        return ""
+
+    dictionary = ["", "", "", c]
+    w = c
+    result = [c]
+    num_bits = 3
+    enlarge_in = 4
+    while True:
+        if pos // 6 >= length:
+            return ""
+        code = read(num_bits)
+        if code < 0:
+            return None
+        if code == 0 or code == 1:
+            literal = read(8 if code == 0 else 16)
+            if literal < 0:
+                return None
+            dictionary.append(chr(literal))
+            code = len(dictionary) - 1
+            enlarge_in -= 1
+        elif code == 2:
+            return _from_utf16_units("".join(result))
+
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
+
+        if code < len(dictionary):
+            entry = dictionary[code]
+        elif code == len(dictionary):
+            entry = w + w[0]
+        else:
+            return None
+        result.append(entry)
+
+        dictionary.append(w + entry[0])
+        enlarge_in -= 1
+        w = entry
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
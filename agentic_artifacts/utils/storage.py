@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+def read_json(path, default=None):
+    """Load a JSON file, returning default when it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def atomic_write_json(path, data):
+    """Write JSON to path via a temp file and rename so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class DebouncedSave:
+    """Coalesces saves of an in-memory structure. request() schedules a save delay seconds later on the
+    running loop: snapshot() is taken on the loop and write(snapshot) runs in a worker thread. Without a
+    running loop the save happens at once. flush() writes a pending save now, for shutdown."""
+
+    def __init__(self, snapshot: Callable[[], Any], write: Callable[[Any], None], delay=2.0):
+        self.snapshot = snapshot
+        self.write = write
+        self.delay = delay
+        self.dirty = False
+        # Pending timer and the loop it is scheduled on; the sync wrappers run each call on a fresh loop
+        self._timer: Optional[Tuple[asyncio.TimerHandle, asyncio.AbstractEventLoop]] = None
+        self._lock = threading.Lock()
+        # Snapshots are numbered so a slow write of an older one never replaces a newer one
+        self._taken = 0
+        self._written = 0
+
+    def _take(self):
+        self._taken += 1
+        self.dirty = False
+        return self._taken, self.snapshot()
+
+    def _write(self, numbered):
+        number, snapshot = numbered
+        with self._lock:
+            if number < self._written:
+                return
+            self.write(snapshot)
+            self._written = number
+
+    def request(self):
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._timer is not None:
+            timer, timer_loop = self._timer
+            if timer_loop is loop and not timer.cancelled():
+                return
+            # Scheduled on a loop that is gone, so it would never run
+            timer.cancel()
+        self._timer = (loop.call_later(self.delay, self._fire), loop)
+
+    def _fire(self):
+        self._timer = None
+        if self.dirty:
+            asyncio.ensure_future(asyncio.to_thread(self._write, self._take()))
+
+    @property
+    def pending(self):
+        return self.dirty or self._timer is not None
+
+    def flush(self):
+        """Write now if a save is pending."""
+        if self._timer is not None:
+            self._timer[0].cancel()
+            self._timer = None
+        if self.dirty:
+            self._write(self._take())
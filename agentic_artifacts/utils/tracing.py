@@ -0,0 +1,172 @@
+# tracing.py file that times pipeline stages with lightweight spans. span(name, **attributes) is a with block around sync or async code, and traced(name) does the same for a whole function. The active span lives in a context variable, so nested spans (an LLM attempt inside generate_code_files) and tasks started inside a span get the right parent. Every finished span is observed in the agentic_stage_duration_seconds histogram. When AGENTIC_TRACE_FILE is set, finished spans are also written to that file in OpenTelemetry's OTLP/JSON encoding, one ExportTraceServiceRequest per line, the format the OpenTelemetry Collector's file exporter and receiver use.
+import asyncio
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from agentic_artifacts.utils import config
+from agentic_artifacts.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "agentic-artifacts"
+
+STAGE_DURATION = registry.histogram(
+    "agentic_stage_duration_seconds",
+    "Duration of pipeline stages and LLM calls",
+    ["stage", "outcome"],
+)
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns",
+                 "_started", "duration", "outcome", "error")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter()
+        self.duration = 0.0
+        self.outcome = "ok"
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self):
+        self.duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+@contextmanager
+def span(name, activate=True, **attributes):
+    """Time a block as a span named name. Pass activate=False inside async generators, where the
+    block can be suspended and resumed in another context, so the span is not made current."""
+    parent = _current.get()
+    current = Span(name, parent, attributes)
+    token = _current.set(current) if activate else None
+    try:
+        yield current
+    except asyncio.CancelledError:
+        current.outcome = "cancelled"
+        raise
+    except GeneratorExit:
+        current.outcome = "closed"
+        raise
+    except BaseException as e:
+        current.outcome = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if token is not None:
+            _current.reset(token)
+        current.end()
+        STAGE_DURATION.observe(current.duration, stage=name, outcome=current.outcome)
+        if exporter is not None:
+            exporter.export(current)
+
+def traced(name):
+    """Decorator running a sync or async function inside span(name)."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(finished: Span):
+    encoded = {
+        "traceId": finished.trace_id,
+        "spanId": finished.span_id,
+        "name": finished.name,
+        "kind": 1,
+        "startTimeUnixNano": str(finished.start_ns),
+        "endTimeUnixNano": str(finished.end_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in finished.attributes.items()],
+        # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+        "status": {"code": 1} if finished.outcome == "ok" else {"code": 2, "message": finished.error or finished.outcome},
+    }
+    if finished.parent_id:
+        encoded["parentSpanId"] = finished.parent_id
+    return encoded
+
+class FileSpanExporter:
+    """Buffer finished spans and append them to path as OTLP/JSON lines."""
+
+    def __init__(self, path, batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, finished: Span):
+        with self._lock:
+            self._buffer.append(finished)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "agentic_artifacts"},
+                    "spans": [_otlp_span(finished) for finished in batch],
+                }],
+            }]
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+            self.exported += len(batch)
+        except OSError as e:
+            logger.warning(f"Could not write spans to {self.path}: {e}")
+
+exporter: Optional[FileSpanExporter] = FileSpanExporter(config.TRACE_FILE) if config.TRACE_FILE else None
+
+async def shutdown():
+    """Write out spans still buffered when the app stops."""
+    if exporter is not None:
+        exporter.flush()
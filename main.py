@@ -6,16 +6,12 @@ import threading
 import webbrowser
 from typing import Dict
 from dotenv import load_dotenv
-from litestar import Litestar, get
-from litestar.response import Template
-from litestar.static_files import StaticFilesConfig
-from litestar.template import TemplateConfig
-from litestar.contrib.jinja import JinjaTemplateEngine
 from agentic_artifacts.utils.config import check_environment
-from agentic_artifacts.api.routes import home, generate_artifact, plan_artifact, overview_artifact
+from agentic_artifacts.api.routes import app
+from agentic_artifacts.utils.log import configure_logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def display_banner():
@@ -28,21 +24,6 @@ def display_banner():
        |___/                                                               
     """)
 
-@get("/")
-async def root() -> Template:
-    return Template(template_name="index.html", context={"message": "Welcome to Agentic Artifacts"})
-
-app = Litestar(
-    route_handlers=[home, plan_artifact, overview_artifact, generate_artifact],
-    template_config=TemplateConfig(
-        directory="agentic_artifacts/ui/templates",
-        engine=JinjaTemplateEngine
-    ),
-    static_files_config=[
-        StaticFilesConfig(directories=["agentic_artifacts/ui/static"], path="/static")
-    ]
-)
-
 def run_server():
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
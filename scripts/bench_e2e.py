@@ -0,0 +1,363 @@
+# bench_e2e.py script that benchmarks the whole artifact pipeline without touching OpenAI or CodeSandbox. The real agenerate_code path (or the /generate route through the Litestar app) runs against a deterministic fake completion backend with configurable time-to-first-token and token rate, and the CodeSandbox define API is replaced by a local HTTP stand-in running in a child process. For each concurrency level it reports p50/p95/p99 latency, requests/s, and CPU time and memory per request, and writes everything to a JSON file so runs can be compared across releases.
+# Usage: python scripts/bench_e2e.py [--path pipeline|api] [--concurrency 1,4,16] [--requests 32] [--ttft 0.3] [--tokens-per-second 400] [--output FILE]
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Local CodeSandbox stand-in
+
+class DefineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if url.path != "/api/v1/sandboxes/define":
+            self._reply(404, {"error": "not found"})
+            return
+        parameters = parse_qs(url.query).get("parameters", [""])[0]
+        if not parameters:
+            self._reply(422, {"error": "missing parameters"})
+            return
+        time.sleep(self.server.latency)
+        self._reply(200, {"sandbox_id": hashlib.sha1(parameters.encode()).hexdigest()[:8]})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_define_api(port_queue, latency):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DefineHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+def start_define_api(latency):
+    """Run the stand-in in a child process so its CPU time is not charged to the pipeline."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_define_api, args=(port_queue, latency), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=10)
+    return process, f"http://127.0.0.1:{port}/api/v1/sandboxes/define"
+
+# Fake completion backend
+
+PACKAGE_JSON = json.dumps({
+    "dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0", "react-scripts": "5.0.1"},
+}, indent=2)
+
+FILE_TEMPLATES = {
+    "index.js": (
+        "import React from 'react';\n"
+        "import { createRoot } from 'react-dom/client';\n"
+        "import App from './App';\n"
+        "import './App.css';\n\n"
+        "const root = createRoot(document.getElementById('root'));\n"
+        "root.render(<App />);\n"
+    ),
+    "App.js": (
+        "import React, { useState } from 'react';\n\n"
+        "// Build {marker}\n"
+        "export default function App() {\n"
+        "  const [count, setCount] = useState(0);\n"
+        "  return (\n"
+        "    <div className=\"app\">\n"
+        "      <h1>Counter</h1>\n"
+        "      <button onClick={() => setCount(count + 1)}>Clicked {count} times</button>\n"
+        "    </div>\n"
+        "  );\n"
+        "}\n"
+    ),
+    "App.css": ".app { font-family: sans-serif; padding: 16px; }\nbutton { padding: 8px 16px; }\n/* {marker} */\n",
+    "package.json": PACKAGE_JSON,
+    "README.md": "# Counter\n\nGenerated for benchmark run {marker}.\n",
+    ".eslintrc.json": "{\n  \"extends\": [\"react-app\"]\n}\n",
+    "babel.config.json": "{\n  \"presets\": [\"@babel/preset-env\", \"@babel/preset-react\"]\n}\n",
+}
+
+def _estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+class FakeLLM:
+    """Deterministic stand-in for litellm.acompletion.
+
+    Generation calls stream the requested files as function call arguments after ttft seconds, at
+    tokens_per_second; every other call answers VALID. Output depends only on the request, so the
+    same prompt always yields the same files.
+    """
+
+    def __init__(self, ttft=0.3, tokens_per_second=400.0, chunk_tokens=8, verify_latency=0.2):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = chunk_tokens
+        self.verify_latency = verify_latency
+        self.calls = 0
+
+    async def __call__(self, **kwargs):
+        from litellm import ModelResponse, Usage
+
+        self.calls += 1
+        prompt_tokens = _estimate_tokens(json.dumps(kwargs.get("messages", [])))
+        if kwargs.get("functions"):
+            return self._stream_files(kwargs, prompt_tokens)
+        await asyncio.sleep(self.verify_latency)
+        return ModelResponse(
+            model=kwargs.get("model"),
+            choices=[{"message": {"role": "assistant", "content": "VALID"}, "finish_reason": "stop"}],
+            usage=Usage(prompt_tokens=prompt_tokens, completion_tokens=1, total_tokens=prompt_tokens + 1),
+        )
+
+    def _files_for(self, kwargs):
+        messages = kwargs.get("messages", [])
+        request = messages[-1]["content"] if messages else ""
+        marker = hashlib.sha256(request.encode()).hexdigest()[:16]
+        properties = kwargs["functions"][0]["parameters"]["properties"]
+        names = [name for name, schema in properties.items() if "content" in schema.get("properties", {})]
+        return {
+            name: {"content": FILE_TEMPLATES.get(name, "// {marker}\n").replace("{marker}", marker)}
+            for name in names
+        }
+
+    async def _stream_files(self, kwargs, prompt_tokens):
+        from litellm import Usage
+        from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+        payload = json.dumps(self._files_for(kwargs))
+        step = self.chunk_tokens * 4
+        delay = self.chunk_tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        await asyncio.sleep(self.ttft)
+        for start in range(0, len(payload), step):
+            yield ModelResponseStream(choices=[StreamingChoices(
+                delta=Delta(function_call={"name": "generate_code_files", "arguments": payload[start:start + step]}),
+                finish_reason=None,
+            )])
+            await asyncio.sleep(delay)
+        completion_tokens = _estimate_tokens(payload)
+        yield ModelResponseStream(
+            choices=[StreamingChoices(delta=Delta(), finish_reason="function_call")],
+            usage=Usage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                        total_tokens=prompt_tokens + completion_tokens),
+        )
+
+# Measurement
+
+def rss_bytes():
+    """Current resident set size (Linux), falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), int(round(q / 100.0 * len(sorted_values) + 0.5))))
+    return sorted_values[rank - 1]
+
+async def run_level(call, concurrency, total, prompt_prefix):
+    latencies = []
+    failures = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal failures
+        for index in remaining:
+            started = time.perf_counter()
+            try:
+                ok = await call(f"{prompt_prefix} #{index}: a counter app with a button")
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Request failed: {e}")
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                failures += 1
+
+    rss_start = rss_bytes()
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+    rss_end = rss_bytes()
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "failures": failures,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(total / wall, 3) if wall else None,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / len(latencies), 4),
+            "max": round(latencies[-1], 4),
+        },
+        "cpu_ms_per_request": round(cpu * 1000 / total, 3),
+        "cpu_utilization": round(cpu / wall, 3) if wall else None,
+        "rss_start_mb": round(rss_start / 2**20, 2),
+        "rss_end_mb": round(rss_end / 2**20, 2),
+        "rss_growth_kb_per_request": round((rss_end - rss_start) / 1024 / total, 2),
+        "peak_rss_mb": round(peak_rss_bytes() / 2**20, 2),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(args, fake_llm):
+    from agentic_artifacts.services import llm_client
+    from agentic_artifacts.services.llm_scheduler import scheduler
+
+    llm_client.set_backend(fake_llm)
+    results = []
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+    if args.path == "api":
+        import httpx
+        from agentic_artifacts.api.routes import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.lifespan(), httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=args.request_timeout
+        ) as client:
+            async def call(prompt):
+                response = await client.get("/generate", params={"prompt": prompt})
+                return response.status_code == 200 and "preview_url" in response.json()
+
+            for level in args.concurrency:
+                results.append(await run_level(call, level, args.requests, f"bench {run_id} c{level}"))
+                results[-1]["scheduler"] = scheduler.snapshot()
+    else:
+        from agentic_artifacts.services import sandbox_client
+        from agentic_artifacts.services.code_generator import agenerate_code
+
+        async def call(prompt):
+            return bool(await agenerate_code(prompt))
+
+        try:
+            for level in args.concurrency:
+                results.append(await run_level(call, level, args.requests, f"bench {run_id} c{level}"))
+                results[-1]["scheduler"] = scheduler.snapshot()
+        finally:
+            await sandbox_client.shutdown()
+    return results
+
+def print_table(results):
+    print(f"{'conc':>5}{'req':>6}{'fail':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'cpu ms/req':>12}{'rss MB':>9}")
+    for row in results:
+        latency = row["latency_s"]
+        print(
+            f"{row['concurrency']:>5}{row['requests']:>6}{row['failures']:>6}{row['requests_per_s']:>9.2f}"
+            f"{latency['p50']:>9.3f}{latency['p95']:>9.3f}{latency['p99']:>9.3f}"
+            f"{row['cpu_ms_per_request']:>12.2f}{row['rss_end_mb']:>9.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the artifact pipeline against local fakes.")
+    parser.add_argument("--path", choices=["pipeline", "api"], default="pipeline",
+                        help="call agenerate_code directly or go through GET /generate")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--ttft", type=float, default=0.3, help="fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="fake LLM streaming rate")
+    parser.add_argument("--chunk-tokens", type=int, default=8, help="tokens per streamed chunk")
+    parser.add_argument("--verify-latency", type=float, default=0.2, help="fake verifier latency (s)")
+    parser.add_argument("--define-latency", type=float, default=0.05, help="define API stand-in latency (s)")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="JSON results path (default bench-results/e2e-<timestamp>.json)")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    define_process, define_url = start_define_api(args.define_latency)
+    cache_dir = tempfile.mkdtemp(prefix="agentic-bench-")
+    # Configuration is read at import time, so point the app at the fakes before importing it.
+    # Provider rate limits are not what is being measured; set the variables to test them.
+    os.environ["CODESANDBOX_DEFINE_URL"] = define_url
+    os.environ["AGENTIC_CACHE_DIR"] = cache_dir
+    os.environ.setdefault("AGENTIC_LLM_MAX_RPM", "0")
+    os.environ.setdefault("AGENTIC_LLM_MAX_TPM", "0")
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    # The benchmark prompts differ only in their number, so near-duplicate caching would turn all but the first
+    # into edits of it instead of full pipeline runs
+    os.environ.setdefault("AGENTIC_SEMANTIC_CACHE_ENABLED", "0")
+
+    fake_llm = FakeLLM(args.ttft, args.tokens_per_second, args.chunk_tokens, args.verify_latency)
+    try:
+        import agentic_artifacts  # noqa: F401  (configures logging)
+        logging.getLogger().setLevel(args.log_level.upper())
+        results = asyncio.run(run_benchmark(args, fake_llm))
+    finally:
+        define_process.terminate()
+
+    report = {
+        "benchmark": "e2e",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "path": args.path,
+        "fake_llm": {
+            "ttft_s": args.ttft,
+            "tokens_per_second": args.tokens_per_second,
+            "chunk_tokens": args.chunk_tokens,
+            "verify_latency_s": args.verify_latency,
+            "calls": fake_llm.calls,
+        },
+        "define_latency_s": args.define_latency,
+        "results": results,
+    }
+    output = args.output or os.path.join("bench-results", f"e2e-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# bench_lzstring.py script that benchmarks the in-project LZString codec (agentic_artifacts.utils.lz_string) against the lzstring package on small, medium and multi-MB sandbox file sets. Every run checks that both produce the same compressToBase64 output and that each decompresses the other's output back to the input.
+# Usage: python scripts/bench_lzstring.py [--repeat N] [--json]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lzstring import LZString
+
+from agentic_artifacts.utils.lz_string import compress_to_base64, decompress_from_base64
+
+COMPONENT_TEMPLATE = """import React, {{ useState, useEffect }} from 'react';
+import './{name}.css';
+
+// {comment}
+function {name}({{ title, items = [] }}) {{
+  const [{state}, set{State}] = useState({initial});
+
+  useEffect(() => {{
+    const id = setInterval(() => set{State}((value) => value + {step}), {delay});
+    return () => clearInterval(id);
+  }}, []);
+
+  return (
+    <div className="{css}">
+      <h2>{{title}} — {label}</h2>
+      <ul>
+        {{items.map((item, index) => (
+          <li key={{index}} onClick={{() => set{State}(index)}}>{{item.{field}}}</li>
+        ))}}
+      </ul>
+      <p>{state}: {{{state}}}</p>
+    </div>
+  );
+}}
+
+export default {name};
+"""
+
+WORDS = ["counter", "value", "total", "score", "ticks", "offset", "level", "progress", "width", "amount"]
+LABELS = ["Overview", "Résumé", "Übersicht", "概要", "Обзор", "Dashboard", "Stats"]
+
+def make_component(rng, index):
+    state = rng.choice(WORDS) + str(index)
+    name = f"Widget{index}"
+    return COMPONENT_TEMPLATE.format(
+        name=name,
+        comment=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))),
+        state=state,
+        State=state[0].upper() + state[1:],
+        initial=rng.randint(0, 100),
+        step=rng.randint(1, 9),
+        delay=rng.choice([100, 250, 500, 1000]),
+        css=f"widget-{rng.choice(WORDS)}",
+        label=rng.choice(LABELS),
+        field=rng.choice(WORDS),
+    )
+
+def make_file_set(target_bytes, seed=0):
+    """Build sandbox parameters JSON of roughly target_bytes, shaped like a generated project."""
+    rng = random.Random(seed)
+    files = {
+        "package.json": {"content": json.dumps({"dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0"}}, indent=2)},
+        "public/index.html": {"content": '<!DOCTYPE html><html><body><div id="root"></div></body></html>'},
+    }
+    size = 0
+    index = 0
+    while size < target_bytes:
+        content = make_component(rng, index)
+        files[f"src/Widget{index}.js"] = {"content": content}
+        size += len(content)
+        index += 1
+    return json.dumps({"files": files})
+
+FILE_SETS = {
+    "small": 4 * 1024,
+    "medium": 128 * 1024,
+    "large": 4 * 1024 * 1024,
+}
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def run(repeat):
+    library = LZString()
+    results = []
+    for name, size in FILE_SETS.items():
+        data = make_file_set(size)
+        runs = repeat if size < 1024 * 1024 else max(1, repeat // 3)
+
+        lib_compress, expected = best_of(runs, library.compressToBase64, data)
+        fast_compress, encoded = best_of(runs, compress_to_base64, data)
+        if encoded != expected:
+            raise AssertionError(f"{name}: compressToBase64 output differs from the lzstring package")
+
+        lib_decompress, lib_decoded = best_of(runs, library.decompressFromBase64, encoded)
+        fast_decompress, decoded = best_of(runs, decompress_from_base64, expected)
+        if decoded != data or lib_decoded != data:
+            raise AssertionError(f"{name}: round trip failed")
+
+        results.append({
+            "file_set": name,
+            "input_bytes": len(data.encode("utf-8")),
+            "encoded_bytes": len(encoded),
+            "lzstring_compress_s": round(lib_compress, 5),
+            "fast_compress_s": round(fast_compress, 5),
+            "compress_speedup": round(lib_compress / fast_compress, 2),
+            "lzstring_decompress_s": round(lib_decompress, 5),
+            "fast_decompress_s": round(fast_decompress, 5),
+            "decompress_speedup": round(lib_decompress / fast_decompress, 2),
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LZString codec against the lzstring package.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best time is reported)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'set':<8}{'input':>12}{'lib comp':>12}{'fast comp':>12}{'x':>7}{'lib decomp':>12}{'fast decomp':>13}{'x':>7}")
+    for row in results:
+        print(
+            f"{row['file_set']:<8}{row['input_bytes']:>12,}"
+            f"{row['lzstring_compress_s']:>12.4f}{row['fast_compress_s']:>12.4f}{row['compress_speedup']:>7.1f}"
+            f"{row['lzstring_decompress_s']:>12.4f}{row['fast_decompress_s']:>13.4f}{row['decompress_speedup']:>7.1f}"
+        )
+    print("Output is identical to lzstring.compressToBase64 and round-trips with both decoders.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# replay_cassette.py script that replays a recorded cassette (see agentic_artifacts/services/cassette.py) through the real pipeline. The prompts captured while recording are reissued to agenerate_code, either at their original arrival times compressed by --speed (open loop) or as fast as --concurrency workers allow (closed loop), while LLM and define API responses come from the cassette with their latencies divided by --speed. Reports the same latency, throughput, CPU and memory figures as bench_e2e.py and writes them as JSON.
+# Usage: python scripts/replay_cassette.py CASSETTE [--speed 10] [--loop open|closed] [--concurrency 8] [--output FILE]
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from bench_e2e import cpu_seconds, git_revision, peak_rss_bytes, percentile, rss_bytes
+
+async def replay(args):
+    from agentic_artifacts.services import cassette as cassette_module
+    from agentic_artifacts.services import sandbox_client
+    from agentic_artifacts.services.code_generator import agenerate_code
+    from agentic_artifacts.services.llm_scheduler import scheduler
+
+    cassette = cassette_module.cassette
+    prompts = cassette.prompts[:args.limit] if args.limit else cassette.prompts
+    if not prompts:
+        raise SystemExit(f"No prompts recorded in {args.cassette}")
+
+    latencies = []
+    failures = 0
+
+    async def issue(prompt):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            ok = bool(await agenerate_code(prompt))
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Replayed request failed: {e}")
+            ok = False
+        latencies.append(time.perf_counter() - started)
+        if not ok:
+            failures += 1
+
+    rss_start = rss_bytes()
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    try:
+        if args.loop == "open":
+            origin = prompts[0]["t"]
+
+            async def at_offset(entry):
+                if args.speed > 0:
+                    await asyncio.sleep((entry["t"] - origin) / args.speed)
+                await issue(entry["prompt"])
+
+            await asyncio.gather(*(at_offset(entry) for entry in prompts))
+        else:
+            remaining = iter(prompts)
+
+            async def worker():
+                for entry in remaining:
+                    await issue(entry["prompt"])
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        await sandbox_client.shutdown()
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+
+    latencies.sort()
+    return {
+        "requests": len(prompts),
+        "failures": failures,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(prompts) / wall, 3) if wall else None,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / len(latencies), 4),
+            "max": round(latencies[-1], 4),
+        },
+        "cpu_ms_per_request": round(cpu * 1000 / len(prompts), 3),
+        "cpu_utilization": round(cpu / wall, 3) if wall else None,
+        "rss_start_mb": round(rss_start / 2**20, 2),
+        "rss_end_mb": round(rss_bytes() / 2**20, 2),
+        "peak_rss_mb": round(peak_rss_bytes() / 2**20, 2),
+        "cassette": cassette.stats(),
+        "scheduler": scheduler.snapshot(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded cassette through the pipeline.")
+    parser.add_argument("cassette", help="JSONL cassette recorded with AGENTIC_CASSETTE_MODE=record")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="divide recorded latencies and arrival gaps by this; 0 removes all delays")
+    parser.add_argument("--loop", choices=["open", "closed"], default="open",
+                        help="open: reissue prompts at their recorded times; closed: --concurrency workers back to back")
+    parser.add_argument("--concurrency", type=int, default=8, help="workers for --loop closed")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N prompts")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="JSON results path (default bench-results/replay-<timestamp>.json)")
+    args = parser.parse_args()
+
+    # Configuration is read at import time. A fresh cache directory keeps earlier runs from
+    # answering prompts that should exercise the pipeline.
+    os.environ["AGENTIC_CASSETTE_MODE"] = "replay"
+    os.environ["AGENTIC_CASSETTE_PATH"] = os.path.abspath(args.cassette)
+    os.environ["AGENTIC_CASSETTE_SPEED"] = str(args.speed)
+    os.environ["AGENTIC_CACHE_DIR"] = tempfile.mkdtemp(prefix="agentic-replay-")
+    os.environ.setdefault("AGENTIC_LLM_MAX_RPM", "0")
+    os.environ.setdefault("AGENTIC_LLM_MAX_TPM", "0")
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+    import agentic_artifacts  # noqa: F401  (configures logging)
+    logging.getLogger().setLevel(args.log_level.upper())
+    result = asyncio.run(replay(args))
+
+    report = {
+        "benchmark": "replay",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cassette": os.path.abspath(args.cassette),
+        "speed": args.speed,
+        "loop": args.loop,
+        "concurrency": args.concurrency if args.loop == "closed" else None,
+        "results": result,
+    }
+    output = args.output or os.path.join("bench-results", f"replay-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    latency = result["latency_s"]
+    print(f"{result['requests']} requests, {result['failures']} failed, {result['requests_per_s']:.2f} req/s")
+    print(f"latency p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s")
+    print(f"cpu {result['cpu_ms_per_request']:.2f} ms/request, cassette misses {result['cassette']['misses']}")
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,8 @@ setup(
         "python-dotenv",
         "uvicorn",
         "pydantic",
+        "httpx[http2]",
+        "numpy",
     ],
     entry_points={
         "console_scripts": [
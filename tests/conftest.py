@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Configuration is read at import time: keep test runs offline and away from the working copy's cache
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("AGENTIC_CACHE_DIR", tempfile.mkdtemp(prefix="agentic-tests-"))
@@ -0,0 +1,47 @@
+import json
+import random
+
+import pytest
+from lzstring import LZString
+
+from agentic_artifacts.utils.lz_string import compress_to_base64, decompress_from_base64
+
+def _random_text(seed, length, alphabet):
+    rng = random.Random(seed)
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+BMP_TEXTS = [
+    "a",
+    "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa",
+    "hello world, hello world, hello world",
+    "café 日本語 Ж ☃ ￿",
+    json.dumps({"files": {"package.json": {"content": json.dumps({"dependencies": {"react": "^18.2.0"}}, indent=2)},
+                          "src/App.js": {"content": "export default function App() {\n  return <h1>Hi</h1>;\n}\n"}}}),
+    _random_text(1, 3000, "abc"),
+    _random_text(2, 3000, "".join(map(chr, range(32, 127)))),
+    _random_text(3, 2000, "".join(map(chr, range(0x100, 0x400)))),
+]
+
+@pytest.mark.parametrize("text", BMP_TEXTS)
+def test_matches_reference_package(text):
+    reference = LZString()
+    compressed = compress_to_base64(text)
+    assert compressed == reference.compressToBase64(text)
+    assert reference.decompressFromBase64(compressed) == text
+
+@pytest.mark.parametrize("text", BMP_TEXTS + ["emoji \U0001f600 and \U0001f4a9 outside the BMP", ""])
+def test_round_trip(text):
+    assert decompress_from_base64(compress_to_base64(text)) == text
+
+def test_astral_characters_are_written_as_surrogate_pairs():
+    # The UTF-16 units are what the JavaScript implementation compresses
+    assert compress_to_base64("\U0001f600") == compress_to_base64("😀")
+
+def test_none_and_empty_input():
+    assert compress_to_base64(None) == ""
+    assert decompress_from_base64(None) == ""
+    assert decompress_from_base64("") is None
+
+@pytest.mark.parametrize("compressed", ["!!!!", "A", compress_to_base64("hello world")[:3]])
+def test_malformed_input_does_not_raise(compressed):
+    assert decompress_from_base64(compressed) in (None, "")
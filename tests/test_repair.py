@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+from litellm import ModelResponse
+from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+from agentic_artifacts.services import events, llm_client
+from agentic_artifacts.services.code_generator import agenerate_code_files
+
+BROKEN_APP = "import React from 'react';\nexport default function App() {\n  return <div>;\n}\n"
+FIXED_APP = "import React from 'react';\nexport default function App() {\n  return <div>Todo</div>;\n}\n"
+STYLES = "body { margin: 0; }\n"
+
+class FakeBackend:
+    """Streams the requested files, with a JSX error in App.js the first time, and accepts every verification."""
+
+    def __init__(self):
+        self.generation_calls = []
+        self.verification_calls = 0
+
+    async def __call__(self, **kwargs):
+        if kwargs.get("functions"):
+            requested = [name for name in kwargs["functions"][0]["parameters"]["properties"] if name != "dependencies"]
+            self.generation_calls.append({"files": requested, "request": kwargs["messages"][-1]["content"]})
+            contents = {"App.js": BROKEN_APP if len(self.generation_calls) == 1 else FIXED_APP, "App.css": STYLES}
+            return self._stream(json.dumps({name: {"content": contents[name]} for name in requested}))
+        self.verification_calls += 1
+        return ModelResponse(choices=[{"message": {"role": "assistant", "content": "VALID"}, "finish_reason": "stop"}])
+
+    async def _stream(self, payload):
+        for start in range(0, len(payload), 16):
+            yield ModelResponseStream(choices=[StreamingChoices(
+                delta=Delta(function_call={"name": "generate_code_files", "arguments": payload[start:start + 16]}),
+                finish_reason=None,
+            )])
+        yield ModelResponseStream(choices=[StreamingChoices(delta=Delta(), finish_reason="function_call")])
+
+@pytest.fixture
+def backend():
+    fake = FakeBackend()
+    previous = llm_client.set_backend(fake)
+    yield fake
+    llm_client.set_backend(previous)
+
+def test_only_files_with_findings_are_regenerated(backend):
+    repairs = []
+
+    async def run():
+        with events.subscribe(lambda event, data: repairs.append(data) if event == "repair" else None):
+            return await agenerate_code_files("todo app")
+
+    files = asyncio.run(run())
+    assert files["App.js"]["content"] == FIXED_APP
+    assert files["App.css"]["content"] == STYLES
+    assert [call["files"] for call in backend.generation_calls] == [["App.js", "App.css"], ["App.js"]]
+    # The repair request carries the finding and the failing file's contents, and names the kept file
+    request = backend.generation_calls[1]["request"]
+    assert "App.js:3: Syntax error" in request
+    assert json.dumps(BROKEN_APP) in request
+    assert "passed and are kept as they are" in request and "App.css" in request
+    assert [(repair["files"], repair["kept"]) for repair in repairs] == [(["App.js"], ["App.css"])]
+    # The static checker rejected the first file set, so only the repaired one reached the LLM verifier
+    assert backend.verification_calls == 1
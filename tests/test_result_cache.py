@@ -0,0 +1,26 @@
+import asyncio
+
+from agentic_artifacts.services.result_cache import ResultCache
+
+def test_async_tiers_round_trip_through_disk(tmp_path):
+    value = {"files": {"App.js": {"content": "x"}}, "sandbox": {"final_url": "u"}}
+
+    async def run():
+        cache = ResultCache(str(tmp_path))
+        await cache.aset("k", value)
+        assert await cache.aget("k") == value
+        # A new instance has an empty memory tier, so this comes from disk
+        fresh = ResultCache(str(tmp_path))
+        assert await fresh.aget("k") == value
+        assert await fresh.aget("missing") is None
+        return cache.stats(), fresh.stats()
+
+    stored, reloaded = asyncio.run(run())
+    assert stored["memory_hits"] == 1 and stored["stores"] == 1
+    assert reloaded["disk_hits"] == 1 and reloaded["misses"] == 1
+
+def test_expired_disk_entries_are_misses(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=-1)
+    cache.set("k", {"a": 1})
+    assert asyncio.run(ResultCache(str(tmp_path)).aget("k")) is None
+    assert not (tmp_path / "k.json").exists()
@@ -0,0 +1,38 @@
+import asyncio
+
+from agentic_artifacts.services.sandbox_index import SandboxIndex
+from agentic_artifacts.utils.storage import read_json
+
+def test_puts_on_the_loop_are_written_once_and_later(tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    index = SandboxIndex(str(path))
+    index._saver.delay = 0.05
+    writes = []
+    write = index._saver.write
+    monkeypatch.setattr(index._saver, "write", lambda entries: (writes.append(len(entries)), write(entries)))
+
+    async def run():
+        for n in range(50):
+            index.put(f"fp{n}", f"sb{n}")
+        assert not path.exists()
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+    assert writes == [50]
+    assert read_json(str(path))[-1] == ["fp49", "sb49"]
+
+def test_close_writes_pending_changes_and_reload_keeps_lru_order(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = SandboxIndex(path, max_entries=2)
+
+    async def run():
+        index.put("a", "sa")
+        index.put("b", "sb")
+        index.get("a")
+        index.put("c", "sc")
+
+    asyncio.run(run())
+    index.close()
+    reloaded = SandboxIndex(path, max_entries=2)
+    assert reloaded.get("b") is None
+    assert reloaded.get("a") == "sa" and reloaded.get("c") == "sc"
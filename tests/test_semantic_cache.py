@@ -0,0 +1,31 @@
+import asyncio
+import os
+
+from agentic_artifacts.services.semantic_cache import SemanticIndex, qualifiers
+
+def test_disabled_index_creates_no_files(tmp_path):
+    directory = tmp_path / "semantic"
+    index = SemanticIndex(str(directory), max_entries=8, dimensions=64, enabled=False)
+    index.add("a todo app", "k", "ns")
+    assert index.lookup("a todo app", "ns", 0.5) is None
+    assert not directory.exists()
+
+def test_files_are_opened_on_first_use_and_survive_a_restart(tmp_path):
+    directory = str(tmp_path / "semantic")
+    index = SemanticIndex(directory, max_entries=8, dimensions=64)
+    assert not os.path.exists(directory)
+
+    async def run():
+        index.add("a tic tac toe game", "k", "ns")
+        assert index.lookup("create a tic-tac-toe game", "ns", 0.8).key == "k"
+
+    asyncio.run(run())
+    index.close()
+    reopened = SemanticIndex(directory, max_entries=8, dimensions=64)
+    assert reopened.lookup("a tic tac toe game", "ns", 0.99).key == "k"
+    assert reopened.lookup("a tic tac toe game", "other", 0.1) is None
+
+def test_qualifiers_tell_numbers_and_negations_apart():
+    assert qualifiers("counter app with 5 buttons") != qualifiers("counter app with 6 buttons")
+    assert qualifiers("a todo app") != qualifiers("a todo app without dark mode")
+    assert qualifiers("build a todo app") == qualifiers("make me a simple to-do list app")
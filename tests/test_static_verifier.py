@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from agentic_artifacts.services.static_verifier import check_js_syntax, verify_files
+
+@pytest.mark.parametrize("source", [
+    "const x = a++ / 2;",
+    "const y = b-- / c / d;",
+    "let i = 0; i++; const r = /ab+c/g.test(s);",
+    "const z = ++a / 2;",
+    "const ok = x / y / z;",
+    "const re = /[/]+/;",
+    "const el = <div className=\"a\">{items.map(i => <span key={i}>{i / 2}</span>)}</div>;",
+])
+def test_accepts_division_regex_and_jsx(source):
+    assert check_js_syntax(source) is None
+
+@pytest.mark.parametrize("source, message", [
+    ("const r = /abc;", "Unterminated regular expression"),
+    ("const el = <div><span></div>;", None),
+])
+def test_rejects_broken_regex_and_jsx(source, message):
+    problem = check_js_syntax(source)
+    assert problem is not None
+    if message:
+        assert problem[1] == message
+
+@pytest.mark.parametrize("source", [
+    "const s = 'it\\'s /not a regex/ {';",
+    "const t = `a ${b ? `nested ${c}` : '}'} /x`;",
+    "// a comment with ( and `\nconst x = 1; /* } */",
+    "const f = (a) => { return [a, { b: a }]; };",
+    "export default function App() {\n  return (\n    <>\n      <input disabled />\n      <p>It's {1 > 0 ? 'yes' : 'no'}</p>\n    </>\n  );\n}",
+])
+def test_accepts_strings_templates_comments_and_fragments(source):
+    assert check_js_syntax(source) is None
+
+@pytest.mark.parametrize("source, line", [
+    ("const s = 'unclosed;\nconst t = 1;", 1),
+    ("const t = `unclosed ${a}", 1),
+    ("function f() {\n  return 1;\n", 1),
+    ("const a = [1, 2};", 1),
+    ("const x = 1;\n/* never closed", 2),
+    ("const el = (\n  <div>\n    <p>text</div>\n);", 3),
+])
+def test_rejects_unterminated_and_mismatched_constructs(source, line):
+    problem = check_js_syntax(source)
+    assert problem is not None and problem[0] == line
+
+PACKAGE = json.dumps({"dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0"}})
+
+def test_verify_files_accepts_a_consistent_project():
+    files = {
+        "package.json": {"content": PACKAGE},
+        "src/index.js": {"content": "import { createRoot } from 'react-dom/client';\nimport App from './App';\n"},
+        "src/App.js": {"content": "import React from 'react';\nimport Button from './components/Button';\nexport default () => <Button />;\n"},
+        "src/components/Button.jsx": {"content": "export default () => <button>ok</button>;\n"},
+    }
+    assert verify_files(files) == []
+
+def test_verify_files_reports_each_problem_with_its_file():
+    files = {
+        "package.json": {"content": json.dumps({"dependencies": {"react": "^17.0.2", "react-dom": "^17.0.2"}})},
+        "src/index.js": {"content": "import { createRoot } from 'react-dom/client';\nimport App from './Missing';\n"},
+        "src/App.js": {"content": "import axios from 'axios';\nexport default () => <div>;\n"},
+        "src/util.js": {"content": "import lodash from 'lodash';\n"},
+        "src/empty.js": {},
+    }
+    findings = {(finding.file, finding.message) for finding in verify_files(files)}
+    assert ("src/index.js", "Cannot resolve import './Missing'") in findings
+    assert ("src/util.js", "Import 'lodash' is not declared in package.json dependencies") in findings
+    assert ("src/empty.js", "Entry is missing its string 'content'") in findings
+    assert any(file == "src/App.js" and message.startswith("Syntax error") for file, message in findings)
+    assert any(file == "src/index.js" and "requires react-dom 18" in message for file, message in findings)
+    # A file with a syntax error is not checked any further
+    assert ("src/App.js", "Import 'axios' is not declared in package.json dependencies") not in findings
+
+def test_verify_files_reports_invalid_package_json_position():
+    findings = verify_files({"package.json": {"content": '{\n  "dependencies": {,}\n}'}})
+    assert [(finding.file, finding.line) for finding in findings] == [("package.json", 2)]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from agentic_artifacts.services.stream_parser import FunctionArgumentsParser, StreamParseError
+
+FILES = {
+    "App.js": {"content": "export default function App() {\n  return <h1>{\"hi\" + '\\u00e9'}</h1>;\n}\n"},
+    "styles.css": {"content": "body { margin: 0; }\n/* \"quoted\" {braces} [brackets] */\n"},
+    "data.json": {"content": "", "nested": {"list": [1, 2.5, -3e2, True, False, None, "]}"]}},
+    "count": 42,
+}
+
+def _parse(text, size):
+    parser = FunctionArgumentsParser()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    completed.extend(parser.close())
+    return parser, completed
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_chunked_parse_matches_json_loads(indent, size):
+    text = json.dumps(FILES, indent=indent)
+    parser, completed = _parse(text, size)
+    assert parser.done
+    assert parser.entries == json.loads(text)
+    assert [name for name, _ in completed] == list(FILES)
+
+def test_entries_are_returned_as_soon_as_they_close():
+    parser = FunctionArgumentsParser()
+    assert parser.feed('{"a.js": {"content": "x"}') == [("a.js", {"content": "x"})]
+    assert parser.feed(', "b.js": {"content": "y') == []
+    assert parser.feed('"}}') == [("b.js", {"content": "y"})]
+    assert parser.close() == []
+
+def test_trailing_scalar_is_kept_when_the_object_is_unclosed():
+    parser = FunctionArgumentsParser()
+    assert parser.feed('{"n": 12') == []
+    with pytest.raises(StreamParseError, match="Unexpected end of arguments"):
+        parser.close()
+    assert parser.entries == {"n": 12}
+
+@pytest.mark.parametrize("text", [
+    '{"a": {"content": "x"},\n  "b" {"content": "y"}}',
+    '{"a": {"content": "x"}}\n  junk',
+    '{"a": {"content": "x"},\n  b: 1}',
+    '{"a": {"content": "x"},\n  "b": {"content": "y",}}',
+    '{"a": [1, 2,\n  ]}',
+    '{"a.js": {"content": "x"}, "b.js": {"content": "unfinished',
+])
+@pytest.mark.parametrize("size", [1, 5, 100000])
+def test_error_positions_match_json(text, size):
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    with pytest.raises(StreamParseError) as actual:
+        _parse(text, size)
+    assert (actual.value.position, actual.value.line, actual.value.column) == (
+        expected.value.pos, expected.value.lineno, expected.value.colno)
+
+def test_entries_before_an_error_are_kept():
+    parser = FunctionArgumentsParser()
+    parser.feed('{"a.js": {"content": "x"}, "b.js": {"content": ')
+    with pytest.raises(StreamParseError) as error:
+        parser.feed('"y"]')
+    assert error.value.line == 1
+    assert parser.entries == {"a.js": {"content": "x"}}
+
+def test_arguments_must_be_an_object():
+    with pytest.raises(StreamParseError, match="Expected '{'") as error:
+        _parse("  [1, 2]", 3)
+    assert (error.value.position, error.value.line, error.value.column) == (2, 1, 3)